@@ -0,0 +1,39 @@
+"""
+Benchmarks für die Berechnung vieler Hausvarianten (run_batch).
+
+    python -m pytest benchmarks/bench_batch.py -s
+"""
+import pytest
+
+from heizlast.batch import run_batch
+
+from conftest import synthetic_spec
+
+
+N_VARIANTS = 32
+
+
+def _specs() -> dict:
+
+    specs = {}
+    for i in range(N_VARIANTS):
+        spec = synthetic_spec(3 + 3 * (i % 10))
+        spec['Tinner'] = 19.0 + i % 3
+        specs[f'variant {i}'] = spec
+    return specs
+
+
+def _value(summary):
+
+    return summary[['transmission_heat_loss', 'peak_heat_load', 'Gas', 'Solar']].sum()
+
+
+def bench_batch_serial(timing, climate):
+
+    timing(run_batch, _specs(), climate(1), processes=1, rounds=1, value=_value)
+
+
+@pytest.mark.parametrize('processes', [2, 4])
+def bench_batch_pool(timing, climate, processes):
+
+    timing(run_batch, _specs(), climate(1), processes=processes, rounds=1, value=_value)
@@ -0,0 +1,72 @@
+"""
+Benchmarks für die Heizungssteuerung (MultiHeatingSystem.operate_heating) mit beiden Berechnungskernen.
+
+    python -m pytest benchmarks/bench_dispatch.py -s
+"""
+import numpy as np
+import pytest
+
+from heizlast.house import House
+from heizlast.dispatch import _compile, _dispatch_kernel
+
+from conftest import synthetic_spec
+
+
+# Ergänzungen der Basis-Spezifikation für die Pfade, die beide Berechnungskerne abbilden
+VARIANTS = {
+    'buffer': {},
+    'stratified': {'buffer': {'capacity_liters': 1000, 'n_layers': 8, 'loss_coefficient': 2.0}},
+    'heat_pump': {'heat_pumps': [{'name': 'Wärmepumpe', 'rated_power': 8.0}]},
+    'solar_collector': {'solar_collectors': [{'name': 'Kollektor', 'area': 12.0}]},
+}
+
+
+def _operate(climate_data, engine, variant: str = 'buffer'):
+
+    spec = {**synthetic_spec(30), **VARIANTS[variant]}
+    house = House.from_spec(climate_data, spec, engine=engine)
+    house.run(breakdown=False)
+
+    heat_loss = house.transmission_heat_loss_ts['sum']
+    radiation = climate_data['radiation']
+
+    def run():
+        # jeder Durchlauf beginnt mit dem gleichen Ladezustand
+        house.add_buffer(**spec['buffer'])
+        house._define_heating_system()
+        return house._heating_system.operate_heating(heat_loss, solar_radiation_series=radiation)
+
+    return run
+
+
+def _value(energy):
+
+    return energy[['buffer_energy', 'provided_energy', 'Gas', 'Solar']].sum()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def compiled():
+    """
+    Kompiliert den numba-Kernel vor der Messung.
+    """
+    _compile(_dispatch_kernel)
+
+
+def bench_dispatch_python(timing, climate):
+
+    timing(_operate(climate(1), 'python'), rounds=1, value=_value)
+
+
+@pytest.mark.parametrize('years', [1, 10, 30])
+def bench_dispatch_numpy(timing, climate, years):
+
+    timing(_operate(climate(years), 'numpy'), value=_value)
+
+
+@pytest.mark.parametrize('variant', list(VARIANTS))
+def bench_engines_identical(climate, variant):
+
+    python = _operate(climate(1), 'python', variant)()
+    numpy = _operate(climate(1), 'numpy', variant)()
+    assert list(python.columns) == list(numpy.columns)
+    np.testing.assert_array_equal(python.to_numpy(), numpy.to_numpy())
@@ -0,0 +1,84 @@
+"""
+Benchmarks für Bauteilaufbau, Transmissionswärmeverlust und die Berechnung einzelner Häuser.
+
+    python -m pytest benchmarks/bench_house.py -s
+"""
+import numpy as np
+import pytest
+
+from heizlast.house import House, Wall, Layer
+
+from conftest import synthetic_spec
+
+
+@pytest.mark.parametrize('n_components', [3, 30, 300])
+def bench_construction(timing, climate, n_components):
+
+    spec = synthetic_spec(n_components, heating=False)
+    house = timing(House.from_spec, climate(1), spec, rounds=5,
+                   value=lambda house: [house._calculate_total_u_value(), house.design_heat_load()])
+    assert len(house.components) == n_components
+
+
+def bench_wall_run(timing):
+
+    wall = Wall(name='Außenwand', area=100.0)
+    wall.add_layers([Layer(name=f'Schicht {i}', thickness=20.0 + i, thermal_conductivity=0.04 + 0.01 * i)
+                     for i in range(20)])
+
+    timing(wall.run, rounds=50)
+    assert wall.U > 0
+
+
+@pytest.mark.parametrize('years, n_components, breakdown', [
+    (1, 3, True),
+    (1, 300, True),
+    (10, 30, True),
+    (30, 3, True),
+    (30, 300, False),
+])
+def bench_transmission(timing, climate, years, n_components, breakdown):
+
+    house = House.from_spec(climate(years), synthetic_spec(n_components, heating=False))
+
+    def run():
+        house.invalidate()
+        house._calc_annual_transmission_heat_loss_timeseries(breakdown=breakdown)
+        return house.transmission_heat_loss_ts
+
+    timing(run, value=lambda ts: [ts['sum'].sum(), ts['sum'].max()])
+
+
+@pytest.mark.parametrize('years', [1, 10, 30])
+def bench_house_run(timing, climate, years):
+
+    def run():
+        house = House.from_spec(climate(years), synthetic_spec(30), engine='numpy')
+        house.run(breakdown=False)
+        house._calc_energy_need()
+        return house.energy
+
+    timing(run, value=lambda energy: energy[['buffer_energy', 'provided_energy', 'Gas', 'Solar']].sum())
+
+
+@pytest.mark.parametrize('gap_hours', [0, 4])
+def bench_transient(timing, climate, gap_hours):
+
+    climate_data = climate(1).copy()
+    climate_data.iloc[1000:1000 + gap_hours, climate_data.columns.get_loc('Tair')] = np.nan
+
+    house = House(climate_data)
+    house.add_wall('Außenwand', 150.0, construction='Außenwand Leichtbeton mit Kerndämmung')
+    house.add_roof('Dach', 100.0, construction='Steildach Mineralwolle')
+    house.add_window('Fenster', 20.0, number=8, thermal_conductivity=1.3)
+
+    def run():
+        house._calc_transient_heat_loss_timeseries()
+        return house.transmission_heat_loss_ts
+
+    ts = timing(run, value=lambda ts: [ts['sum'].sum(), ts['sum'].max()])
+
+    # eine Lücke darf sich nicht über die Filter in die folgenden Zeitschritte fortsetzen
+    assert not ts['sum'].isna().any()
+    outside_heating = climate_data['Tair'].isna() | (climate_data['Tair'] > house.T_heating)
+    assert (ts['Außenwand'].isna() == outside_heating).all()
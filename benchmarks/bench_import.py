@@ -0,0 +1,58 @@
+"""
+Startzeit-Benchmark für ``import heizlast``.
+
+Headless-Worker sollen weder wetterdienst/polars noch matplotlib oder numba laden,
+und der Kaltstart muss innerhalb des Zeitbudgets bleiben.
+Das Budget in Sekunden kann über HEIZLAST_IMPORT_BUDGET angepasst werden.
+
+    python -m pytest benchmarks/bench_import.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+
+IMPORT_BUDGET = float(os.environ.get('HEIZLAST_IMPORT_BUDGET', '1.5'))
+HEAVY_MODULES = ('wetterdienst', 'polars', 'matplotlib', 'numba', 'scipy')
+REPEAT = 5
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, time, json
+t = time.perf_counter()
+import heizlast
+duration = time.perf_counter() - t
+print(json.dumps({'duration': duration, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _cold_import() -> dict:
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', SCRIPT], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.fixture(scope='module')
+def cold_imports() -> list:
+
+    return [_cold_import() for _ in range(REPEAT)]
+
+
+def bench_no_heavy_modules(cold_imports):
+
+    modules = set(cold_imports[0]['modules'])
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    assert not loaded, f"import heizlast loads {loaded}"
+
+
+def bench_cold_import_budget(cold_imports):
+
+    duration = min(result['duration'] for result in cold_imports)
+    print(f"cold import heizlast: {duration*1000:.0f} ms (budget {IMPORT_BUDGET*1000:.0f} ms)")
+    assert duration < IMPORT_BUDGET, f"cold import took {duration:.2f} s, budget is {IMPORT_BUDGET:.2f} s"
@@ -0,0 +1,154 @@
+"""
+Gemeinsame Hilfsmittel der Benchmarks.
+
+Synthetische Klimadaten und Häuser sind deterministisch (ohne Zufallszahlen), damit die Ergebnisse
+mit den Referenzwerten in reference.json verglichen werden können. Jeder Benchmark prüft
+
+- die Physik: Ergebnis gegen den Referenzwert (relative Toleranz 1e-9),
+- die Laufzeit: beste von mehreren Wiederholungen gegen die Referenzzeit mal (1 + Schwellwert)
+  plus 0.5 ms, damit Messungen im Mikrosekundenbereich nicht an Zeitgeberrauschen scheitern.
+
+Umgebungsvariablen:
+
+- HEIZLAST_BENCH_THRESHOLD: zulässige Verlangsamung, Standard 1.0 (also doppelte Referenzzeit).
+- HEIZLAST_BENCH_UPDATE=1: Referenzwerte und -zeiten neu schreiben statt zu prüfen. Ohne diese Variable
+  schlägt ein Benchmark ohne Eintrag in reference.json fehl.
+"""
+import os
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference.json')
+THRESHOLD = float(os.environ.get('HEIZLAST_BENCH_THRESHOLD', '1.0'))
+UPDATE = os.environ.get('HEIZLAST_BENCH_UPDATE') == '1'
+RTOL = 1e-9
+SLACK = 0.0005 # s
+
+
+def synthetic_climate(years: int) -> pd.DataFrame:
+    """
+    Stündliche Klimadaten mit Jahres- und Tagesgang, die Schwankungen sind deterministisch.
+    :param years: Anzahl Jahre zu je 8760 Stunden.
+    :return: DataFrame mit den Spalten 'Tair' in °C und 'radiation' in kWh/m².
+    """
+    hours = np.arange(8760 * years, dtype=np.float64)
+    day = hours / 24
+    hour = hours % 24
+
+    noise = np.sin(hours * 0.7311) * np.sin(hours * 0.0437) # quasiperiodisch statt zufällig
+    Tair = 9 - 10 * np.cos(2 * np.pi * (day - 20) / 365) + 4 * np.sin(2 * np.pi * (hour - 9) / 24) + 3 * noise
+    radiation = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None) \
+        * (0.4 + 0.3 * np.sin(2 * np.pi * (day - 80) / 365)) * (0.65 + 0.35 * noise)
+
+    index = pd.date_range('2001-01-01', periods=len(hours), freq='h', name='date')
+    return pd.DataFrame({'Tair': Tair, 'radiation': radiation}, index=index)
+
+
+def synthetic_spec(n_components: int, heating: bool = True) -> dict:
+    """
+    Hausbeschreibung mit n_components Bauteilen (Wände, Dächer und Fenster im Wechsel).
+    """
+    walls, roofs, windows = [], [], []
+    for i in range(n_components):
+        if i % 3 == 0:
+            walls.append({'name': f'Wand {i}', 'area': 20.0 + i % 7, 'layers_info': [
+                {'name': 'Innenputz', 'thickness': 10.0, 'thermal_conductivity': 1.01},
+                {'name': 'Leichtbeton', 'thickness': 200, 'thermal_conductivity': 0.48},
+                {'name': 'Dämmung', 'thickness': 60 + 10 * (i % 10), 'thermal_conductivity': 0.045},
+                {'name': 'Ziegel', 'thickness': 120, 'thermal_conductivity': 0.72}]})
+        elif i % 3 == 1:
+            roofs.append({'name': f'Dach {i}', 'area': 15.0 + i % 5, 'layers_info': [
+                {'name': 'Gipskartonplatte', 'thickness': 12.5, 'thermal_conductivity': 0.40},
+                {'name': 'Mineralwolle', 'thickness': 100 + 20 * (i % 6), 'thermal_conductivity': 0.045},
+                {'name': 'Dachsteine', 'thickness': 80, 'thermal_conductivity': 0.50}]})
+        else:
+            windows.append({'name': f'Fenster {i}', 'area': 2.0 + i % 3, 'number': 1,
+                            'thermal_conductivity': 0.9 + 0.1 * (i % 5)})
+
+    spec = {'walls': walls, 'roofs': roofs, 'windows': windows}
+    if heating:
+        spec['buffer'] = {'capacity_liters': 1000}
+        spec['solar_heating_systems'] = [{'name': 'Solar', 'efficiency': 0.7, 'module_power_wp': 400, 'num_modules': 15}]
+        spec['gas_heating_systems'] = [{'name': 'Gas', 'efficiency': 0.9, 'max_power': 20 * max(1, n_components // 3)}]
+    return spec
+
+
+@pytest.fixture(scope='session')
+def climate():
+    """
+    Klimadaten je Anzahl Jahre, werden nur einmal erzeugt.
+    """
+    cache = {}
+
+    def get(years: int) -> pd.DataFrame:
+        if years not in cache:
+            cache[years] = synthetic_climate(years)
+        return cache[years]
+
+    return get
+
+
+@pytest.fixture(scope='session')
+def reference():
+
+    if os.path.exists(REFERENCE_PATH):
+        with open(REFERENCE_PATH, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = {}
+
+    data.setdefault('values', {})
+    data.setdefault('timings', {})
+
+    yield data
+
+    if UPDATE:
+        with open(REFERENCE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+@pytest.fixture
+def timing(request, reference):
+    """
+    Misst eine Funktion und vergleicht Laufzeit und Ergebnis mit reference.json.
+    Aufruf: timing(func, *args, rounds=3, value=lambda result: ...), liefert das Ergebnis des letzten Aufrufs.
+    """
+    name = request.node.name
+
+    def run(func, *args, rounds: int = 3, value=None, **kwargs):
+        durations = []
+        for _ in range(rounds):
+            t = time.perf_counter()
+            result = func(*args, **kwargs)
+            durations.append(time.perf_counter() - t)
+        best = min(durations)
+
+        if value is not None:
+            actual = np.asarray(value(result), dtype=np.float64).tolist()
+            if UPDATE:
+                reference['values'][name] = actual
+            else:
+                assert name in reference['values'], \
+                    f"{name}: no reference value, create it with HEIZLAST_BENCH_UPDATE=1"
+                np.testing.assert_allclose(actual, reference['values'][name], rtol=RTOL,
+                                           err_msg=f"{name}: result differs from reference")
+
+        budget = reference['timings'].get(name)
+        print(f"{name}: {best*1000:.2f} ms" + (f" (reference {budget*1000:.2f} ms)" if budget else ''))
+
+        if UPDATE:
+            reference['timings'][name] = best
+        else:
+            assert budget is not None, f"{name}: no reference timing, create it with HEIZLAST_BENCH_UPDATE=1"
+            assert best <= budget * (1 + THRESHOLD) + SLACK, \
+                f"{name}: {best*1000:.2f} ms is more than {THRESHOLD:.0%} slower than the reference {budget*1000:.2f} ms"
+
+        return result
+
+    return run
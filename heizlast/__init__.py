@@ -1,2 +1,17 @@
+from .diagnostics import configure_logging, JsonFormatter
+from .profiling import Profiler
 from .house import *
-from .dwd import *
\ No newline at end of file
+from .calc import *
+from .dwd import *
+from .cache import *
+from .climate import *
+from .batch import *
+from .sweep import *
+from .stream import *
+from .results import *
+from .solar import *
+from .gains import *
+from .ventilation import *
+from .optimize import *
+from .zones import *
+from .materials import *
@@ -0,0 +1,140 @@
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .house import House
+from .climate import ClimateSource, MemmapClimateSource, as_climate_source
+
+
+# Klimadaten im Worker-Prozess, werden einmalig im Initializer eingebunden
+_climate_data = None
+
+
+def _init_worker(source: MemmapClimateSource):
+
+    global _climate_data
+    _climate_data = source.load()
+
+
+def _clean_spec(spec: dict) -> dict:
+    """
+    Entfernt leere Zellen (NaN/None) einer Tabellenzeile.
+    """
+    return {key: value for key, value in spec.items()
+            if not (value is None or (pd.api.types.is_scalar(value) and pd.isna(value)))}
+
+
+def summarize(house: House) -> pd.Series:
+    """
+    Verdichtet die Ergebnisse eines berechneten Hauses.
+    :param house: Instanz von House nach run().
+    :return: Serie mit Transmissionswärmeverlust (kWh, einschließlich Lüftung), ggf. Lüftungswärmeverlust (kWh),
+             Spitzenlast (kW), bei Wärmegewinnen deren Summe und dem
+             Heizwärmebedarf (kWh) und, falls berechnet, Energiesummen der Heizungssysteme (kWh).
+    """
+    heat_loss = house.transmission_heat_loss_ts['sum']
+
+    summary = {
+        'transmission_heat_loss': heat_loss.sum(),
+        'peak_heat_load': heat_loss.max(),
+    }
+
+    if house.ventilation is not None:
+        summary['ventilation_heat_loss'] = house._ventilation_heat_loss().sum()
+
+    if getattr(house, 'gains_ts', None) is not None:
+        summary['gains'] = house.gains_ts['sum'].sum()
+        summary['heat_demand'] = house.heat_demand().sum()
+
+    energy = getattr(house, 'energy', None)
+    if energy is not None:
+        for column in energy.columns.drop('energy_needed'):
+            summary[column] = energy[column].sum()
+
+    return pd.Series(summary)
+
+
+def simulate_house(climate_data, spec: dict, result: str = 'summary', engine: str = 'numpy'):
+    """
+    Erstellt und berechnet ein einzelnes Haus aus einer Spezifikation.
+    :param climate_data: DataFrame mit den Spalten 'Tair' und 'radiation' oder eine ClimateSource.
+    :param spec: Spezifikation, siehe House.from_spec.
+    :param result: 'summary' für eine verdichtete Serie, 'hourly' für die stündlichen Werte.
+    :param engine: Berechnungskern der Heizungssteuerung.
+    :return: Serie oder DataFrame mit den Ergebnissen.
+    """
+    house = House.from_spec(climate_data, _clean_spec(spec), engine=engine)
+
+    # Wärmegewinne und Heizwärmebedarf auch ohne Heizungssimulation
+    house.run(breakdown=False)
+    if getattr(house, 'buffer', None) is not None and house.heating_systems:
+        house._calc_energy_need()
+
+    if result == 'summary':
+        return summarize(house)
+
+    energy = getattr(house, 'energy', None)
+    if energy is not None:
+        return energy
+    return house.transmission_heat_loss_ts[['sum']]
+
+
+def _simulate_chunk(items: list, result: str, engine: str) -> list:
+
+    return [(key, simulate_house(_climate_data, spec, result=result, engine=engine)) for key, spec in items]
+
+
+def run_batch(specs, climate_data, result: str = 'summary',
+              processes: int = None, chunksize: int = 16, engine: str = 'numpy') -> pd.DataFrame:
+    """
+    Berechnet viele Hausvarianten mit denselben Klimadaten in einem Prozess-Pool.
+    Die Klimadaten werden einmalig als memory-mapped Arrays abgelegt (MemmapClimateSource) und von allen Workern
+    gemeinsam genutzt, statt für jede Aufgabe gepickelt zu werden.
+    :param specs: DataFrame (eine Zeile je Variante, Spalten wie in House.from_spec) oder Dictionary Variante -> Spezifikation.
+    :param climate_data: DataFrame mit den Spalten 'Tair' und 'radiation' oder eine ClimateSource.
+                         Eine MemmapClimateSource wird direkt von den Workern eingebunden.
+    :param result: 'summary' (eine Zeile je Variante) oder 'hourly' (stündliche Werte mit Index (variant, time)).
+    :param processes: Anzahl der Worker-Prozesse, Standard ist os.cpu_count(). Mit 1 wird ohne Pool gerechnet.
+    :param chunksize: Anzahl Varianten je Aufgabe.
+    :param engine: Berechnungskern der Heizungssteuerung.
+    :return: DataFrame mit den Ergebnissen aller Varianten.
+    """
+    if result not in ('summary', 'hourly'):
+        raise ValueError(f"unknown result '{result}', expected 'summary' or 'hourly'")
+
+    if isinstance(specs, pd.DataFrame):
+        items = list(specs.to_dict(orient='index').items())
+    else:
+        items = list(specs.items())
+
+    source = as_climate_source(climate_data)
+
+    if processes == 1:
+        climate_data = source.load()
+        results = [[(key, simulate_house(climate_data, spec, result=result, engine=engine)) for key, spec in items]]
+    else:
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+
+        directory = None
+        try:
+            if not isinstance(source, MemmapClimateSource):
+                directory = tempfile.mkdtemp(prefix='heizlast-')
+                source = MemmapClimateSource.write(directory, source.load())
+
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(source,)) as pool:
+                results = list(pool.map(_simulate_chunk, chunks, [result] * len(chunks), [engine] * len(chunks)))
+        finally:
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    frames = {key: frame for chunk in results for key, frame in chunk}
+
+    if result == 'summary':
+        df = pd.DataFrame.from_dict(frames, orient='index')
+        df.index.name = 'variant'
+        return df
+
+    return pd.concat(frames, names=['variant'])
+
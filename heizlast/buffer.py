@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 class BufferTank:
@@ -11,16 +12,23 @@ class BufferTank:
         """
         self.capacity_liters = capacity_liters
         self.capacity_kwh = self.capacity_liters * 4.186 / 3600  # Kapazität in kWh (4.186 kJ/kg°C und 1 Liter Wasser wiegt 1 kg)
+        self.initial_temp = initial_temp
         self.current_temp = initial_temp
         self.min_temp = min_temp
         self.max_temp = max_temp
         self.charge = (self.current_temp - self.min_temp) * self.capacity_kwh / (self.max_temp - self.min_temp)
+
+        # Anzahl der Entnahmen, die den Speicher geleert haben, und der Ladungen, die ihn gefüllt haben
+        self.empty_events = 0
+        self.saturation_events = 0
     
     def add_energy(self, energy: float):
         """
         Fügt Energie dem Pufferspeicher hinzu.
         :param energy: Energie in kWh.
         """
+        if not self.charge + energy < self.capacity_kwh:
+            self.saturation_events += 1
         self.charge = min(self.capacity_kwh, self.charge + energy)
         self.update_temperature()
     
@@ -37,11 +45,116 @@ class BufferTank:
         else:
             available_energy = self.charge
             self.charge = 0
+            self.empty_events += 1
             self.update_temperature()
             return available_energy
     
+    def standing_loss(self, step_hours: float = 1.0) -> float:
+        """
+        Stillstandsverluste eines Zeitschritts, wird vor jeder Entnahme aufgerufen. Der einfache Speicher ist verlustfrei.
+        :param step_hours: Länge des Zeitschritts in Stunden.
+        :return: Verlorene Energie in kWh.
+        """
+        return 0.0
+
     def update_temperature(self):
         """
         Aktualisiert die aktuelle Temperatur des Pufferspeichers basierend auf dem Ladezustand.
         """
         self.current_temp = self.min_temp + self.charge * (self.max_temp - self.min_temp) / self.capacity_kwh
+
+
+class StratifiedBufferTank(BufferTank):
+    def __init__(self, capacity_liters: float, initial_temp: float, min_temp: float, max_temp: float,
+                 n_layers: int = 10, loss_coefficient: float = 0.0, room_temp: float = 20.0):
+        """
+        Geschichteter Pufferspeicher aus n_layers gleich großen Schichten (oben zuerst) mit Stillstandsverlusten.
+        Geladen wird von oben bis max_temp, entnommen von oben bis min_temp. Danach werden die Schichten nach
+        Temperatur sortiert (Auftrieb: warmes Wasser steigt nach oben), die Energie bleibt dabei erhalten.
+        Anders als BufferTank ist capacity_kwh die nutzbare Energie zwischen min_temp und max_temp.
+        :param capacity_liters: Kapazität des Pufferspeichers in Litern.
+        :param initial_temp: Anfangstemperatur aller Schichten in °C.
+        :param min_temp: Minimale Temperatur des Pufferspeichers in °C.
+        :param max_temp: Maximale Temperatur des Pufferspeichers in °C.
+        :param n_layers: Anzahl der Schichten.
+        :param loss_coefficient: Wärmeverlustrate U·A des Speichers in W/K.
+        :param room_temp: Temperatur des Aufstellraums in °C.
+        """
+        self.capacity_liters = capacity_liters
+        self.initial_temp = initial_temp
+        self.min_temp = min_temp
+        self.max_temp = max_temp
+        self.n_layers = n_layers
+        self.loss_coefficient = loss_coefficient
+        self.room_temp = room_temp
+
+        self.layer_capacity = capacity_liters / n_layers * 4.186 / 3600 # kWh/K je Schicht
+        self.capacity_kwh = self.layer_capacity * n_layers * (max_temp - min_temp)
+        self.temperatures = np.full(n_layers, initial_temp, dtype=np.float64)
+
+        self.empty_events = 0
+        self.saturation_events = 0
+
+        self.update_temperature()
+
+    def loss_factor(self, step_hours: float = 1.0) -> float:
+        """
+        Anteil der Übertemperatur gegenüber dem Raum, der nach einem Zeitschritt erhalten bleibt (exakte Lösung).
+        """
+        return float(np.exp(-self.loss_coefficient / self.n_layers / 1000 * step_hours / self.layer_capacity))
+
+    def standing_loss(self, step_hours: float = 1.0) -> float:
+
+        before = self.temperatures.sum()
+        self.temperatures[:] = self.room_temp + (self.temperatures - self.room_temp) * self.loss_factor(step_hours)
+        self.update_temperature()
+
+        return (before - self.temperatures.sum()) * self.layer_capacity
+
+    def _mix(self):
+
+        # absteigend sortieren: die wärmste Schicht liegt oben
+        self.temperatures[::-1].sort()
+
+    def add_energy(self, energy: float):
+
+        # kumulierte Summen statt sum(), damit die Rundung der schrittweisen Summe im Dispatch-Kern entspricht
+        room = np.maximum(self.max_temp - self.temperatures, 0.0) * self.layer_capacity
+        total = np.cumsum(room)
+        added = np.clip(energy - np.concatenate(([0.0], total[:-1])), 0.0, room)
+
+        if not energy < total[-1]:
+            self.saturation_events += 1
+
+        self.temperatures += added / self.layer_capacity
+        self._mix()
+        self.update_temperature()
+
+    def draw_energy(self, energy: float) -> float:
+        """
+        Entnimmt Energie von oben, siehe BufferTank.draw_energy. Ohne Bedarf (0, negativ oder NaN) bleiben
+        Speicher und Zähler unverändert.
+        """
+        if not energy > 0:
+            return 0.0
+
+        available = np.maximum(self.temperatures - self.min_temp, 0.0) * self.layer_capacity
+        above = np.concatenate(([0.0], np.cumsum(available)[:-1]))
+        drawn = np.clip(energy - above, 0.0, available)
+
+        self.temperatures -= drawn / self.layer_capacity
+        self._mix()
+
+        energy_from_buffer = float(np.cumsum(drawn)[-1])
+        if energy_from_buffer < energy:
+            self.empty_events += 1
+
+        self.update_temperature()
+        return energy_from_buffer
+
+    def update_temperature(self):
+        """
+        Aktualisiert Ladezustand und mittlere Temperatur aus den Schichttemperaturen.
+        """
+        self.charge = float((np.maximum(self.temperatures - self.min_temp, 0.0) * self.layer_capacity).sum())
+        self.current_temp = float(self.temperatures.mean())
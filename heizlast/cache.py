@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import hashlib
+import datetime as dt
+
+import pandas as pd
+
+
+class WeatherCache:
+    FORMATS = ('parquet', 'feather')
+    VERSION = 1  # erhöhen, wenn sich Umrechnung oder Spalten der gecachten Daten ändern
+
+    def __init__(self, directory: str = None, max_age: float = 30.0, max_entries: int = None,
+                 max_bytes: int = None, format: str = 'parquet'):
+        """
+        Lokaler Cache für aufbereitete Wetterdaten (Spalten 'Tair' und 'radiation').
+        :param directory: Cache-Verzeichnis, Standard ist $HEIZLAST_CACHE_DIR oder ~/.cache/heizlast.
+        :param max_age: Maximales Alter eines Eintrags in Tagen, danach gilt er als veraltet. None = nie veraltet.
+        :param max_entries: Maximale Anzahl an Einträgen, die zuletzt genutzten bleiben erhalten.
+        :param max_bytes: Maximale Gesamtgröße der Datendateien in Bytes.
+        :param format: Speicherformat, 'parquet' oder 'feather'.
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"unknown format '{format}', expected one of {self.FORMATS}")
+
+        if directory is None:
+            directory = os.environ.get('HEIZLAST_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'heizlast'))
+
+        self.directory = os.fspath(directory)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.format = format
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+
+        return f"WeatherCache(directory={self.directory!r}, format={self.format!r})"
+
+    def key(self, **params) -> str:
+        """
+        Bildet den Cache-Schlüssel aus den Abfrageparametern (z.B. Station, Zeitraum, Parameter).
+        :return: Schlüssel als Hex-String.
+        """
+        params = {name: value.isoformat() if isinstance(value, (dt.date, dt.datetime)) else value
+                  for name, value in params.items()}
+        params['version'] = self.VERSION
+
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def _data_path(self, key: str) -> str:
+
+        return os.path.join(self.directory, f"{key}.{self.format}")
+
+    def _meta_path(self, key: str) -> str:
+
+        return os.path.join(self.directory, f"{key}.{self.format}.json")
+
+    def _read_meta(self, key: str) -> dict:
+
+        try:
+            with open(self._meta_path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path: str, data: dict):
+
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, path)
+
+    def is_stale(self, meta: dict) -> bool:
+        """
+        Prüft, ob ein Eintrag älter als max_age ist.
+        """
+        if self.max_age is None:
+            return False
+        return time.time() - meta['created'] > self.max_age * 86400
+
+    def load(self, key: str, allow_stale: bool = False) -> pd.DataFrame:
+        """
+        Lädt einen Eintrag aus dem Cache.
+        :param key: Cache-Schlüssel.
+        :param allow_stale: Veraltete Einträge zurückgeben (z.B. im Offline-Betrieb).
+        :return: DataFrame oder None, falls kein (gültiger) Eintrag vorhanden ist.
+        """
+        meta = self._read_meta(key)
+        path = self._data_path(key)
+
+        if meta is None or meta.get('format') != self.format or not os.path.exists(path):
+            return None
+        if self.is_stale(meta) and not allow_stale:
+            return None
+
+        if self.format == 'parquet':
+            data = pd.read_parquet(path)
+        else:
+            data = pd.read_feather(path).set_index(meta['index'])
+            data.index.name = meta['index_name']
+
+        meta['accessed'] = time.time()
+        self._write_json(self._meta_path(key), meta)
+
+        return data
+
+    def store(self, key: str, data: pd.DataFrame, params: dict = None):
+        """
+        Schreibt einen Eintrag in den Cache und räumt anschließend auf.
+        :param key: Cache-Schlüssel.
+        :param data: Aufbereitete Wetterdaten.
+        :param params: Abfrageparameter, werden zur Information mit abgelegt.
+        """
+        path = self._data_path(key)
+        tmp = f"{path}.tmp"
+
+        index = '__index__'
+        if self.format == 'parquet':
+            data.to_parquet(tmp)
+        else:
+            data.rename_axis(index).reset_index().to_feather(tmp)
+        os.replace(tmp, path)
+
+        now = time.time()
+        meta = {
+            'key': key,
+            'format': self.format,
+            'created': now,
+            'accessed': now,
+            'index': index,
+            'index_name': data.index.name,
+            'params': params or {},
+        }
+        self._write_json(self._meta_path(key), meta)
+
+        self.evict()
+
+    def entries(self) -> pd.DataFrame:
+        """
+        Übersicht der Cache-Einträge.
+        :return: DataFrame mit einer Zeile je Eintrag.
+        """
+        data = []
+        suffix = f".{self.format}.json"
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(suffix):
+                continue
+            meta = self._read_meta(filename[:-len(suffix)])
+            if meta is None:
+                continue
+            path = self._data_path(meta['key'])
+            data.append({
+                'key': meta['key'],
+                'created': pd.Timestamp(meta['created'], unit='s'),
+                'accessed': pd.Timestamp(meta['accessed'], unit='s'),
+                'bytes': os.path.getsize(path) if os.path.exists(path) else 0,
+                'stale': self.is_stale(meta),
+                **meta.get('params', {}),
+            })
+
+        df = pd.DataFrame(data, columns=None if data else ['key', 'created', 'accessed', 'bytes', 'stale'])
+        return df.set_index('key')
+
+    def remove(self, key: str):
+        """
+        Entfernt einen Eintrag aus dem Cache.
+        """
+        for path in (self._data_path(key), self._meta_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self):
+        """
+        Entfernt die am längsten nicht genutzten Einträge oberhalb von max_entries bzw. max_bytes.
+        Veraltete Einträge bleiben für den Offline-Betrieb erhalten und werden beim nächsten Laden ersetzt.
+        """
+        entries = self.entries().sort_values('accessed', ascending=False)
+
+        if self.max_entries is not None:
+            for key in entries.index[self.max_entries:]:
+                self.remove(key)
+            entries = entries.iloc[:self.max_entries]
+
+        if self.max_bytes is not None:
+            total = entries['bytes'].cumsum()
+            for key in entries.index[total > self.max_bytes]:
+                self.remove(key)
+
+    def clear(self):
+        """
+        Entfernt alle Einträge aus dem Cache.
+        """
+        for key in self.entries().index:
+            self.remove(key)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+
+DESIGN_OUTDOOR_TEMPERATURE = -12.0 # °C, Norm-Außentemperatur, standortabhängig nach DIN/TS 12831-1
+
+
+def component_ua(component) -> float:
+    """
+    Wärmedurchgangskoeffizient U·A eines Bauteils in W/K, mit dem beim Berechnen des Bauteils ermittelten U-Wert.
+    :param component: Bauteil (Wall, Roof, Ceiling, Window).
+    :return: U·A in W/K.
+    """
+    return component.U * component.area
+
+
+def transmission_coefficients(components: list) -> np.ndarray:
+    """
+    Transmissionswärmeverlustkoeffizienten H_T = U·A·r aller Bauteile.
+    :param components: Liste von Bauteilen.
+    :return: Array in W/K.
+    """
+    return np.array([component_ua(component) * component.r for component in components], dtype=np.float64)
+
+
+def mean_u_value(components: list) -> float:
+    """
+    Flächengewichteter mittlerer U-Wert.
+    :param components: Liste von Bauteilen.
+    :return: Mittlerer U-Wert in W/(m²*K), inf falls keine Bauteile vorhanden sind.
+    """
+    area = np.array([component.area for component in components], dtype=np.float64)
+    if area.sum() == 0:
+        return float('inf')  # Falls keine Bauteile hinzugefügt wurden
+
+    ua = np.array([component_ua(component) for component in components], dtype=np.float64)
+    return float(ua.sum() / area.sum())
+
+
+def design_heat_load(components: list, theta_int=20.0, theta_e=DESIGN_OUTDOOR_TEMPERATURE):
+    """
+    Norm-Transmissionsheizlast Φ_T = Σ U·A·r · (θ_int - θ_e).
+    :param components: Liste von Bauteilen.
+    :param theta_int: Norm-Innentemperatur in °C, Skalar oder Array.
+    :param theta_e: Norm-Außentemperatur in °C, Skalar oder Array (z.B. für Auslegungsschleifen).
+    :return: Heizlast in kW, Skalar oder Array.
+    """
+    H_T = transmission_coefficients(components).sum()
+    return H_T * (np.asarray(theta_int) - np.asarray(theta_e)) / 1000
+
+
+def design_heat_load_table(components: list, theta_int=20.0, theta_e=DESIGN_OUTDOOR_TEMPERATURE) -> pd.DataFrame:
+    """
+    Heizlast je Bauteil.
+    :param components: Liste von Bauteilen.
+    :param theta_int: Norm-Innentemperatur in °C.
+    :param theta_e: Norm-Außentemperatur in °C.
+    :return: DataFrame mit Fläche, U-Wert, U·A, r, H_T (W/K) und Heizlast (kW) je Bauteil und Summenzeile.
+    """
+    area = np.array([component.area for component in components], dtype=np.float64)
+    ua = np.array([component_ua(component) for component in components], dtype=np.float64)
+    r = np.array([component.r for component in components], dtype=np.float64)
+
+    df = pd.DataFrame({
+        'Area': area,
+        'U-Value': ua / area,
+        'UA': ua,
+        'r': r,
+        'H_T': ua * r,
+        'heat_load': ua * r * (theta_int - theta_e) / 1000,
+        }, index=pd.Index([component.name for component in components], name='name'))
+
+    df.loc['sum', ['Area', 'UA', 'H_T', 'heat_load']] = df[['Area', 'UA', 'H_T', 'heat_load']].sum()
+
+    return df
@@ -0,0 +1,222 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class ClimateSource:
+    COLUMNS = ('Tair', 'radiation')
+
+    def load(self) -> pd.DataFrame:
+        """
+        Lädt die Klimadaten.
+        :return: DataFrame mit den Spalten 'Tair' in °C und 'radiation' in kWh/m² je Zeitschritt.
+        """
+        raise NotImplementedError
+
+    def iter_chunks(self, chunksize: int):
+        """
+        Liefert die Klimadaten in aufeinanderfolgenden Abschnitten.
+        Die Basisklasse lädt die gesamte Serie, Quellen mit eigener Implementierung lesen nur den jeweiligen Abschnitt.
+        Bei MemmapClimateSource sind die Abschnitte Sichten auf die eingebundene Datei.
+        :param chunksize: Anzahl Zeitschritte je Abschnitt.
+        :return: Generator von DataFrames mit den Spalten 'Tair' und 'radiation'.
+        """
+        data = self.load()
+        for start in range(0, len(data), chunksize):
+            yield data.iloc[start:start + chunksize]
+
+    def _validate(self, data: pd.DataFrame) -> pd.DataFrame:
+
+        missing = [column for column in self.COLUMNS if column not in data.columns]
+        if missing:
+            raise ValueError(f"{self!r}: climate data is missing the columns {missing}")
+        return data
+
+
+class DataFrameClimateSource(ClimateSource):
+    def __init__(self, data: pd.DataFrame):
+        """
+        Klimadaten aus einem vorhandenen DataFrame.
+        :param data: DataFrame mit den Spalten 'Tair' und 'radiation'.
+        """
+        self.data = data
+
+    def __repr__(self):
+
+        return f"DataFrameClimateSource({len(self.data)} rows)"
+
+    def load(self) -> pd.DataFrame:
+
+        return self._validate(self.data)
+
+
+class CsvClimateSource(ClimateSource):
+    def __init__(self, path: str, columns: dict = None, index_col=0, **kwargs):
+        """
+        Klimadaten aus einer CSV-Datei mit Zeitstempel als Index.
+        :param path: Pfad der CSV-Datei.
+        :param columns: Umbenennung der Spalten, z.B. {'temperature': 'Tair'}.
+        :param index_col: Spalte mit den Zeitstempeln.
+        :param kwargs: Weitere Argumente für pandas.read_csv.
+        """
+        self.path = os.fspath(path)
+        self.columns = columns or {}
+        self.index_col = index_col
+        self.kwargs = kwargs
+
+    def __repr__(self):
+
+        return f"CsvClimateSource({self.path!r})"
+
+    def load(self) -> pd.DataFrame:
+
+        data = pd.read_csv(self.path, index_col=self.index_col, parse_dates=True, **self.kwargs)
+        return self._validate(data.rename(columns=self.columns))
+
+    def iter_chunks(self, chunksize: int):
+
+        with pd.read_csv(self.path, index_col=self.index_col, parse_dates=True, chunksize=chunksize, **self.kwargs) as reader:
+            for data in reader:
+                yield self._validate(data.rename(columns=self.columns))
+
+
+class ParquetClimateSource(ClimateSource):
+    def __init__(self, path: str, columns: dict = None):
+        """
+        Klimadaten aus einer Parquet-Datei mit Zeitstempel als Index.
+        :param path: Pfad der Parquet-Datei.
+        :param columns: Umbenennung der Spalten, z.B. {'temperature': 'Tair'}.
+        """
+        self.path = os.fspath(path)
+        self.columns = columns or {}
+
+    def __repr__(self):
+
+        return f"ParquetClimateSource({self.path!r})"
+
+    def load(self) -> pd.DataFrame:
+
+        data = pd.read_parquet(self.path)
+        return self._validate(data.rename(columns=self.columns))
+
+    def iter_chunks(self, chunksize: int):
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(self.path)
+        schema = parquet_file.schema_arrow # enthält die pandas-Metadaten für den Index
+
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            data = pa.Table.from_batches([batch], schema=schema).to_pandas()
+            yield self._validate(data.rename(columns=self.columns))
+
+
+class TryClimateSource(ClimateSource):
+    def __init__(self, path: str, year: int = 2015, encoding: str = 'latin-1'):
+        """
+        Klimadaten aus einem Testreferenzjahr (TRY) des DWD im .dat-Format.
+        Die Daten beginnen nach der Zeile '***', die Zeile davor enthält die Spaltenköpfe
+        (u.a. MM, DD, HH, t in °C, B und D als direkte und diffuse Horizontalstrahlung in W/m²).
+        :param path: Pfad der TRY-Datei.
+        :param year: Kalenderjahr, dem das Testreferenzjahr zugeordnet wird (ohne Schalttag).
+        :param encoding: Zeichenkodierung der Datei.
+        """
+        self.path = os.fspath(path)
+        self.year = year
+        self.encoding = encoding
+
+    def __repr__(self):
+
+        return f"TryClimateSource({self.path!r}, year={self.year})"
+
+    def load(self) -> pd.DataFrame:
+
+        with open(self.path, encoding=self.encoding) as f:
+            lines = f.readlines()
+
+        start = next(i for i, line in enumerate(lines) if line.startswith('***'))
+        header = lines[start - 1].split()
+
+        data = pd.read_csv(self.path, sep=r'\s+', skiprows=start + 1, names=header, header=None, encoding=self.encoding)
+
+        # HH ist die Endstunde des Intervalls (1..24)
+        index = pd.to_datetime(pd.DataFrame({'year': self.year, 'month': data['MM'], 'day': data['DD']})) \
+            + pd.to_timedelta(data['HH'] - 1, unit='h')
+
+        climate = pd.DataFrame({
+            'Tair': data['t'].to_numpy(dtype=np.float64),
+            'radiation': (data['B'] + data['D']).to_numpy(dtype=np.float64) / 1000, # W/m² Stundenmittel in kWh/m²
+        }, index=pd.DatetimeIndex(index, name='date'))
+
+        return self._validate(climate)
+
+
+class MemmapClimateSource(ClimateSource):
+    def __init__(self, path: str):
+        """
+        Klimadaten in einem kompakten Binärformat, die memory-mapped eingebunden werden.
+        Viele Prozesse können so dieselbe (mehrjährige) Serie nutzen, ohne eigene Kopien zu halten.
+        Das Verzeichnis enthält 'values.npy' (Spalten x Zeitschritte), 'index.npy' und 'meta.json'.
+        :param path: Verzeichnis, erstellt mit MemmapClimateSource.write.
+        """
+        self.path = os.fspath(path)
+
+    def __repr__(self):
+
+        return f"MemmapClimateSource({self.path!r})"
+
+    @classmethod
+    def write(cls, path: str, data: pd.DataFrame, dtype=np.float64):
+        """
+        Schreibt Klimadaten in das Binärformat.
+        :param path: Zielverzeichnis.
+        :param data: DataFrame mit den Klimadaten.
+        :param dtype: Datentyp der Werte, z.B. np.float32 für halben Speicherbedarf.
+        :return: Instanz von MemmapClimateSource.
+        """
+        path = os.fspath(path)
+        os.makedirs(path, exist_ok=True)
+
+        index = data.index
+        tz = getattr(index, 'tz', None)
+
+        # eine Zeile je Spalte, damit jede Spalte zusammenhängend im Speicher liegt
+        np.save(os.path.join(path, 'values.npy'), np.ascontiguousarray(data.to_numpy(dtype=dtype).T))
+        np.save(os.path.join(path, 'index.npy'), (index.tz_convert(None) if tz is not None else index).to_numpy())
+
+        meta = {
+            'columns': [str(column) for column in data.columns],
+            'index_name': index.name,
+            'tz': str(tz) if tz is not None else None,
+        }
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        return cls(path)
+
+    def load(self) -> pd.DataFrame:
+
+        with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        values = np.load(os.path.join(self.path, 'values.npy'), mmap_mode='r')
+        index = pd.Index(np.load(os.path.join(self.path, 'index.npy')), name=meta['index_name'])
+        if meta['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+
+        data = pd.DataFrame(values.T, index=index, columns=meta['columns'], copy=False)
+        return self._validate(data)
+
+
+def as_climate_source(climate) -> ClimateSource:
+    """
+    Wandelt DataFrames in eine ClimateSource um, Quellen werden unverändert zurückgegeben.
+    """
+    if isinstance(climate, ClimateSource):
+        return climate
+    if isinstance(climate, pd.DataFrame):
+        return DataFrameClimateSource(climate)
+    raise TypeError(f"expected a DataFrame or ClimateSource, got {type(climate).__name__}")
@@ -0,0 +1,85 @@
+import sys
+import json
+import time
+import logging
+
+
+logger = logging.getLogger('heizlast')
+logger.addHandler(logging.NullHandler()) # ohne Konfiguration keine Ausgabe
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formatiert einen Logeintrag als eine JSON-Zeile, strukturierte Felder werden übernommen.
+        """
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'fields', {}))
+
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+def configure_logging(level=logging.DEBUG, json_format: bool = False, stream=None) -> logging.Handler:
+    """
+    Aktiviert die Diagnoseausgabe des Pakets.
+    :param level: Log-Level, z.B. logging.DEBUG für Details zu jedem Bauteil.
+    :param json_format: Ausgabe als strukturierte JSON-Zeilen statt als Text.
+    :param stream: Ziel der Ausgabe, Standard ist sys.stderr.
+    :return: Der hinzugefügte Handler, kann mit logger.removeHandler wieder entfernt werden.
+    """
+    handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    if json_format:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    logger.addHandler(handler)
+    logger.setLevel(level)
+
+    return handler
+
+
+def log_event(log: logging.Logger, event: str, level: int = logging.DEBUG, **fields):
+    """
+    Schreibt ein strukturiertes Ereignis, die Felder stehen im JsonFormatter als eigene Schlüssel zur Verfügung.
+    :param log: Logger des Moduls.
+    :param event: Name des Ereignisses, z.B. 'component_built'.
+    :param fields: Weitere Felder des Ereignisses.
+    """
+    if not log.isEnabledFor(level):
+        return
+
+    text = ' '.join(f"{name}={value}" for name, value in fields.items())
+    log.log(level, '%s %s', event, text, extra={'fields': {'event': event, **fields}})
+
+
+def run_stages(log: logging.Logger, event: str, stages: list, level: int = logging.DEBUG, **fields):
+    """
+    Führt Berechnungsschritte nacheinander aus. Nur bei aktivem Log-Level wird die Dauer jedes
+    Schritts gemessen und als ein Ereignis mit dem Feld 'stages' (Dauer in ms) geschrieben.
+    :param log: Logger des Moduls.
+    :param event: Name des Ereignisses.
+    :param stages: Liste von (Name, Funktion) Tupeln.
+    :param fields: Weitere Felder des Ereignisses, Funktionen werden nach den Schritten ausgewertet.
+    """
+    if not log.isEnabledFor(level):
+        for _, stage in stages:
+            stage()
+        return
+
+    durations = {}
+    for name, stage in stages:
+        t = time.perf_counter()
+        stage()
+        durations[name] = round((time.perf_counter() - t) * 1000, 4)
+
+    fields = {name: value() if callable(value) else value for name, value in fields.items()}
+    log_event(log, event, level=level, stages=durations, **fields)
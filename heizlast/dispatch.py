@@ -0,0 +1,289 @@
+import numpy as np
+
+from .buffer import StratifiedBufferTank
+
+
+DISPATCH_SUPPLY = 0  # System liefert ein vorgegebenes Angebot (z.B. Solar)
+DISPATCH_DEMAND = 1  # System folgt dem Defizit bis zur Maximalleistung (z.B. Gas)
+
+
+def _dispatch_kernel(energy_needed, kinds, supply, efficiency, charge, capacity,
+                     buffer_energy, provided, provided_energy, touched, events):
+    """
+    Rekursion des Pufferspeichers über alle Zeitschritte.
+    Bildet exakt die Regeln von MultiHeatingSystem.operate_heating ab (inkl. NaN-Verhalten).
+    In events werden die Ereignisse 'Speicher leer' (0) und 'Speicher voll' (1) gezählt.
+    :return: Ladezustand des Pufferspeichers nach dem letzten Zeitschritt in kWh.
+    """
+    n_systems = len(kinds)
+
+    for i in range(len(energy_needed)):
+        energy = energy_needed[i]
+
+        # Entnahme aus dem Pufferspeicher
+        if charge >= energy:
+            charge -= energy
+            energy_from_buffer = energy
+        else:
+            energy_from_buffer = charge
+            charge = 0.0
+            events[0] += 1
+
+        energy_deficit = energy - energy_from_buffer
+        buffer_energy[i] = energy_from_buffer
+
+        for j in range(n_systems):
+            energy_provided = 0.0
+            if kinds[j] == DISPATCH_SUPPLY:
+                energy_provided = supply[j][i]
+                if energy_deficit > 0:
+                    if energy_deficit < energy_provided:
+                        energy_provided = energy_deficit
+            else:
+                if energy_deficit > 0:
+                    touched[j] = True
+                    max_energy = supply[j][i]
+                    energy_provided = energy_deficit if not max_energy < energy_deficit else max_energy
+                    energy_provided = energy_provided * efficiency[j][i]
+
+            if energy_provided > 0:
+                new_charge = charge + energy_provided
+                if new_charge < capacity:
+                    charge = new_charge
+                else:
+                    charge = capacity
+                    events[1] += 1
+                energy_deficit -= energy_provided
+
+            provided[j][i] = energy_provided
+
+        provided_energy[i] = energy - energy_deficit
+
+    return charge
+
+
+def _stratified_kernel(energy_needed, kinds, supply, efficiency, temperatures, layer_capacity,
+                       min_temp, max_temp, room_temp, loss_factor,
+                       buffer_energy, provided, provided_energy, touched, events):
+    """
+    Rekursion eines geschichteten Pufferspeichers (StratifiedBufferTank) über alle Zeitschritte.
+    Die Schichttemperaturen werden in-place fortgeschrieben, die Rechenschritte entsprechen denen von
+    StratifiedBufferTank.standing_loss, draw_energy und add_energy.
+    """
+    n_systems = len(kinds)
+    n_layers = len(temperatures)
+
+    for i in range(len(energy_needed)):
+        energy = energy_needed[i]
+
+        # Stillstandsverluste
+        for k in range(n_layers):
+            temperatures[k] = room_temp + (temperatures[k] - room_temp) * loss_factor
+
+        # Entnahme von oben, kein Bedarf (0, negativ oder NaN) lässt Speicher und Zähler unverändert
+        energy_from_buffer = 0.0
+        if energy > 0:
+            above = 0.0
+            for k in range(n_layers):
+                available = temperatures[k] - min_temp
+                available = (available if available > 0 else 0.0) * layer_capacity
+                drawn = energy - above
+                drawn = drawn if drawn > 0 else 0.0
+                drawn = drawn if drawn < available else available
+                temperatures[k] -= drawn / layer_capacity
+                energy_from_buffer += drawn
+                above += available
+            # nach Temperatur sortieren (Insertion Sort, die Schichten sind nahezu sortiert)
+            for k in range(1, n_layers):
+                value = temperatures[k]
+                m = k - 1
+                while m >= 0 and temperatures[m] < value:
+                    temperatures[m + 1] = temperatures[m]
+                    m -= 1
+                temperatures[m + 1] = value
+            if energy_from_buffer < energy:
+                events[0] += 1
+
+        energy_deficit = energy - energy_from_buffer
+        buffer_energy[i] = energy_from_buffer
+
+        for j in range(n_systems):
+            energy_provided = 0.0
+            if kinds[j] == DISPATCH_SUPPLY:
+                energy_provided = supply[j][i]
+                if energy_deficit > 0:
+                    if energy_deficit < energy_provided:
+                        energy_provided = energy_deficit
+            else:
+                if energy_deficit > 0:
+                    touched[j] = True
+                    max_energy = supply[j][i]
+                    energy_provided = energy_deficit if not max_energy < energy_deficit else max_energy
+                    energy_provided = energy_provided * efficiency[j][i]
+
+            if energy_provided > 0:
+                # Ladung von oben bis max_temp
+                above = 0.0
+                for k in range(n_layers):
+                    room = max_temp - temperatures[k]
+                    room = (room if room > 0 else 0.0) * layer_capacity
+                    added = energy_provided - above
+                    added = added if added > 0 else 0.0
+                    added = added if added < room else room
+                    temperatures[k] += added / layer_capacity
+                    above += room
+                if not energy_provided < above:
+                    events[1] += 1
+                # nach Temperatur sortieren (Insertion Sort, die Schichten sind nahezu sortiert)
+                for k in range(1, n_layers):
+                    value = temperatures[k]
+                    m = k - 1
+                    while m >= 0 and temperatures[m] < value:
+                        temperatures[m + 1] = temperatures[m]
+                        m -= 1
+                    temperatures[m + 1] = value
+                energy_deficit -= energy_provided
+
+            provided[j][i] = energy_provided
+
+        provided_energy[i] = energy - energy_deficit
+
+
+_compiled = {}
+
+
+def _compile(kernel):
+    """
+    Kompiliert einen Kernel beim ersten Aufruf mit numba.
+    numba ist optional und wird erst hier importiert, ohne numba wird None zurückgegeben.
+    """
+    if kernel not in _compiled:
+        try:
+            from numba import njit
+        except ImportError:
+            _compiled[kernel] = None
+        else:
+            _compiled[kernel] = njit(cache=True)(kernel)
+    return _compiled[kernel]
+
+
+def run_dispatch(buffer_tank, systems: list, energy_needed: np.ndarray, solar_radiation: np.ndarray,
+                 step_hours: float = 1.0) -> dict:
+    """
+    Vektorisierter Dispatch auf zusammenhängenden float64-Arrays.
+    Das Angebot der Systeme wird vorab für die gesamte Serie berechnet, danach läuft die
+    Pufferspeicher-Rekursion in einem einzigen (mit numba kompilierten) Durchlauf.
+    :param buffer_tank: Instanz des Pufferspeichers, der Ladezustand wird fortgeschrieben.
+    :param systems: Liste der Heizungssysteme (mit Priorität).
+    :param energy_needed: Array der Energiebedarfswerte in kWh.
+    :param solar_radiation: Array der Globalstrahlung, gleiche Länge wie energy_needed.
+    :param step_hours: Länge eines Zeitschritts in Stunden, die Maximalleistung der bedarfsgeführten Systeme
+                       wird damit in Energie je Zeitschritt umgerechnet (z.B. 1/6 für 10-Minuten-Werte).
+    :return: Dictionary mit den Arrays 'buffer_energy', 'provided_energy', 'systems' (n_systems x n), 'touched' und 'kinds'
+             sowie der Anzahl der Zeitschritte, in denen der Speicher leer lief ('empty_events') bzw. voll war
+             ('saturation_events'). Die Zähler werden auch am Pufferspeicher fortgeschrieben.
+    """
+    energy_needed = np.ascontiguousarray(energy_needed, dtype=np.float64)
+    solar_radiation = np.ascontiguousarray(solar_radiation, dtype=np.float64)
+    n = len(energy_needed)
+    n_systems = len(systems)
+
+    kinds = np.empty(n_systems, dtype=np.int64)
+    supply = np.empty((n_systems, n), dtype=np.float64)
+    efficiency = np.empty((n_systems, n), dtype=np.float64)
+    for j, system in enumerate(systems):
+        kinds[j], supply[j], efficiency[j] = system.dispatch_profile(solar_radiation)
+        if kinds[j] == DISPATCH_DEMAND and step_hours != 1.0:
+            supply[j] *= step_hours
+
+    buffer_energy = np.empty(n, dtype=np.float64)
+    provided = np.empty((n_systems, n), dtype=np.float64)
+    provided_energy = np.empty(n, dtype=np.float64)
+    touched = np.zeros(n_systems, dtype=np.bool_)
+    events = np.zeros(2, dtype=np.int64)
+
+    if isinstance(buffer_tank, StratifiedBufferTank):
+        _run_stratified(buffer_tank, kinds, supply, efficiency, energy_needed, step_hours,
+                        buffer_energy, provided, provided_energy, touched, events)
+    else:
+        _run_lumped(buffer_tank, kinds, supply, efficiency, energy_needed,
+                    buffer_energy, provided, provided_energy, touched, events)
+
+    buffer_tank.empty_events += int(events[0])
+    buffer_tank.saturation_events += int(events[1])
+
+    return {
+        'buffer_energy': buffer_energy,
+        'provided_energy': provided_energy,
+        'systems': provided,
+        'touched': touched,
+        'kinds': kinds,
+        'empty_events': int(events[0]),
+        'saturation_events': int(events[1]),
+    }
+
+
+def _run_lumped(buffer_tank, kinds, supply, efficiency, energy_needed,
+                buffer_energy, provided, provided_energy, touched, events):
+
+    n = len(energy_needed)
+    n_systems = len(kinds)
+
+    charge = float(buffer_tank.charge)
+    capacity = float(buffer_tank.capacity_kwh)
+
+    kernel = _compile(_dispatch_kernel)
+    if kernel is not None:
+        charge = kernel(energy_needed, kinds, supply, efficiency, charge, capacity,
+                        buffer_energy, provided, provided_energy, touched, events)
+    else:
+        # reine Python-Schleife: Listen mit Python-floats sind hier deutlich schneller als numpy-Skalare
+        buffer_energy_l = [0.0] * n
+        provided_l = [[0.0] * n for _ in range(n_systems)]
+        provided_energy_l = [0.0] * n
+        touched_l = [False] * n_systems
+        events_l = [0, 0]
+        charge = _dispatch_kernel(energy_needed.tolist(), kinds.tolist(), supply.tolist(), efficiency.tolist(),
+                                  charge, capacity, buffer_energy_l, provided_l, provided_energy_l, touched_l, events_l)
+        buffer_energy[:] = buffer_energy_l
+        for j in range(n_systems):
+            provided[j] = provided_l[j]
+        provided_energy[:] = provided_energy_l
+        touched[:] = touched_l
+        events[:] = events_l
+
+    buffer_tank.charge = charge
+    buffer_tank.update_temperature()
+
+
+def _run_stratified(buffer_tank, kinds, supply, efficiency, energy_needed, step_hours,
+                    buffer_energy, provided, provided_energy, touched, events):
+
+    n = len(energy_needed)
+    n_systems = len(kinds)
+
+    params = (float(buffer_tank.layer_capacity), float(buffer_tank.min_temp), float(buffer_tank.max_temp),
+              float(buffer_tank.room_temp), buffer_tank.loss_factor(step_hours))
+
+    kernel = _compile(_stratified_kernel)
+    if kernel is not None:
+        kernel(energy_needed, kinds, supply, efficiency, buffer_tank.temperatures, *params,
+               buffer_energy, provided, provided_energy, touched, events)
+    else:
+        temperatures_l = buffer_tank.temperatures.tolist()
+        buffer_energy_l = [0.0] * n
+        provided_l = [[0.0] * n for _ in range(n_systems)]
+        provided_energy_l = [0.0] * n
+        touched_l = [False] * n_systems
+        events_l = [0, 0]
+        _stratified_kernel(energy_needed.tolist(), kinds.tolist(), supply.tolist(), efficiency.tolist(),
+                           temperatures_l, *params, buffer_energy_l, provided_l, provided_energy_l, touched_l, events_l)
+        buffer_tank.temperatures[:] = temperatures_l
+        buffer_energy[:] = buffer_energy_l
+        for j in range(n_systems):
+            provided[j] = provided_l[j]
+        provided_energy[:] = provided_energy_l
+        touched[:] = touched_l
+        events[:] = events_l
+
+    buffer_tank.update_temperature()
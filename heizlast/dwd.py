@@ -1,19 +1,42 @@
-import polars as pl
-_ = pl.Config.set_tbl_hide_dataframe_shape(True)
-from wetterdienst import Settings
-from wetterdienst.provider.dwd.observation import DwdObservationRequest, DwdObservationDataset, DwdObservationPeriod, DwdObservationResolution
 import datetime as dt
-from wetterdienst.metadata.parameter import Parameter
-
-class WeatherData():
-    def __init__(self, station_id: int = 1048, nyears=2) -> None:
+import pandas as pd
+
+from .cache import WeatherCache
+from .climate import ClimateSource
+
+class WeatherData(ClimateSource):
+    PARAMETERS = ('temperature_air_mean_200', 'radiation_global')
+
+    def __init__(self, station_id: int = 1048, nyears=2,
+                 start_date: dt.datetime = None, end_date: dt.datetime = None,
+                 cache: WeatherCache = None, offline: bool = False, fetcher=None) -> None:
+        """
+        Stündliche Wetterdaten des DWD.
+        :param station_id: DWD-Stationskennung.
+        :param nyears: Anzahl Jahre, falls kein Zeitraum angegeben ist (jeweils 1.6. bis 31.5.).
+        :param start_date: Beginn des Zeitraums, überschreibt nyears.
+        :param end_date: Ende des Zeitraums, überschreibt nyears.
+        :param cache: Instanz von WeatherCache oder Cache-Verzeichnis für die aufbereiteten Daten.
+        :param offline: Nur aus dem Cache laden (auch veraltete Einträge), keine Abfrage beim DWD.
+        :param fetcher: Ersatz für die DWD-Abfrage, fetcher(station_id, parameters, start_date, end_date)
+                        liefert ein DataFrame im Long-Format mit den Spalten 'date', 'dataset' und 'value'.
+        """
 
         self.station_id = station_id
 
         year = dt.datetime.now().year - 1
 
-        self.start_date = dt.datetime(year-nyears, 6, 1)
-        self.end_date = dt.datetime(year, 5, 31)
+        self.start_date = start_date if start_date is not None else dt.datetime(year-nyears, 6, 1)
+        self.end_date = end_date if end_date is not None else dt.datetime(year, 5, 31)
+
+        if cache is not None and not isinstance(cache, WeatherCache):
+            cache = WeatherCache(directory=cache)
+
+        self.cache = cache
+        self.offline = offline
+        self.fetcher = fetcher
+        self.station = None
+        self.data = None
 
     def _rename_columns(self):
 
@@ -26,12 +49,31 @@ class WeatherData():
 
         # Kelvin to °C
         self.data['Tair'] = self.data['Tair'] - 273.15
-        
-        # to kWh/m^2
-        self.data['radiation'] = self.data['radiation'].mul(2.778).div(100*100).div(1000) # J/cm^2 in Wh/m^2 mit 1 W=1 J/s
 
-
-    def load_data(self):
+        # to kWh/m^2
+        self.data['radiation'] = self.data['radiation'].mul(2.778).div(100*100).div(1000) # J/m² (SI) je Stunde in kWh/m², 1 kWh = 3.6e6 J
+
+
+    def _cache_params(self) -> dict:
+
+        return {
+            'station_id': self.station_id,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'parameters': list(self.PARAMETERS),
+            'resolution': 'hourly',
+        }
+
+    def _fetch(self) -> pd.DataFrame:
+        """
+        Fragt die Messwerte beim DWD ab.
+        :return: DataFrame im Long-Format mit den Spalten 'date', 'dataset' und 'value'.
+        """
+        # polars und wetterdienst erst bei Bedarf laden, sie kosten beim Import mehrere Sekunden
+        import polars as pl
+        _ = pl.Config.set_tbl_hide_dataframe_shape(True)
+        from wetterdienst import Settings
+        from wetterdienst.provider.dwd.observation import DwdObservationRequest, DwdObservationResolution
 
         settings = Settings( # default
             ts_shape="long",  # tidy data
@@ -39,19 +81,54 @@ class WeatherData():
             ts_si_units=True  # convert values to SI units
         )
         request = DwdObservationRequest(
-            parameter=['temperature_air_mean_200', 'radiation_global'],
+            parameter=list(self.PARAMETERS),
             resolution=DwdObservationResolution.HOURLY,
             start_date=self.start_date,
-            end_date=self.end_date, 
+            end_date=self.end_date,
             settings=settings
             ).filter_by_station_id(station_id=(self.station_id))
         self.station = request.df
 
-        self.data = request.values.all().df.to_pandas()
-        self.data = self.data.pivot_table(values='value', columns='dataset', index='date')
+        return request.values.all().df.to_pandas()
+
+    def load(self) -> pd.DataFrame:
+        """
+        Liefert die Wetterdaten als ClimateSource, lädt sie beim ersten Aufruf.
+        """
+        if self.data is None:
+            self.load_data()
+        return self.data
+
+    def load_data(self):
+        """
+        Lädt die Wetterdaten, bevorzugt aus dem Cache.
+        """
+
+        params = self._cache_params()
+
+        if self.cache is not None:
+            key = self.cache.key(**params)
+            data = self.cache.load(key, allow_stale=self.offline)
+            if data is not None:
+                self.data = data
+                return
+
+        if self.offline:
+            raise LookupError(f"no cached weather data for station {self.station_id} "
+                              f"({self.start_date:%Y-%m-%d} - {self.end_date:%Y-%m-%d}) available offline")
+
+        if self.fetcher is not None:
+            values = self.fetcher(self.station_id, list(self.PARAMETERS), self.start_date, self.end_date)
+        else:
+            values = self._fetch()
+
+        self.data = values.pivot_table(values='value', columns='dataset', index='date')
 
         # rename parameters
         self._rename_columns()
 
         # convert units
-        self._convert_units()
\ No newline at end of file
+        self._convert_units()
+
+        if self.cache is not None:
+            self.cache.store(key, self.data, params=params)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+
+FRAME_FRACTION = 0.3 # Rahmenanteil von Fenstern
+NON_PERPENDICULAR = 0.9 # Abminderung des g-Werts für nicht senkrechten Strahlungseinfall (F_W, DIN V 18599-2)
+
+
+def schedule_values(schedule, index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Wertet einen Nutzungsplan für alle Zeitstempel aus.
+    :param schedule: None (immer 1), Skalar, 24 Werte je Stunde des Tages, 7 x 24 Werte je Wochentag (Montag zuerst)
+                     und Stunde, pd.Series mit Zeitstempeln oder Array mit einem Wert je Zeitschritt.
+    :param index: Zeitstempel der Klimadaten.
+    :return: Array der Faktoren je Zeitschritt.
+    """
+    n = len(index)
+    if schedule is None:
+        return np.ones(n)
+    if isinstance(schedule, pd.Series):
+        return schedule.reindex(index).to_numpy(dtype=np.float64)
+
+    schedule = np.asarray(schedule, dtype=np.float64)
+    if schedule.ndim == 0:
+        return np.full(n, float(schedule))
+
+    index = pd.DatetimeIndex(index)
+    if schedule.shape == (24,):
+        return schedule[index.hour.to_numpy()]
+    if schedule.shape == (7, 24):
+        return schedule[index.dayofweek.to_numpy(), index.hour.to_numpy()]
+    if schedule.shape == (n,):
+        return schedule
+
+    raise ValueError(f"schedule of shape {schedule.shape} does not match 24 hours, 7 x 24 hours or {n} timesteps")
+
+
+class InternalGain:
+    def __init__(self, name: str, power: float, schedule=None):
+        """
+        Interne Wärmequelle, z.B. Personen oder Geräte.
+        :param name: Name der Wärmequelle.
+        :param power: Wärmeleistung bei voller Nutzung in W.
+        :param schedule: Nutzungsplan (Anteil von power), siehe schedule_values.
+        """
+        self.name = name
+        self.power = power
+        self.schedule = schedule
+
+    def __repr__(self):
+
+        return f"InternalGain({self.name!r}, power={self.power})"
+
+    def energy(self, index: pd.DatetimeIndex, step_hours: float = 1.0) -> np.ndarray:
+        """
+        Wärmeeintrag je Zeitschritt in kWh.
+        """
+        return schedule_values(self.schedule, index) * (self.power * step_hours / 1000)
+
+
+def window_solar_gains(windows: list, climate_data: pd.DataFrame, latitude: float, longitude: float,
+                       step_hours: float = 1.0) -> np.ndarray:
+    """
+    Solare Wärmegewinne durch Fenster für alle Zeitschritte:
+    Q = G_Ebene · A · (1 - Rahmenanteil) · F_W · g · F_s.
+    Fenster ohne g-Wert oder Ausrichtung liefern keine Gewinne.
+    :param windows: Liste von Fenstern.
+    :param climate_data: DataFrame mit DatetimeIndex und der Spalte 'radiation'.
+    :param latitude: Geographische Breite in Grad.
+    :param longitude: Geographische Länge in Grad.
+    :param step_hours: Länge eines Zeitschritts in Stunden.
+    :return: Array (Zeitschritte x Fenster) der Gewinne in kWh.
+    """
+    from .solar import plane_of_array
+
+    gains = np.zeros((len(climate_data), len(windows)), dtype=np.float64)
+    for j, window in enumerate(windows):
+        if window.g_value is None or window.azimuth is None:
+            continue
+        poa = plane_of_array(climate_data, latitude, longitude, window.tilt, window.azimuth, step_hours=step_hours)
+        np.multiply(poa, window.area * (1 - window.frame_fraction) * NON_PERPENDICULAR * window.g_value * window.shading,
+                    out=gains[:, j])
+    return gains
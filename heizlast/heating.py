@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 
 from .buffer import *
+from .dispatch import DISPATCH_SUPPLY, DISPATCH_DEMAND, run_dispatch
 
 
 class HeatingSystem:
@@ -27,10 +29,20 @@ class HeatingSystemGas(HeatingSystem):
         energy_provided = min(energy_needed, self.max_power)
         return energy_provided * self.efficiency
 
+    def dispatch_profile(self, solar_radiation: np.ndarray) -> tuple:
+        """
+        Kennwerte des Systems für den vektorisierten Dispatch.
+        :param solar_radiation: Array der Globalstrahlung.
+        :return: Betriebsart, Maximalleistung und Effizienz je Zeitschritt.
+        """
+        n = len(solar_radiation)
+        return DISPATCH_DEMAND, np.full(n, self.max_power, dtype=np.float64), np.full(n, self.efficiency, dtype=np.float64)
+
 class HeatingSystemSolar:
     def __init__(self, name: str, efficiency: float, module_power_wp: float, num_modules: int,  module_area: float = 2.0):
         """
-        Initialisiert das Solarheizungssystem.
+        Initialisiert das Solarheizungssystem. Einfache Abschätzung aus der Horizontalstrahlung ohne Neigung,
+        Ausrichtung und temperaturabhängigen Wirkungsgrad, siehe solar.SolarThermalCollector.
         :param name: Name des Heizungssystems.
         :param efficiency: Effizienz des Heizungssystems.
         :param module_power_wp: Leistung eines Solarmoduls in Wp.
@@ -45,7 +57,7 @@ class HeatingSystemSolar:
     def provide_energy(self, solar_radiation: float) -> float:
         """
         Berechnet die bereitgestellte Solarenergie in kWh basierend auf der Globalstrahlung.
-        :param solar_radiation: Globalstrahlung in W/m².
+        :param solar_radiation: Globalstrahlung in kWh/m² je Zeitschritt.
         :return: Bereitgestellte Solarenergie in kWh.
         """
         # Gesasmtfläche
@@ -57,24 +69,200 @@ class HeatingSystemSolar:
         solar_energy_kwh = total_power_wp * solar_radiation * self.efficiency
         return solar_energy_kwh
 
-    
+    def dispatch_profile(self, solar_radiation: np.ndarray) -> tuple:
+        """
+        Kennwerte des Systems für den vektorisierten Dispatch.
+        Der Solarertrag wird in einem Schritt für die gesamte Serie berechnet.
+        :param solar_radiation: Array der Globalstrahlung.
+        :return: Betriebsart, Solarertrag und Effizienz je Zeitschritt.
+        """
+        return DISPATCH_SUPPLY, self.provide_energy(solar_radiation), np.ones(len(solar_radiation))
+
+
+class HeatingSystemHeatPump(HeatingSystem):
+    MODES = ('parallel', 'alternative')
+
+    def __init__(self, name: str, rated_power: float, rated_cop: float = 3.5, supply_temp=35.0,
+                 capacity_slope: float = 0.03, max_cop: float = 7.0, min_operating_temp: float = -20.0,
+                 bivalence_temp: float = None, mode: str = 'parallel',
+                 defrost_loss: float = 0.1, defrost_temp: float = 0.0, defrost_range: float = 7.0):
+        """
+        Luft-Wasser-Wärmepumpe. Leistungszahl und Maximalleistung hängen von Außen- und Vorlauftemperatur ab und
+        werden mit prepare für die gesamte Klimaserie vorab berechnet:
+        COP = g·T_VL/(T_VL - T_a) (T_VL in K), der Gütegrad g folgt aus rated_cop bei A2/W35,
+        Q_max = rated_power·(1 + capacity_slope·(T_a - 2)).
+        :param name: Name des Heizungssystems.
+        :param rated_power: Heizleistung bei A2/W35 in kW.
+        :param rated_cop: Leistungszahl bei A2/W35.
+        :param supply_temp: Vorlauftemperatur in °C oder eine Funktion (Heizkurve), die sie aus einem Array der
+                            Außentemperatur berechnet.
+        :param capacity_slope: Relative Änderung der Maximalleistung je K Außentemperatur.
+        :param max_cop: Obergrenze der Leistungszahl.
+        :param min_operating_temp: Einsatzgrenze in °C, darunter ist die Wärmepumpe aus.
+        :param bivalence_temp: Bivalenzpunkt in °C, im Modus 'alternative' ist die Wärmepumpe darunter aus und
+                               nachfolgende Heizungssysteme übernehmen. Im Modus 'parallel' ohne Wirkung.
+        :param mode: 'parallel' (Zusatzheizung deckt die Differenz) oder 'alternative'.
+        :param defrost_loss: Maximaler Anteil der Wärme, der für das Abtauen verloren geht.
+        :param defrost_temp: Außentemperatur in °C mit dem größten Abtauverlust.
+        :param defrost_range: Abstand in K von defrost_temp, ab dem nicht mehr abgetaut wird.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"unknown mode '{mode}', expected one of {self.MODES}")
+
+        self.name = name
+        self.rated_power = rated_power
+        self.rated_cop = rated_cop
+        self.supply_temp = supply_temp
+        self.capacity_slope = capacity_slope
+        self.max_cop = max_cop
+        self.min_operating_temp = min_operating_temp
+        self.bivalence_temp = bivalence_temp
+        self.mode = mode
+        self.defrost_loss = defrost_loss
+        self.defrost_temp = defrost_temp
+        self.defrost_range = defrost_range
+
+        # Gütegrad aus dem Nennpunkt A2/W35
+        self.carnot_efficiency = rated_cop * (35.0 - 2.0) / (35.0 + 273.15)
+
+        self.capacity = None
+        self.cop = None
+        self.defrost = None
+
+    def _supply_temperature(self, air_temperature: np.ndarray) -> np.ndarray:
+
+        if callable(self.supply_temp):
+            return np.asarray(self.supply_temp(air_temperature), dtype=np.float64)
+        return np.full_like(air_temperature, self.supply_temp)
+
+    def coefficient_of_performance(self, air_temperature: np.ndarray, supply_temperature: np.ndarray = None) -> np.ndarray:
+        """
+        Leistungszahl ohne Abtauverluste, zwischen 1 und max_cop.
+        :param air_temperature: Array der Außentemperatur in °C.
+        :param supply_temperature: Array der Vorlauftemperatur in °C, Standard ist supply_temp.
+        """
+        air_temperature = np.asarray(air_temperature, dtype=np.float64)
+        if supply_temperature is None:
+            supply_temperature = self._supply_temperature(air_temperature)
+
+        lift = np.clip(supply_temperature - air_temperature, 1.0, None)
+        return np.clip(self.carnot_efficiency * (supply_temperature + 273.15) / lift, 1.0, self.max_cop)
+
+    def max_heat_output(self, air_temperature: np.ndarray) -> np.ndarray:
+        """
+        Maximale Heizleistung in kW, 0 unterhalb der Einsatzgrenze bzw. im Modus 'alternative' unterhalb
+        des Bivalenzpunkts.
+        :param air_temperature: Array der Außentemperatur in °C.
+        """
+        air_temperature = np.asarray(air_temperature, dtype=np.float64)
+
+        capacity = self.rated_power * np.clip(1 + self.capacity_slope * (air_temperature - 2.0), 0.0, None)
+        capacity[air_temperature < self.min_operating_temp] = 0.0
+        if self.mode == 'alternative' and self.bivalence_temp is not None:
+            capacity[air_temperature < self.bivalence_temp] = 0.0
+        return capacity
+
+    def defrost_fraction(self, air_temperature: np.ndarray) -> np.ndarray:
+        """
+        Anteil der Wärme, der für das Abtauen verloren geht (dreieckförmig um defrost_temp).
+        :param air_temperature: Array der Außentemperatur in °C.
+        """
+        distance = np.abs(np.asarray(air_temperature, dtype=np.float64) - self.defrost_temp)
+        return self.defrost_loss * np.clip(1 - distance / self.defrost_range, 0.0, None)
+
+    def balance_point(self, heat_loss_coefficient: float, Tinner: float = 20.0) -> float:
+        """
+        Bivalenzpunkt, ab dem die Maximalleistung den Wärmeverlust H·(Tinner - T_a) deckt (Raster 0.1 K).
+        :param heat_loss_coefficient: Wärmeverlustkoeffizient des Hauses in W/K.
+        :param Tinner: Innentemperatur in °C.
+        :return: Außentemperatur in °C, NaN falls die Wärmepumpe den Bedarf nie deckt.
+        """
+        air_temperature = np.round(np.arange(-30.0, Tinner, 0.1), 1)
+        load = heat_loss_coefficient * (Tinner - air_temperature) / 1000
+        covered = self.max_heat_output(air_temperature) * (1 - self.defrost_fraction(air_temperature)) >= load
+
+        # oberhalb der letzten Unterdeckung
+        uncovered = np.flatnonzero(~covered)
+        if len(uncovered) == 0:
+            return float(air_temperature[0])
+        if uncovered[-1] + 1 == len(air_temperature):
+            return np.nan
+        return float(air_temperature[uncovered[-1] + 1])
+
+    def prepare(self, climate_data: pd.DataFrame, latitude: float = None, longitude: float = None,
+                step_hours: float = 1.0):
+        """
+        Berechnet Maximalleistung, Leistungszahl und Abtauverluste für alle Zeitschritte der Klimaserie.
+        :param climate_data: DataFrame mit der Spalte 'Tair'.
+        :param latitude: Nicht benötigt, Signatur wie SolarThermalCollector.prepare.
+        :param longitude: Nicht benötigt.
+        :param step_hours: Nicht benötigt, die Maximalleistung wird in run_dispatch umgerechnet.
+        :return: Array der Maximalleistung in kW.
+        """
+        air_temperature = climate_data['Tair'].to_numpy(dtype=np.float64)
+
+        # fehlende Temperaturen: Wärmepumpe aus
+        self.capacity = np.nan_to_num(self.max_heat_output(air_temperature), nan=0.0)
+        self.cop = self.coefficient_of_performance(air_temperature)
+        self.defrost = np.nan_to_num(self.defrost_fraction(air_temperature), nan=0.0)
+
+        return self.capacity
+
+    def dispatch_profile(self, solar_radiation: np.ndarray) -> tuple:
+        """
+        Kennwerte des Systems für den Dispatch, Maximalleistung und Abtauverluste stammen aus prepare.
+        :param solar_radiation: Array der Globalstrahlung, nur für die Länge der Serie.
+        :return: Betriebsart, Maximalleistung und Anteil der nutzbaren Wärme je Zeitschritt.
+        """
+        if self.capacity is None or len(self.capacity) != len(solar_radiation):
+            raise RuntimeError(f"{self.name}: call prepare() with the climate data before dispatch")
+
+        return DISPATCH_DEMAND, self.capacity, 1 - self.defrost
+
+    def electricity(self, heat: np.ndarray) -> np.ndarray:
+        """
+        Strombedarf für die bereitgestellte Wärme.
+        :param heat: Array der bereitgestellten Wärme in kWh je Zeitschritt (nach Abtauverlusten).
+        :return: Array des Strombedarfs in kWh.
+        """
+        heat = np.asarray(heat, dtype=np.float64)
+        effective_cop = self.cop * (1 - self.defrost)
+        return np.divide(heat, effective_cop, out=np.zeros_like(heat), where=effective_cop > 0)
+
+
 class MultiHeatingSystem:
-    def __init__(self, buffer_tank: BufferTank, systems: list):
+    ENGINES = ('python', 'numpy')
+
+    def __init__(self, buffer_tank: BufferTank, systems: list, engine: str = 'python'):
         """
         Initialisiert das Multi-Heizungssystem.
         :param buffer_tank: Instanz des Pufferspeichers.
         :param systems: Liste der Heizungssysteme (mit Priorität).
+        :param engine: Berechnungskern, 'python' (Schleife über die Zeitschritte) oder 'numpy' (Array-basiert).
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"unknown engine '{engine}', expected one of {self.ENGINES}")
+
         self.buffer_tank = buffer_tank
         self.systems = systems
+        self.engine = engine
 
-    def operate_heating(self, energy_needed_series: pd.Series, solar_radiation_series: pd.Series) -> pd.DataFrame:
+    def operate_heating(self, energy_needed_series: pd.Series, solar_radiation_series: pd.Series, engine: str = None) -> pd.DataFrame:
         """
         Simuliert die Heizungssteuerung für eine Serie von Energiebedarfswerten.
         :param energy_needed_series: Serie von Energiebedarfswerten in kWh.
-        :param solar_radiation_series: Serie von Globalstrahlung in W/m².
-        :return: DataFrame mit tatsächlich bereitgestellten Heizenergiewerten in kWh für jedes Heizungssystem.
+        :param solar_radiation_series: Serie von Globalstrahlung in kWh/m² je Zeitschritt.
+        :param engine: Überschreibt den Berechnungskern des Systems ('python' oder 'numpy').
+        :return: DataFrame mit tatsächlich bereitgestellten Heizenergiewerten in kWh für jedes Heizungssystem und
+                 für Systeme mit Strombedarf (z.B. Wärmepumpen) einer Spalte '<Name>_electricity' in kWh.
         """
+        engine = self.engine if engine is None else engine
+        if engine not in self.ENGINES:
+            raise ValueError(f"unknown engine '{engine}', expected one of {self.ENGINES}")
+
+        if engine == 'numpy':
+            return self._operate_heating_numpy(energy_needed_series, solar_radiation_series)
+
         results = {
             'time': energy_needed_series.index,
             'energy_needed': energy_needed_series,
@@ -85,16 +273,32 @@ class MultiHeatingSystem:
         for system in self.systems:
             results[system.name] = []
 
-        for timestamp, energy_needed in energy_needed_series.items():
+        # Angebot der Systeme mit vorgegebenem Ertrag (z.B. Solar) bzw. zeitabhängige Maximalleistung und
+        # Effizienz (z.B. Wärmepumpe) vorab für die gesamte Serie
+        solar_radiation = self._solar_radiation(energy_needed_series.index, solar_radiation_series)
+        profiles = []
+        for system in self.systems:
+            kind, supply, efficiency = system.dispatch_profile(solar_radiation)
+            if kind == DISPATCH_SUPPLY:
+                profiles.append((supply.tolist(), None))
+            elif hasattr(system, 'provide_energy'):
+                profiles.append((None, None))
+            else:
+                profiles.append((supply.tolist(), efficiency.tolist()))
+
+        for i, energy_needed in enumerate(energy_needed_series.to_numpy().tolist()):
+            self.buffer_tank.standing_loss()
             energy_from_buffer = self.buffer_tank.draw_energy(energy_needed)
             energy_deficit = energy_needed - energy_from_buffer
             results['buffer_energy'].append(energy_from_buffer)
             
-            for system in self.systems:
+            for system, (supply, efficiency) in zip(self.systems, profiles):
                 energy_provided = 0
-                if isinstance(system, HeatingSystemSolar):
-                    solar_radiation = solar_radiation_series[timestamp]
-                    energy_provided = system.provide_energy(solar_radiation)
+                if efficiency is not None:
+                    if energy_deficit > 0:
+                        energy_provided = min(energy_deficit, supply[i]) * efficiency[i]
+                elif supply is not None:
+                    energy_provided = supply[i]
                     if energy_deficit > 0:
                         energy_provided = min(energy_provided, energy_deficit)
                 else:
@@ -110,4 +314,50 @@ class MultiHeatingSystem:
             provided_energy = energy_needed - energy_deficit
             results['provided_energy'].append(provided_energy)
 
+        self._add_electricity(results)
+
+        return pd.DataFrame(results).set_index('time')
+
+    def _add_electricity(self, results: dict):
+        """
+        Ergänzt den Strombedarf der Systeme mit einer Methode electricity als Spalten '<Name>_electricity'.
+        """
+        for system in self.systems:
+            if hasattr(system, 'electricity'):
+                results[f'{system.name}_electricity'] = system.electricity(results[system.name])
+
+    @staticmethod
+    def _solar_radiation(index: pd.Index, solar_radiation_series: pd.Series) -> np.ndarray:
+
+        if solar_radiation_series.index.equals(index):
+            return solar_radiation_series.to_numpy(dtype=np.float64)
+        return solar_radiation_series.loc[index].to_numpy(dtype=np.float64)
+
+    def _operate_heating_numpy(self, energy_needed_series: pd.Series, solar_radiation_series: pd.Series) -> pd.DataFrame:
+        """
+        Array-basierte Variante von operate_heating mit identischem Ergebnis.
+        """
+        index = energy_needed_series.index
+        solar_radiation = self._solar_radiation(index, solar_radiation_series)
+
+        dispatch = run_dispatch(self.buffer_tank, self.systems,
+                                energy_needed=energy_needed_series.to_numpy(dtype=np.float64),
+                                solar_radiation=solar_radiation)
+
+        results = {
+            'time': index,
+            'energy_needed': energy_needed_series,
+            'buffer_energy': dispatch['buffer_energy'],
+            'provided_energy': dispatch['provided_energy'],
+        }
+
+        for j, system in enumerate(self.systems):
+            energy_provided = dispatch['systems'][j]
+            if dispatch['kinds'][j] != DISPATCH_SUPPLY and not dispatch['touched'][j]:
+                # die Schleife liefert in diesem Fall nur die Ganzzahl 0
+                energy_provided = energy_provided.astype(np.int64)
+            results[system.name] = energy_provided
+
+        self._add_electricity(results)
+
         return pd.DataFrame(results).set_index('time')
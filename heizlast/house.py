@@ -1,23 +1,46 @@
+import copy
+import logging
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 from .buffer import *
 from .heating import *
+from .climate import ClimateSource
+from .diagnostics import log_event, run_stages
+from .profiling import NULL_PROFILER, as_profiler
+from .moisture import saturation_vapour_pressure
+from .calc import DESIGN_OUTDOOR_TEMPERATURE, component_ua, mean_u_value, design_heat_load
+from .gains import FRAME_FRACTION, InternalGain, window_solar_gains
+from .ventilation import Ventilation
+
+logger = logging.getLogger(__name__)
 
 class Layer:
+    __slots__ = ('name', 'thickness', 'thermal_conductivity', 'is_air', 'vapour_diffusion_resistance',
+                 'density', 'specific_heat_capacity', 'R', 'U')
+
     def __init__(self, name:str, thickness: float, 
                 thermal_conductivity: float = None, 
-                is_air: bool = False):
+                is_air: bool = False,
+                vapour_diffusion_resistance: float = None,
+                density: float = None,
+                specific_heat_capacity: float = None):
         """
         Initialisiert eine Schicht.
         :param thickness: Dicke der Schicht in mm.
         :param thermal_conductivity: Wärmeleitfähigkeit der Schicht in W/(m*K).
+        :param vapour_diffusion_resistance: Wasserdampf-Diffusionswiderstandszahl μ (für das Glaser-Verfahren).
+        :param density: Rohdichte in kg/m³ (für die instationäre Berechnung).
+        :param specific_heat_capacity: Spezifische Wärmekapazität in J/(kg*K) (für die instationäre Berechnung).
         """
         self.name = name
         self.thickness = thickness/1000
         self.thermal_conductivity = thermal_conductivity
         self.is_air = is_air
+        self.vapour_diffusion_resistance = vapour_diffusion_resistance
+        self.density = density
+        self.specific_heat_capacity = specific_heat_capacity
 
         self._run()
 
@@ -53,6 +76,15 @@ class Layer:
         self.U = 1/self.R
     
 
+    @property
+    def heat_capacity(self) -> float:
+        """
+        Flächenbezogene Wärmekapazität der Schicht in J/(m²*K), 0 falls Dichte oder Wärmekapazität fehlen.
+        """
+        if self.is_air or self.density is None or self.specific_heat_capacity is None:
+            return 0.0
+        return self.density * self.specific_heat_capacity * self.thickness
+
     def _run(self):
 
         self._calc_r_value()
@@ -63,6 +95,12 @@ class Layer:
 
 
 class Wall:
+    __slots__ = ('layers', 'name', 'area', 'r', 'thermal_resistance_inside', 'thermal_resistance_outside',
+                 'R', 'U', 'thickness', 'layer_data', '_info')
+
+    # Zeilen von layer_data
+    LAYER_FIELDS = ('thickness', 'thermal_conductivity', 'R', 'vapour_diffusion_resistance', 'heat_capacity')
+
     def __init__(self, name, area, 
                  r: float = 1.0,
                  thermal_resistance_inside:float = 0.13, 
@@ -78,6 +116,9 @@ class Wall:
         self.thermal_resistance_inside = thermal_resistance_inside
         self.thermal_resistance_outside = thermal_resistance_outside
 
+        self.layer_data = np.empty((len(self.LAYER_FIELDS), 0))
+        self._info = None
+
     def __str__(self):
 
         return f"name: {self.name}, area: {self.area:0.2f} qm, Rsi: {self.thermal_resistance_inside}, Rse: {self.thermal_resistance_outside}"
@@ -93,6 +134,40 @@ class Wall:
     def set_thermal_resistance_outside(self, value:float):
         
         self.thermal_resistance_outside = value
+
+    def _layer_index(self, name: str) -> int:
+
+        for i, layer in enumerate(self.layers):
+            if layer.name == name:
+                return i
+        raise KeyError(f"{self.name}: no layer named '{name}'")
+
+    def set_layer_thickness(self, name: str, thickness: float):
+        """
+        Ändert die Dicke einer Schicht und berechnet die Wand neu. Die Schicht wird kopiert, da Bauteile aus
+        einem gemeinsamen Aufbau (materials.Construction) dieselben Schichten verwenden.
+        :param name: Name der Schicht.
+        :param thickness: Neue Dicke in mm.
+        """
+        index = self._layer_index(name)
+        layer = copy.copy(self.layers[index])
+        layer.thickness = thickness/1000
+        layer._run()
+        self.layers[index] = layer
+
+        self._pack_layers()
+        self.run()
+
+    def replace_layer(self, name: str, layer):
+        """
+        Ersetzt eine Schicht und berechnet die Wand neu.
+        :param name: Name der zu ersetzenden Schicht.
+        :param layer: Neue Instanz von Layer.
+        """
+        self.layers[self._layer_index(name)] = layer
+
+        self._pack_layers()
+        self.run()
         
     
     def add_layers(self, layers: list):
@@ -101,22 +176,36 @@ class Wall:
         :param layers: Eine Liste von Instanzen der Klasse Layer.
         """
         self.layers.extend(layers)
-        print(self.layers)
+        self._pack_layers()
+        log_event(logger, 'layers_added', component=self.name, n_layers=len(self.layers))
+
+    def _pack_layers(self):
+        """
+        Legt Dicke (m), Wärmeleitfähigkeit (W/(m*K), NaN bei Luftschichten), R-Wert, μ (NaN, falls unbekannt)
+        und Wärmekapazität (J/(m²*K)) aller Schichten als Array (LAYER_FIELDS x Anzahl Schichten) ab, Summen
+        der Wand werden daraus per Array-Reduktion gebildet.
+        """
+        self.layer_data = np.array([
+            [layer.thickness for layer in self.layers],
+            [np.nan if layer.thermal_conductivity is None else layer.thermal_conductivity for layer in self.layers],
+            [layer.R for layer in self.layers],
+            [np.nan if layer.vapour_diffusion_resistance is None else layer.vapour_diffusion_resistance for layer in self.layers],
+            [layer.heat_capacity for layer in self.layers],
+            ], dtype=np.float64).reshape(len(self.LAYER_FIELDS), len(self.layers))
+        self._info = None
     
     def _calculate_R_value(self):
         """
         Berechnet den R-Wert der Wand in W/(m²*K).
         
         """
-        total_r_value = sum(layer.R for layer in self.layers)
+        total_r_value = float(self.layer_data[2].sum())
 
         total_r_value += self.thermal_resistance_inside
         total_r_value += self.thermal_resistance_outside
 
         self.R = total_r_value if total_r_value != 0 else float('inf')
 
-        print('R-Wert der Wand:', self.R)
-
     def _calculate_U_value(self):
         """
         Berechnet den U-Wert der Wand in (m²*K)/W.
@@ -129,33 +218,43 @@ class Wall:
         Berechnet die Gesamtdicke des Bauteils
         :return: Dicke in mm
         """
-        self.thickness = sum(layer.thickness for layer in self.layers)*1000
+        self.thickness = float(self.layer_data[0].sum())*1000
     
     
     
     def _calc_info(self):
 
-        print('calc info')
-        
-        data = [{'name': layer.name, 
-                'thickness': layer.thickness, 
-                'lamda': layer.thermal_conductivity,
-                'R-Value': layer.R,
-                'U-Value': layer.U,
-                } for layer in self.layers]
-        
-        df = pd.DataFrame(data)
-        
-        df = df.set_index('name')
-        self.info = df
+        thickness, thermal_conductivity, R = self.layer_data[:3]
+
+        df = pd.DataFrame({
+            'thickness': thickness,
+            'lamda': thermal_conductivity,
+            'R-Value': R,
+            'U-Value': 1/R,
+            }, index=pd.Index([layer.name for layer in self.layers], name='name'))
+
+        self._info = df
+
+    @property
+    def info(self) -> pd.DataFrame:
+        """
+        Übersicht der Schichten, das DataFrame wird erst beim ersten Zugriff erstellt.
+        """
+        if self._info is None:
+            self._calc_info()
+        return self._info
 
     def run(self):
 
-        self._calculate_R_value()
-        self._calculate_U_value()
-        self._calculate_thickness()
+        self._info = None
 
-        self._calc_info()
+        run_stages(logger, 'component_built', [
+            ('R_value', self._calculate_R_value),
+            ('U_value', self._calculate_U_value),
+            ('thickness', self._calculate_thickness),
+            ],
+            component=self.name, type=type(self).__name__,
+            R=lambda: self.R, U=lambda: self.U)
 
 
     def _calc_q(self, Ti, To):
@@ -164,28 +263,78 @@ class Wall:
 
         return deltaT / self.R
 
-    def _calc_temperature_wall(self, Ti, To) -> []:
+    @property
+    def interfaces(self) -> list:
+        """
+        Namen der Grenzflächen in den Spalten von temperature_profile:
+        Innenoberfläche, danach jeweils die Grenzfläche hinter der genannten Schicht.
+        """
+        return ['Innenwand (Oberfläche)'] + [layer.name for layer in self.layers]
 
-        temperatures = [dict(name='Innentemperatur', value=Ti, x=0)]
+    def temperature_profile(self, Ti, To) -> np.ndarray:
+        """
+        Temperaturen an allen Grenzflächen der Wand für beliebig viele Randbedingungen,
+        aus den kumulierten R-Werten der Schichten.
+        :param Ti: Innentemperatur in °C, Skalar oder Array.
+        :param To: Außentemperatur in °C, Skalar oder Array.
+        :return: Array (Zeitschritte x Grenzflächen) in °C, Spalten wie in interfaces.
+        """
+        Ti = np.atleast_1d(np.asarray(Ti, dtype=np.float64))
+        To = np.atleast_1d(np.asarray(To, dtype=np.float64))
+
+        sum_R = np.empty(len(self.layers) + 1)
+        sum_R[0] = self.thermal_resistance_inside
+        np.cumsum(self.layer_data[2], out=sum_R[1:])
+        sum_R[1:] += self.thermal_resistance_inside
 
         q = self._calc_q(Ti, To)
 
-        # Innenwiderstand
-        theta_i = Ti - q*self.thermal_resistance_inside
+        return Ti[:, None] - q[:, None] * sum_R[None, :]
 
-        temperatures.append(dict(name='Innenwand (Oberfläche)', value=theta_i, x=0))
+    def condensation_check(self, Ti, To, rh_inside=0.5, rh_outside=0.8) -> np.ndarray:
+        """
+        Prüft an allen Grenzflächen, ob Tauwasser ausfallen kann.
+        Sind für alle Schichten μ-Werte angegeben, wird der Dampfdruck wie im Glaser-Verfahren linear über die
+        diffusionsäquivalenten Luftschichtdicken sd = μ·d verteilt und mit dem Sättigungsdampfdruck verglichen.
+        Ohne μ-Werte wird die Temperatur jeder Grenzfläche mit dem Taupunkt der Raumluft verglichen.
+        :param Ti: Innentemperatur in °C, Skalar oder Array.
+        :param To: Außentemperatur in °C, Skalar oder Array.
+        :param rh_inside: Relative Luftfeuchte innen (0 bis 1), Skalar oder Array.
+        :param rh_outside: Relative Luftfeuchte außen (0 bis 1), Skalar oder Array.
+        :return: Boolesches Array (Zeitschritte x Grenzflächen), True bei Tauwassergefahr.
+        """
+        theta = self.temperature_profile(Ti, To)
+        p_sat = saturation_vapour_pressure(theta)
 
+        Ti = np.atleast_1d(np.asarray(Ti, dtype=np.float64))
+        To = np.atleast_1d(np.asarray(To, dtype=np.float64))
+        p_i = np.asarray(rh_inside) * saturation_vapour_pressure(Ti)
 
-        # Schichten
+        sd = self.layer_data[0] * self.layer_data[3]
+        if len(sd) == 0 or np.isnan(sd).any():
+            return p_sat < p_i[:, None]
 
-        for i, l in enumerate(self.layers):
+        p_e = np.asarray(rh_outside) * saturation_vapour_pressure(To)
+        sum_sd = np.concatenate(([0.0], np.cumsum(sd)))
+        p = p_i[:, None] - (p_i - p_e)[:, None] * (sum_sd / sum_sd[-1])[None, :]
 
-            selLayer = self.layers[0:i+1]
-            sumR = self.thermal_resistance_inside + sum([l.R for l in selLayer ])
+        return p > p_sat
 
-            theta_i = Ti - q*sumR
+    def _calc_temperature_wall(self, Ti, To) -> []:
+
+        temperatures = [dict(name='Innentemperatur', value=Ti, x=0)]
+
+        q = self._calc_q(Ti, To)
+
+        theta = self.temperature_profile(Ti, To)[0]
+
+        # Innenwiderstand
+        temperatures.append(dict(name='Innenwand (Oberfläche)', value=theta[0], x=0))
+
+        # Schichten
+        for l, theta_i, x in zip(self.layers, theta[1:], np.cumsum(self.layer_data[0])):
 
-            temperatures.append(dict(name=l.name, value=theta_i, x=temperatures[-1]['x'] + l.thickness))
+            temperatures.append(dict(name=l.name, value=theta_i, x=x))
 
 
         # Außenwiderstand
@@ -202,9 +351,12 @@ class Wall:
 
     def plot_temperature(self, Ti: float = 20.0, To: float = -5.0):
 
+        import matplotlib.pyplot as plt
+
         temperatures = self._calc_temperature_wall(Ti, To)
 
-        print(temperatures)
+        log_event(logger, 'temperature_profile', component=self.name,
+                  temperatures=[(t['name'], round(t['value'], 2)) for t in temperatures])
 
         fig, ax = plt.subplots()
 
@@ -230,53 +382,68 @@ class Wall:
         plt.show()
 
 class Roof(Wall):
+    __slots__ = ()
+
     def __init__(self, name, area, 
                  r: float = 1.0,
                  thermal_resistance_inside:float = 0.13, thermal_resistance_outside:float = 0.04):
         """
-        Initialisiert eine Wand mit einer Liste von Schichten.
+        Initialisiert ein Dach mit einer Liste von Schichten.
         """
-        self.layers = []
-        self.name = name
-        self.area = area
-        self.r = r
-
-        self.thermal_resistance_inside = thermal_resistance_inside
-        self.thermal_resistance_outside = thermal_resistance_outside
+        super().__init__(name=name, area=area, r=r,
+                         thermal_resistance_inside=thermal_resistance_inside,
+                         thermal_resistance_outside=thermal_resistance_outside)
 
 class Ceiling(Wall):
+    __slots__ = ()
+
     def __init__(self, name, area, 
                  r: float = 1.0,
                  thermal_resistance_inside:float = 0.13, thermal_resistance_outside:float = 0.04):
         """
-        Initialisiert eine Wand mit einer Liste von Schichten.
+        Initialisiert eine Decke mit einer Liste von Schichten.
         """
-        self.layers = []
-        self.name = name
-        self.area = area
-        self.r = r
-
-
-        self.thermal_resistance_inside = thermal_resistance_inside
-        self.thermal_resistance_outside = thermal_resistance_outside
+        super().__init__(name=name, area=area, r=r,
+                         thermal_resistance_inside=thermal_resistance_inside,
+                         thermal_resistance_outside=thermal_resistance_outside)
 
 class Window(Wall):
+    __slots__ = ('number', 'g_value', 'azimuth', 'tilt', 'frame_fraction', 'shading')
+
     def __init__(self, name, area, thermal_conductivity: float, number:int,
                  r: float = 1.0,
-                 thermal_resistance_inside:float = 0.13, thermal_resistance_outside:float = 0.04):
+                 thermal_resistance_inside:float = 0.13, thermal_resistance_outside:float = 0.04,
+                 g_value: float = None, azimuth: float = None, tilt: float = 90.0,
+                 frame_fraction: float = FRAME_FRACTION, shading: float = 1.0):
         """
-        Initialisiert eine Wand mit einer Liste von Schichten.
+        Initialisiert ein Fenster mit vorgegebenem U-Wert.
+        :param g_value: Gesamtenergiedurchlassgrad der Verglasung, ohne Angabe keine solaren Gewinne.
+        :param azimuth: Ausrichtung in Grad von Nord über Ost (180 = Süd), ohne Angabe keine solaren Gewinne.
+        :param tilt: Neigung in Grad (90 = senkrecht).
+        :param frame_fraction: Rahmenanteil an der Fensterfläche.
+        :param shading: Abminderungsfaktor für Verschattung und Sonnenschutz (1 = unverschattet).
         """
-        
-        self.name = name
-        self.area = area
+        super().__init__(name=name, area=area, r=r,
+                         thermal_resistance_inside=thermal_resistance_inside,
+                         thermal_resistance_outside=thermal_resistance_outside)
+
         self.number = number
-        self.r = r
 
         self.U = thermal_conductivity
 
-        self.thermal_resistance_inside = thermal_resistance_inside
-        self.thermal_resistance_outside = thermal_resistance_outside
+        self.g_value = g_value
+        self.azimuth = azimuth
+        self.tilt = tilt
+        self.frame_fraction = frame_fraction
+        self.shading = shading
+
+    def set_u_value(self, value: float):
+        """
+        Ändert den U-Wert des Fensters und berechnet es neu.
+        :param value: U-Wert in W/(m²*K).
+        """
+        self.U = value
+        self.run()
 
     def add_layers(self, layers: list):
         """
@@ -293,8 +460,6 @@ class Window(Wall):
         """
         self.R = 1/self.U
 
-        print('R-Wert der Wand:', self.R)
-
     def _calculate_U_value(self):
         """
         Berechnet den U-Wert der Wand in (m²*K)/W.
@@ -321,80 +486,199 @@ class Window(Wall):
         df = pd.DataFrame(data)
         
         df = df.set_index('name')
-        self.info = df
+        self._info = df
+
+def _layer_from_info(info: dict) -> Layer:
+
+    if 'material' in info:
+        from .materials import material_layer
+
+        info = dict(info)
+        return material_layer(info.pop('material'), **info)
+    return Layer(**info)
+
+def build_component(cls, name: str, area: float, layers_info: list = None, r: float = 1.0,
+                    thermal_resistance_inside: float = 0.13, thermal_resistance_outside: float = 0.04,
+                    construction=None):
+    """
+    Erstellt und berechnet ein Bauteil mit Schichten.
+    :param cls: Klasse des Bauteils, z.B. Wall, Roof oder Ceiling.
+    :param area: Fläche in Quadratmetern.
+    :param layers_info: Eine Liste von Dictionaries, die die Schichten beschreiben. Dictionaries mit 'material'
+                        übernehmen die Kennwerte aus der Materialdatenbank (materials.material_layer).
+    :param construction: Aufbau aus dem Katalog (Name oder materials.Construction) anstelle von layers_info,
+                         R- und U-Wert sowie die Wärmeübergangswiderstände werden vom Aufbau übernommen.
+    :return: Instanz von cls.
+    """
+    if construction is not None:
+        if layers_info is not None:
+            raise ValueError(f"{name}: pass either layers_info or construction, not both")
+
+        from .materials import as_construction
+        return as_construction(construction).component(name, area, r=r, cls=cls)
+
+    if layers_info is None:
+        raise ValueError(f"{name}: layers_info or construction is required")
+
+    layers = [_layer_from_info(info) for info in layers_info]
+    component = cls(name=name, area=area, r=r)
+    component.add_layers(layers)
+    component.set_thermal_resistance_inside(thermal_resistance_inside)
+    component.set_thermal_resistance_outside(thermal_resistance_outside)
+    component.run()
+
+    return component
 
 class House:
     def __init__(self, 
                  climate_data: pd.DataFrame,
                  Tinner = 20.0, 
-                 T_heating=17.0
+                 T_heating=17.0,
+                 engine: str = 'python',
+                 latitude: float = 51.0,
+                 longitude: float = 10.0
                  ):
         """
         Initialisiert ein Haus
+        :param climate_data: DataFrame mit den Spalten 'Tair' und 'radiation' oder eine ClimateSource,
+                             die erst beim ersten Zugriff geladen wird.
+        :param engine: Berechnungskern der Heizungssteuerung, 'python' oder 'numpy'.
+        :param latitude: Geographische Breite des Standorts in Grad (für Sonnenstand und Solarerträge).
+        :param longitude: Geographische Länge des Standorts in Grad.
         """
         
         self.climate_data = climate_data
         self.Tinner = Tinner
         self.T_heating = T_heating
+        self.engine = engine
+        self.latitude = latitude
+        self.longitude = longitude
         
         self.components = []
         self.heating_systems = []
+        self.internal_gains = []
+        self.gains_ts = None
+        self.ventilation = None
 
-    
-    def add_wall(self, name:str, area: float, layers_info: list, 
+        self.profiler = NULL_PROFILER
+
+    @property
+    def climate_data(self) -> pd.DataFrame:
+        """
+        Klimadaten des Hauses, eine ClimateSource wird beim ersten Zugriff geladen.
+        """
+        if self._climate_data is None:
+            self._climate_data = self._climate_source.load()
+        return self._climate_data
+
+    @climate_data.setter
+    def climate_data(self, climate):
+
+        if isinstance(climate, ClimateSource):
+            self._climate_source = climate
+            self._climate_data = None
+        else:
+            self._climate_source = None
+            self._climate_data = climate
+
+        self._loss_cache = None
+
+    SPEC_METHODS = {
+        'walls': 'add_wall',
+        'ceilings': 'add_ceiling',
+        'roofs': 'add_roof',
+        'windows': 'add_window',
+        # Wärmepumpen vor der Zusatzheizung
+        'heat_pumps': 'add_heat_pump',
+        'gas_heating_systems': 'add_gas_heating_system',
+        'solar_heating_systems': 'add_solar_heating_system',
+        'solar_collectors': 'add_solar_collector',
+        'internal_gains': 'add_internal_gain',
+    }
+
+    @classmethod
+    def from_spec(cls, climate_data, spec: dict, **kwargs):
+        """
+        Erstellt ein Haus aus einer Spezifikation.
+        :param climate_data: DataFrame mit den Spalten 'Tair' und 'radiation' oder eine ClimateSource.
+        :param spec: Dictionary mit optional 'Tinner', 'T_heating', 'latitude', 'longitude', 'buffer' (Argumente
+                     von add_buffer), 'ventilation' (Argumente von add_ventilation) sowie Listen von Argumenten unter 'walls', 'ceilings', 'roofs', 'windows',
+                     'gas_heating_systems', 'solar_heating_systems', 'solar_collectors', 'heat_pumps' und
+                     'internal_gains'.
+        :param kwargs: Weitere Argumente für House, z.B. engine.
+        :return: Instanz von House.
+        """
+        for key in ('Tinner', 'T_heating', 'latitude', 'longitude'):
+            if spec.get(key) is not None:
+                kwargs[key] = spec[key]
+
+        house = cls(climate_data=climate_data, **kwargs)
+
+        for key, method in cls.SPEC_METHODS.items():
+            for info in spec.get(key) or []:
+                getattr(house, method)(**info)
+
+        if spec.get('buffer'):
+            house.add_buffer(**spec['buffer'])
+
+        if spec.get('ventilation'):
+            house.add_ventilation(**spec['ventilation'])
+
+        return house
+
+
+    def add_wall(self, name:str, area: float, layers_info: list = None, 
                  r: float = 1.0,
                 thermal_resistance_inside:float = 0.13, 
-                thermal_resistance_outside:float = 0.04):
+                thermal_resistance_outside:float = 0.04,
+                construction=None):
         """
         Fügt dem Haus eine Wand hinzu.
         :param area: Fläche der Wand in Quadratmetern.
         :param layers_info: Eine Liste von Dictionaries, die die Schichten beschreiben.
+        :param construction: Aufbau aus dem Katalog (Name oder materials.Construction) anstelle von layers_info.
         """
-        layers = [Layer(**info) for info in layers_info]
-        wall = Wall(name=name, area=area, r=r)
-        wall.add_layers(layers)
-        wall.set_thermal_resistance_inside(thermal_resistance_inside)
-        wall.set_thermal_resistance_outside(thermal_resistance_outside)
-        wall.run()
-        
+        wall = build_component(Wall, name, area, layers_info, r=r,
+                               thermal_resistance_inside=thermal_resistance_inside,
+                               thermal_resistance_outside=thermal_resistance_outside,
+                               construction=construction)
+
         self.components.append(wall)
-        print('add wall')
-        print(self.components)
+        log_event(logger, 'component_added', component=name, n_components=len(self.components))
     
-    def add_ceiling(self, name:str, area: float, layers_info: list, r: float = 1.0,
+    def add_ceiling(self, name:str, area: float, layers_info: list = None, r: float = 1.0,
                 thermal_resistance_inside:float = 0.13, 
-                thermal_resistance_outside:float = 0.04):
+                thermal_resistance_outside:float = 0.04,
+                construction=None):
         """
         Fügt dem Decke dem Haus hibzu
         :param area: Fläche der Decke in Quadratmetern.
         :param layers_info: Eine Liste von Dictionaries, die die Schichten beschreiben.
+        :param construction: Aufbau aus dem Katalog (Name oder materials.Construction) anstelle von layers_info.
         """
-        
-        layers = [Layer(**info) for info in layers_info]
-        roof = Ceiling(name=name, area=area, r=r)
-        roof.add_layers(layers)
-        roof.set_thermal_resistance_inside(thermal_resistance_inside)
-        roof.set_thermal_resistance_outside(thermal_resistance_outside)
-        roof.run()
-        
-        self.components.append(roof)
+        ceiling = build_component(Ceiling, name, area, layers_info, r=r,
+                                  thermal_resistance_inside=thermal_resistance_inside,
+                                  thermal_resistance_outside=thermal_resistance_outside,
+                                  construction=construction)
 
-    def add_roof(self, name: str, area: float, layers_info: list, 
+        self.components.append(ceiling)
+
+    def add_roof(self, name: str, area: float, layers_info: list = None, 
                  r: float = 1.0,
                 thermal_resistance_inside:float = 0.13, 
-                thermal_resistance_outside:float = 0.04):
+                thermal_resistance_outside:float = 0.04,
+                construction=None):
         """
         Fügt dem Haus eine Wand hinzu.
         :param area: Fläche der Wand in Quadratmetern.
         :param layers_info: Eine Liste von Dictionaries, die die Schichten beschreiben.
+        :param construction: Aufbau aus dem Katalog (Name oder materials.Construction) anstelle von layers_info.
         """
-        layers = [Layer(**info) for info in layers_info]
-        roof = Roof(name=name, area=area, r=r)
-        roof.add_layers(layers)
-        roof.set_thermal_resistance_inside(thermal_resistance_inside)
-        roof.set_thermal_resistance_outside(thermal_resistance_outside)
-        roof.run()
-        
+        roof = build_component(Roof, name, area, layers_info, r=r,
+                               thermal_resistance_inside=thermal_resistance_inside,
+                               thermal_resistance_outside=thermal_resistance_outside,
+                               construction=construction)
+
         self.components.append(roof)
 
     def add_window(self, name: str, area: float, 
@@ -402,12 +686,18 @@ class House:
                    thermal_conductivity: float,
                     r: float = 1.0,
                     thermal_resistance_inside:float = 0.13, 
-                    thermal_resistance_outside:float = 0.04
+                    thermal_resistance_outside:float = 0.04,
+                    g_value: float = None,
+                    azimuth: float = None,
+                    tilt: float = 90.0,
+                    frame_fraction: float = FRAME_FRACTION,
+                    shading: float = 1.0
                     ):
         """
         Fügt dem Haus eine Wand hinzu.
         :param area: Fläche der Wand in Quadratmetern.
         :param layers_info: Eine Liste von Dictionaries, die die Schichten beschreiben.
+        :param g_value: Gesamtenergiedurchlassgrad, mit azimuth für solare Gewinne (siehe Window).
         """
         
         w = Window(name=name, area=area, 
@@ -415,15 +705,33 @@ class House:
                       r = r,
                       thermal_conductivity=thermal_conductivity,
                       thermal_resistance_inside=thermal_resistance_inside,
-                      thermal_resistance_outside=thermal_resistance_outside
+                      thermal_resistance_outside=thermal_resistance_outside,
+                      g_value=g_value,
+                      azimuth=azimuth,
+                      tilt=tilt,
+                      frame_fraction=frame_fraction,
+                      shading=shading
                       )
         w.run()
         
         self.components.append(w)
 
-    def add_buffer(self, capacity_liters: float, initial_temp=20.0, min_temp=15.0, max_temp=80.0):
+    def add_buffer(self, capacity_liters: float, initial_temp=20.0, min_temp=15.0, max_temp=80.0,
+                   n_layers: int = None, loss_coefficient: float = 0.0, room_temp: float = None):
+        """
+        Fügt dem Haus einen Pufferspeicher hinzu.
+        :param n_layers: Anzahl der Schichten eines StratifiedBufferTank, ohne Angabe ein einfacher BufferTank.
+        :param loss_coefficient: Wärmeverlustrate U·A des geschichteten Speichers in W/K.
+        :param room_temp: Temperatur des Aufstellraums in °C, Standard ist Tinner.
+        """
+        if n_layers is None:
+            self.buffer = BufferTank(capacity_liters=capacity_liters, initial_temp=initial_temp, min_temp=min_temp, max_temp=max_temp)
+            return
 
-        self.buffer = BufferTank(capacity_liters=capacity_liters, initial_temp=initial_temp, min_temp=min_temp, max_temp=max_temp)
+        self.buffer = StratifiedBufferTank(capacity_liters=capacity_liters, initial_temp=initial_temp,
+                                           min_temp=min_temp, max_temp=max_temp, n_layers=n_layers,
+                                           loss_coefficient=loss_coefficient,
+                                           room_temp=self.Tinner if room_temp is None else room_temp)
 
     def add_gas_heating_system(self, name: str, efficiency: float, max_power: float):
 
@@ -433,56 +741,324 @@ class House:
 
         self.heating_systems.append(HeatingSystemSolar(name=name, efficiency=efficiency, module_power_wp=module_power_wp, num_modules=num_modules))
 
+    def add_solar_collector(self, name: str, area: float, tilt: float = 45.0, azimuth: float = 180.0, **kwargs):
+        """
+        Fügt einen solarthermischen Kollektor hinzu, siehe SolarThermalCollector.
+        :param area: Aperturfläche in m².
+        :param tilt: Neigung in Grad.
+        :param azimuth: Ausrichtung in Grad von Nord über Ost (180 = Süd).
+        :param kwargs: Kennwerte der Wirkungsgradkennlinie (eta0, a1, a2, mean_fluid_temp).
+        """
+        from .solar import SolarThermalCollector
+
+        self.heating_systems.append(SolarThermalCollector(name=name, area=area, tilt=tilt, azimuth=azimuth, **kwargs))
+
+    def add_heat_pump(self, name: str, rated_power: float, rated_cop: float = 3.5, supply_temp=35.0, **kwargs):
+        """
+        Fügt eine Luft-Wasser-Wärmepumpe hinzu, siehe HeatingSystemHeatPump. Die Reihenfolge der Heizungssysteme
+        ist ihre Priorität, eine Zusatzheizung (z.B. Gas) wird daher nach der Wärmepumpe hinzugefügt
+        (in from_spec automatisch).
+        :param rated_power: Heizleistung bei A2/W35 in kW.
+        :param rated_cop: Leistungszahl bei A2/W35.
+        :param supply_temp: Vorlauftemperatur in °C oder Heizkurve als Funktion der Außentemperatur.
+        :param kwargs: Weitere Kennwerte, z.B. bivalence_temp, mode oder defrost_loss.
+        """
+        self.heating_systems.append(HeatingSystemHeatPump(name=name, rated_power=rated_power, rated_cop=rated_cop,
+                                                          supply_temp=supply_temp, **kwargs))
+
+    def add_internal_gain(self, name: str, power: float, schedule=None):
+        """
+        Fügt eine interne Wärmequelle hinzu, z.B. Personen, Beleuchtung oder Geräte.
+        :param power: Wärmeleistung bei voller Nutzung in W.
+        :param schedule: Nutzungsplan als Anteil von power, siehe gains.schedule_values.
+        """
+        self.internal_gains.append(InternalGain(name=name, power=power, schedule=schedule))
+
+    def add_ventilation(self, volume: float, air_change_rate: float = 0.5, schedule=None, **kwargs):
+        """
+        Legt den Lüftungs- und Infiltrationswärmeverlust fest, siehe Ventilation.
+        Er wird als Spalte 'ventilation' in transmission_heat_loss_ts geführt und ist in 'sum' enthalten.
+        :param volume: Beheiztes Luftvolumen in m³.
+        :param air_change_rate: Luftwechselrate in 1/h.
+        :param schedule: Nutzungsplan als Anteil von air_change_rate, siehe gains.schedule_values.
+        :param kwargs: infiltration_rate, recovery_efficiency, frost_temp, frost_slope.
+        """
+        self.ventilation = Ventilation(volume=volume, air_change_rate=air_change_rate, schedule=schedule, **kwargs)
+
 
     
     def _calculate_total_u_value(self) -> float:
         """
-        Berechnet den gewichteten durchschnittlichen U-Wert für alle Wände im Haus.
+        Berechnet den gewichteten durchschnittlichen U-Wert für alle Bauteile im Haus.
         :return: Durchschnittlicher U-Wert in W/(m²*K).
         """
-        total_area = sum(wall['area'] for wall in self.components)
-        if total_area == 0:
-            return float('inf')  # Falls keine Wände hinzugefügt wurden
-        
-        weighted_u_sum = sum(component['area'] * component['structure'].calculate_u_value() for component in self.components)
-        return weighted_u_sum / total_area
+        return mean_u_value(self.components)
     
     def _calc_annual_transmission_heat_loss(self, deltaT = 20.0, hours=24*365) -> float:
         ''' in kWh '''
-        
-        
-        self.annual_transmission_heat_loss = np.sum([component['area']*component['structure'].calculate_u_value()*deltaT*hours for component in self.components])/1000.0
 
+        ua = np.array([component_ua(component) for component in self.components], dtype=np.float64)
+        self.annual_transmission_heat_loss = ua.sum()*deltaT*hours/1000.0
+
+        return self.annual_transmission_heat_loss
 
-    def _calc_annual_transmission_heat_loss_timeseries(self) -> float:
+    def design_heat_load(self, theta_e=DESIGN_OUTDOOR_TEMPERATURE):
         """
-        
+        Norm-Transmissionsheizlast des Hauses bei Tinner, siehe calc.design_heat_load, zuzüglich der
+        Lüftungsheizlast bei voller Nutzung, falls eine Lüftung festgelegt ist.
+        :param theta_e: Norm-Außentemperatur in °C, Skalar oder Array.
+        :return: Heizlast in kW.
+        """
+        load = design_heat_load(self.components, theta_int=self.Tinner, theta_e=theta_e)
+        if self.ventilation is None:
+            return load
+
+        return load + self.ventilation.design_coefficient(theta_e) * (self.Tinner - np.asarray(theta_e)) / 1000
+
+
+    def _calc_annual_transmission_heat_loss_timeseries(self, breakdown: bool = True):
+        """
+        Berechnet die Transmissionswärmeverluste je Zeitschritt in kW als äußeres Produkt
+        aus dem ΔT-Vektor und dem U·A·r-Vektor der Bauteile.
+        Oberhalb von T_heating sind die Bauteilwerte NaN und die Summe 0.
+        Der Lüftungswärmeverlust H_V(t)·ΔT wird, falls festgelegt, im selben Durchlauf als Spalte 'ventilation'
+        berechnet und ist in 'sum' enthalten.
+
         T_heating: Bis zu dieser Temperatur wird geheizt.
-        
+        Bei einem erneuten Aufruf, in dem sich nur U·A·r einzelner Bauteile geändert hat, werden nur
+        deren Spalten und die Summe aktualisiert (siehe _update_transmission_heat_loss).
+        :param breakdown: Bei False wird nur die Spalte 'sum' berechnet, ohne Aufteilung nach Bauteilen.
+        """
+
+        U, A, r = self._component_data()
+        uar = U * A * r / 1000 # W/K in kW/K
+
+        if self._update_transmission_heat_loss(uar, breakdown):
+            return
+
+        self.profiler.count('components_evaluated', len(uar))
+
+        airtemp = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+
+        deltaT = self.Tinner - airtemp
+        deltaT[airtemp > self.T_heating] = np.nan
+
+        # außerhalb der Heizperiode 0 statt NaN
+        deltaT0 = np.nan_to_num(deltaT, nan=0.0)
+
+        hv = self._ventilation_coefficient(airtemp)
+
+        n_components = len(uar) if breakdown else 0
+        n_columns = n_components + (1 if breakdown and hv is not None else 0)
+        values = np.empty((len(deltaT), n_columns + 1), dtype=np.float64)
+
+        if breakdown:
+            np.multiply.outer(deltaT, uar, out=values[:, :n_components])
+            if hv is not None:
+                np.multiply(deltaT, hv, out=values[:, n_components])
+
+        total = values[:, n_columns]
+        if hv is None:
+            np.multiply(deltaT0, uar.sum(), out=total)
+        else:
+            np.add(hv, uar.sum(), out=total)
+            total *= deltaT0
+
+        columns = [component.name for component in self.components] if breakdown else []
+        if n_columns > n_components:
+            columns.append('ventilation')
+        columns.append('sum')
+
+        self.transmission_heat_loss_ts = pd.DataFrame(values, index=self.climate_data.index, columns=columns, copy=False)
+
+        self._loss_cache = {
+            'key': self._loss_cache_key(breakdown),
+            'components': tuple(self.components),
+            'uar': uar,
+            'deltaT': deltaT,
+            'deltaT0': deltaT0,
+        }
+
+    def _calc_transient_heat_loss_timeseries(self, breakdown: bool = True, step_hours: float = 1.0):
         """
+        Wie _calc_annual_transmission_heat_loss_timeseries, berücksichtigt aber die Wärmekapazität der Schichten
+        (siehe transient.transient_heat_flow). Die Bauteile kühlen auch außerhalb der Heizperiode weiter aus bzw.
+        erwärmen sich, nur der Heizwärmebedarf wird dort wie im stationären Fall zu 0 (Summe) bzw. NaN gesetzt.
+        :param breakdown: Bei False wird nur die Spalte 'sum' berechnet, ohne Aufteilung nach Bauteilen.
+        :param step_hours: Länge eines Zeitschritts in Stunden.
+        """
+        from .transient import transient_heat_flow
 
-        transmission_heat_loss = {}
+        self._loss_cache = None
+        self.profiler.count('components_evaluated', len(self.components))
 
-        airtemp = self.climate_data['Tair'].copy()
-        airtemp[airtemp>self.T_heating] = np.NaN
+        airtemp = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        heating = airtemp <= self.T_heating
 
-        for component in self.components:
+        # Lücken in Tair werden für die Filter linear überbrückt, da sich ein NaN in alle folgenden Zeitschritte
+        # fortsetzen würde. Der Bedarf ist dort wie im stationären Fall 0 (Summe) bzw. NaN.
+        valid = ~np.isnan(airtemp)
+        if valid.all():
+            filled = airtemp
+        elif valid.any():
+            filled = np.interp(np.arange(len(airtemp)), np.flatnonzero(valid), airtemp[valid])
+        else:
+            filled = np.full_like(airtemp, self.Tinner)
 
-            U_component = component.U
-            A_component = component.area
-            r_component = component.r
+        flow = transient_heat_flow(self.components, self.Tinner - filled, step_hours=step_hours)
 
-            transmission_heat_loss[component.name] = (self.Tinner - airtemp).mul(U_component).mul(A_component).mul(r_component)
+        # Lüftung ohne Speichermasse
+        hv = self._ventilation_coefficient(airtemp)
+        names = [component.name for component in self.components]
+        if hv is not None:
+            flow = np.column_stack([flow, hv * 1000 * (self.Tinner - airtemp)])
+            names.append('ventilation')
 
-        self.transmission_heat_loss_ts = pd.concat(transmission_heat_loss).unstack(level=0)
+        flow *= step_hours / 1000 # W in kWh je Zeitschritt
 
-        self.transmission_heat_loss_ts['sum'] = self.transmission_heat_loss_ts.sum(axis=1)
+        total = flow.sum(axis=1)
+        total[~heating] = 0.0
 
-        self.transmission_heat_loss_ts = self.transmission_heat_loss_ts.div(1000) #kWh?
+        if breakdown:
+            flow[~heating] = np.nan
+            values = np.column_stack([flow, total])
+            columns = names + ['sum']
+        else:
+            values = total[:, np.newaxis]
+            columns = ['sum']
+
+        self.transmission_heat_loss_ts = pd.DataFrame(values, index=self.climate_data.index, columns=columns, copy=False)
+
+    def _solar_windows(self) -> list:
+        """
+        Fenster mit g-Wert und Ausrichtung, deren solare Gewinne berücksichtigt werden.
+        """
+        return [component for component in self.components
+                if isinstance(component, Window) and component.g_value is not None and component.azimuth is not None]
+
+    def _has_gains(self) -> bool:
+
+        return bool(self.internal_gains) or bool(self._solar_windows())
+
+    def _gains_values(self, climate_data: pd.DataFrame, step_hours: float = 1.0) -> tuple:
+        """
+        Solare und interne Wärmegewinne für alle Zeitschritte als Array (Zeitschritte x Quellen) in kWh.
+        :return: (Namen der Quellen, Array)
+        """
+        windows = self._solar_windows()
+
+        values = np.empty((len(climate_data), len(windows) + len(self.internal_gains)), dtype=np.float64)
+        values[:, :len(windows)] = window_solar_gains(windows, climate_data, self.latitude, self.longitude,
+                                                      step_hours=step_hours)
+        for j, gain in enumerate(self.internal_gains, start=len(windows)):
+            values[:, j] = gain.energy(climate_data.index, step_hours=step_hours)
+
+        names = [window.name for window in windows] + [gain.name for gain in self.internal_gains]
+        return names, values
+
+    def _calc_gains_timeseries(self):
+        """
+        Berechnet die Wärmegewinne je Zeitschritt als gains_ts mit einer Spalte je Quelle und 'sum'.
+        Die Gewinne werden in _calc_energy_need vom Transmissionswärmeverlust abgezogen.
+        """
+        names, values = self._gains_values(self.climate_data)
+
+        self.gains_ts = pd.DataFrame(np.column_stack([values, values.sum(axis=1)]),
+                                     index=self.climate_data.index, columns=names + ['sum'], copy=False)
+
+    def heat_demand(self) -> pd.Series:
+        """
+        Heizwärmebedarf je Zeitschritt: Transmissionswärmeverlust abzüglich der Wärmegewinne, nicht negativ.
+        Ohne Gewinne die Spalte 'sum' von transmission_heat_loss_ts.
+        """
+        heat_loss = self.transmission_heat_loss_ts['sum']
+        if self.gains_ts is None:
+            return heat_loss
+
+        demand = heat_loss.to_numpy() - self.gains_ts['sum'].to_numpy()
+        return pd.Series(np.maximum(demand, 0.0), index=heat_loss.index, name='sum')
+
+    def _ventilation_coefficient(self, airtemp: np.ndarray, index: pd.Index = None) -> np.ndarray:
+        """
+        Lüftungswärmeverlustkoeffizient H_V je Zeitschritt in kW/K, ohne Lüftung None.
+        Fehlende Außentemperaturen ergeben bei Wärmerückgewinnung 0 statt NaN, wie ΔT außerhalb der Heizperiode.
+        :param airtemp: Array der Außentemperatur in °C.
+        :param index: Zeitstempel für den Nutzungsplan, Standard ist der Index der Klimadaten.
+        """
+        if self.ventilation is None:
+            return None
+
+        index = self.climate_data.index if index is None else index
+        return np.nan_to_num(self.ventilation.coefficient(index, airtemp), nan=0.0) / 1000
+
+    def _ventilation_heat_loss(self) -> np.ndarray:
+        """
+        Lüftungswärmeverlust je Zeitschritt in kWh, außerhalb der Heizperiode 0 (auch ohne Aufteilung nach Bauteilen).
+        """
+        ts = self.transmission_heat_loss_ts
+        if 'ventilation' in ts.columns:
+            return np.nan_to_num(ts['ventilation'].to_numpy(), nan=0.0)
+
+        airtemp = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        deltaT0 = np.where(airtemp > self.T_heating, 0.0, np.nan_to_num(self.Tinner - airtemp, nan=0.0))
+        return self._ventilation_coefficient(airtemp) * deltaT0
+
+    def _loss_cache_key(self, breakdown: bool) -> tuple:
+
+        ventilation = None if self.ventilation is None else self.ventilation.key()
+        return (id(self.climate_data), self.Tinner, self.T_heating, breakdown, ventilation)
+
+    def _update_transmission_heat_loss(self, uar: np.ndarray, breakdown: bool) -> bool:
+        """
+        Aktualisiert transmission_heat_loss_ts inkrementell. Da der Verlust linear in U·A·r ist, kostet jedes
+        geänderte Bauteil eine Vektoroperation für seine Spalte, die Summe wird um ΔT·Δ(U·A·r) korrigiert.
+        Unveränderte Spalten werden nicht kopiert, bereits zurückgegebene Ergebnisse bleiben unverändert.
+        :param uar: Aktueller U·A·r-Vektor der Bauteile in kW/K.
+        :param breakdown: Aufteilung nach Bauteilen.
+        :return: False, falls eine vollständige Neuberechnung nötig ist (z.B. neue Bauteile, andere Klimadaten oder Temperaturen).
+        """
+        cache = self._loss_cache
+        if cache is None or cache['key'] != self._loss_cache_key(breakdown):
+            return False
+        if len(cache['components']) != len(self.components) \
+                or any(a is not b for a, b in zip(cache['components'], self.components)):
+            return False
+
+        changed = np.flatnonzero(uar != cache['uar'])
+        self.profiler.count('components_evaluated', len(changed))
+        if len(changed) == 0:
+            return True
+
+        ts = self.transmission_heat_loss_ts.copy(deep=False)
+
+        if breakdown:
+            for j in changed:
+                ts.isetitem(j, cache['deltaT'] * uar[j])
+
+        delta = (uar[changed] - cache['uar'][changed]).sum()
+        ts.isetitem(len(ts.columns) - 1, ts['sum'].to_numpy() + cache['deltaT0'] * delta)
+
+        self.transmission_heat_loss_ts = ts
+        cache['uar'] = uar
+
+        log_event(logger, 'transmission_update', changed=[self.components[j].name for j in changed])
+
+        return True
+
+    def invalidate(self):
+        """
+        Verwirft zwischengespeicherte Zwischenergebnisse, der nächste run() rechnet vollständig neu.
+        Nötig, wenn die Klimadaten direkt (in-place) verändert wurden.
+        """
+        self._loss_cache = None
 
     def _define_heating_system(self):
 
-        self._heating_system = MultiHeatingSystem(buffer_tank=self.buffer, systems=self.heating_systems)
+        for system in self.heating_systems:
+            if hasattr(system, 'prepare'):
+                system.prepare(self.climate_data, self.latitude, self.longitude)
+
+        self._heating_system = MultiHeatingSystem(buffer_tank=self.buffer, systems=self.heating_systems, engine=self.engine)
     
     def _calc_energy_need(self):
         '''
@@ -493,29 +1069,109 @@ class House:
 
         self.heat = pd.DataFrame(index=self.transmission_heat_loss_ts.index)
 
-        heat_loss = self.transmission_heat_loss_ts['sum']
+        heat_loss = self.heat_demand()
         solar_radiation = self.climate_data['radiation'].copy()
 
-        self.energy = self._heating_system.operate_heating(heat_loss, solar_radiation_series=solar_radiation)
+        buffer = self._heating_system.buffer_tank
+        empty_events, saturation_events = buffer.empty_events, buffer.saturation_events
+
+        with self.profiler.stage('dispatch'):
+            self.energy = self._heating_system.operate_heating(heat_loss, solar_radiation_series=solar_radiation)
+
+        self.profiler.count('timesteps_simulated', len(heat_loss))
+        self.profiler.count('buffer_empty_events', buffer.empty_events - empty_events)
+        self.profiler.count('buffer_saturation_events', buffer.saturation_events - saturation_events)
     
     
-    def run(self):
+    def run(self, breakdown: bool = True, profile=False, transient: bool = False):
+        """
+        Berechnet das Haus.
+        Wärmegewinne durch Fenster und interne Quellen werden, falls vorhanden, als gains_ts berechnet.
+        Die Heizungssteuerung für _calc_energy_need wird nur mit Pufferspeicher angelegt.
+        :param breakdown: Bei False enthält transmission_heat_loss_ts nur die Spalte 'sum'.
+        :param transient: Instationäre Berechnung mit der Wärmekapazität der Schichten statt U·A·ΔT je Zeitschritt.
+        :param profile: True oder eine Instanz von Profiler misst Dauer und Speicherbedarf der Berechnungsschritte
+                        und zählt Zeitschritte, Bauteile und Ereignisse des Pufferspeichers. Der Profiler bleibt
+                        als house.profiler erhalten, nachfolgende Schritte wie _calc_energy_need werden mit erfasst.
+        :return: Bericht des Profilers (siehe Profiler.report), ohne profile None.
+        """
+        profiler = self.profiler = as_profiler(profile)
+
+        with profiler.stage('climate_load'):
+            climate_data = self.climate_data
+
+        # ohne Pufferspeicher nur Wärmeverlust und -gewinne, die Heizungssteuerung braucht einen Speicher
+        if getattr(self, 'buffer', None) is not None:
+            with profiler.stage('define_heating_system'):
+                self._define_heating_system()
 
-        self._define_heating_system()
+        with profiler.stage('transmission_heat_loss'):
+            if transient:
+                self._calc_transient_heat_loss_timeseries(breakdown=breakdown)
+            else:
+                self._calc_annual_transmission_heat_loss_timeseries(breakdown=breakdown)
 
-        self._calc_annual_transmission_heat_loss_timeseries()
+        if self._has_gains():
+            with profiler.stage('gains'):
+                self._calc_gains_timeseries()
+        else:
+            self.gains_ts = None
+        profiler.count('timesteps', len(climate_data))
         #self._calc_energy_need()
 
+        if profiler.enabled:
+            return profiler.report()
+
+
+    def temperature_profiles(self) -> dict:
+        """
+        Temperaturprofile aller Bauteile mit Schichten für jeden Zeitschritt der Klimadaten.
+        :return: Dictionary Bauteilname -> Array (Zeitschritte x Grenzflächen) in °C, siehe Wall.temperature_profile.
+        """
+        To = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        Ti = np.full_like(To, self.Tinner)
+
+        return {component.name: component.temperature_profile(Ti, To)
+                for component in self.components if component.layers}
+
+    def condensation_risk(self, rh_inside=0.5, rh_outside=None) -> dict:
+        """
+        Tauwasserprüfung aller Bauteile mit Schichten für jeden Zeitschritt der Klimadaten.
+        :param rh_inside: Relative Luftfeuchte innen (0 bis 1), Skalar oder Array.
+        :param rh_outside: Relative Luftfeuchte außen (0 bis 1), Standard ist die Spalte 'humidity' der Klimadaten oder 0.8.
+        :return: Dictionary Bauteilname -> boolesches Array (Zeitschritte x Grenzflächen), siehe Wall.condensation_check.
+        """
+        To = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        Ti = np.full_like(To, self.Tinner)
+
+        if rh_outside is None:
+            if 'humidity' in self.climate_data.columns:
+                rh_outside = self.climate_data['humidity'].to_numpy(dtype=np.float64)
+            else:
+                rh_outside = 0.8
+
+        return {component.name: component.condensation_check(Ti, To, rh_inside=rh_inside, rh_outside=rh_outside)
+                for component in self.components if component.layers}
+
+    def _component_data(self) -> np.ndarray:
+        """
+        U-Wert, Fläche und Reduktionsfaktor r aller Bauteile als Array (3 x Anzahl Bauteile).
+        """
+        return np.array([
+            [component.U for component in self.components],
+            [component.area for component in self.components],
+            [component.r for component in self.components],
+            ], dtype=np.float64).reshape(3, len(self.components))
 
     def info(self):
-        
-        data = [{'name': component.name, 
-                'Area': component.area, 
-                'R-Value': component.R,
-                'U-Value': component.U,
-                'thickness': component.thickness
-                } for component in self.components]
-        df = pd.DataFrame(data)
-        
-        df = df.set_index('name')
+
+        U, A, _ = self._component_data()
+
+        df = pd.DataFrame({
+            'Area': A,
+            'R-Value': 1/U,
+            'U-Value': U,
+            'thickness': [component.thickness for component in self.components],
+            }, index=pd.Index([component.name for component in self.components], name='name'))
+
         return df
\ No newline at end of file
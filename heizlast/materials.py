@@ -0,0 +1,237 @@
+import difflib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .house import Layer, Wall, Roof, Ceiling
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+MATERIALS_FILE = os.path.join(DATA_DIR, 'materials.csv')
+CONSTRUCTIONS_FILE = os.path.join(DATA_DIR, 'constructions.json')
+
+MATERIAL_FIELDS = ('thermal_conductivity', 'density', 'specific_heat_capacity', 'vapour_diffusion_resistance')
+
+COMPONENT_TYPES = {
+    'wall': Wall,
+    'roof': Roof,
+    'ceiling': Ceiling,
+}
+
+# Aufbauten je Inhalt, gleiche Aufbauten werden nur einmal berechnet und gespeichert
+_constructions = {}
+
+
+@lru_cache(maxsize=None)
+def _material_index(path: str) -> dict:
+    """
+    Liest eine Materialdatenbank einmalig als Dictionary Name -> Kennwerte.
+    """
+    df = pd.read_csv(path, index_col='name')
+    missing = set(MATERIAL_FIELDS) - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+
+    df = df[list(MATERIAL_FIELDS)].astype(np.float64)
+    return {name: {key: (None if np.isnan(value) else float(value)) for key, value in zip(MATERIAL_FIELDS, row)}
+            for name, row in zip(df.index, df.itertuples(index=False))}
+
+
+def material_table(path: str = None) -> pd.DataFrame:
+    """
+    Materialdatenbank als Tabelle.
+    :param path: CSV-Datei mit den Spalten 'name' und MATERIAL_FIELDS, Standard ist die mitgelieferte Datenbank.
+    :return: DataFrame je Material mit λ in W/(m*K), Rohdichte in kg/m³, spezifischer Wärmekapazität in J/(kg*K)
+             und Wasserdampf-Diffusionswiderstandszahl μ.
+    """
+    index = _material_index(path or MATERIALS_FILE)
+    return pd.DataFrame.from_dict(index, orient='index', columns=list(MATERIAL_FIELDS)).rename_axis('name')
+
+
+def get_material(name: str, path: str = None) -> dict:
+    """
+    Kennwerte eines Materials.
+    :param name: Name des Materials.
+    :param path: Materialdatenbank, siehe material_table.
+    :return: Dictionary mit MATERIAL_FIELDS.
+    """
+    index = _material_index(path or MATERIALS_FILE)
+    try:
+        return index[name]
+    except KeyError:
+        suggestions = difflib.get_close_matches(name, list(index), n=3)
+        raise KeyError(f"unknown material '{name}'" + (f", did you mean {suggestions}?" if suggestions else '')) from None
+
+
+def material_layer(material_name: str, thickness: float, path: str = None, **kwargs) -> Layer:
+    """
+    Erstellt eine Schicht aus der Materialdatenbank.
+    :param material_name: Name des Materials, zugleich Name der Schicht.
+    :param thickness: Dicke in mm.
+    :param kwargs: Überschreibt Name oder Kennwerte des Materials, z.B. thermal_conductivity.
+    """
+    return Layer(**{'name': material_name, 'thickness': thickness, **get_material(material_name, path), **kwargs})
+
+
+class Construction:
+    __slots__ = ('name', 'type', 'layers', 'thermal_resistance_inside', 'thermal_resistance_outside',
+                 'layer_data', 'R', 'U', 'thickness')
+
+    def __init__(self, name: str, layers: list, type: str = 'wall',
+                 thermal_resistance_inside: float = 0.13, thermal_resistance_outside: float = 0.04):
+        """
+        Wiederverwendbarer Bauteilaufbau. R- und U-Wert werden einmal berechnet, Bauteile aus component() teilen
+        Schichten und Schichtdaten des Aufbaus, statt sie je Haus neu zu erstellen.
+        Instanzen werden in der Regel über get_construction() bzw. make_construction() erzeugt, die gleiche
+        Aufbauten nur einmal anlegen.
+        :param name: Name des Aufbaus.
+        :param layers: Liste von Instanzen der Klasse Layer (von innen nach außen).
+        :param type: 'wall', 'roof' oder 'ceiling', bestimmt die Klasse der Bauteile.
+        :param thermal_resistance_inside: Wärmeübergangswiderstand innen R_si in (m²*K)/W.
+        :param thermal_resistance_outside: Wärmeübergangswiderstand außen R_se in (m²*K)/W.
+        """
+        if type not in COMPONENT_TYPES:
+            raise ValueError(f"unknown construction type '{type}', expected one of {tuple(COMPONENT_TYPES)}")
+
+        prototype = COMPONENT_TYPES[type](name=name, area=1.0,
+                                          thermal_resistance_inside=thermal_resistance_inside,
+                                          thermal_resistance_outside=thermal_resistance_outside)
+        prototype.add_layers(layers)
+        prototype.run()
+
+        self.name = name
+        self.type = type
+        self.layers = tuple(layers)
+        self.thermal_resistance_inside = thermal_resistance_inside
+        self.thermal_resistance_outside = thermal_resistance_outside
+
+        self.layer_data = prototype.layer_data
+        self.layer_data.flags.writeable = False
+        self.R = prototype.R
+        self.U = prototype.U
+        self.thickness = prototype.thickness
+
+    def __copy__(self):
+
+        return self
+
+    def __deepcopy__(self, memo):
+
+        return self
+
+    def __repr__(self):
+
+        return f"Construction({self.name!r}, type={self.type!r}, U={self.U:0.3f})"
+
+    def component(self, name: str, area: float, r: float = 1.0, cls=None):
+        """
+        Erstellt ein Bauteil mit diesem Aufbau ohne erneute Berechnung.
+        :param name: Name des Bauteils.
+        :param area: Fläche in Quadratmetern.
+        :param r: Reduktionsfaktor.
+        :param cls: Klasse des Bauteils, Standard folgt aus type.
+        """
+        component = (cls or COMPONENT_TYPES[self.type])(
+            name=name, area=area, r=r,
+            thermal_resistance_inside=self.thermal_resistance_inside,
+            thermal_resistance_outside=self.thermal_resistance_outside)
+
+        component.layers = list(self.layers)
+        component.layer_data = self.layer_data
+        component.R = self.R
+        component.U = self.U
+        component.thickness = self.thickness
+
+        return component
+
+
+def _layer_key(info: dict) -> tuple:
+
+    return tuple(sorted((key, value) for key, value in info.items()))
+
+
+def make_construction(layers_info: list, type: str = 'wall', name: str = None,
+                      thermal_resistance_inside: float = None, thermal_resistance_outside: float = None,
+                      path: str = None) -> Construction:
+    """
+    Liefert den Aufbau zu einer Liste von Schichten, gleiche Aufbauten ergeben dieselbe Instanz.
+    :param layers_info: Liste von Dictionaries mit 'material' und 'thickness' (mm) für Materialien der Datenbank
+                        oder den Argumenten von Layer (z.B. für Luftschichten mit is_air).
+    :param type: 'wall', 'roof' oder 'ceiling'.
+    :param name: Name des Aufbaus, Standard sind die Schichtnamen.
+    :param thermal_resistance_inside: R_si, Standard 0.13 (m²*K)/W.
+    :param thermal_resistance_outside: R_se, Standard 0.04 (m²*K)/W.
+    :param path: Materialdatenbank, siehe material_table.
+    :return: Instanz von Construction.
+    """
+    Rsi = 0.13 if thermal_resistance_inside is None else thermal_resistance_inside
+    Rse = 0.04 if thermal_resistance_outside is None else thermal_resistance_outside
+    path = path or MATERIALS_FILE
+
+    key = (type, tuple(_layer_key(info) for info in layers_info), Rsi, Rse, path)
+    if key in _constructions:
+        return _constructions[key]
+
+    layers = []
+    for info in layers_info:
+        info = dict(info)
+        if 'material' in info:
+            layers.append(material_layer(info.pop('material'), path=path, **info))
+        else:
+            layers.append(Layer(**info))
+
+    if name is None:
+        name = ' / '.join(layer.name for layer in layers)
+
+    construction = _constructions[key] = Construction(name, layers, type=type, thermal_resistance_inside=Rsi,
+                                                      thermal_resistance_outside=Rse)
+    return construction
+
+
+@lru_cache(maxsize=None)
+def _catalog(path: str) -> dict:
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def construction_names(path: str = None) -> list:
+    """
+    Namen der Aufbauten im Katalog.
+    :param path: JSON-Datei mit Aufbauten, Standard ist der mitgelieferte Katalog.
+    """
+    return list(_catalog(path or CONSTRUCTIONS_FILE))
+
+
+def get_construction(name: str, path: str = None, materials_path: str = None) -> Construction:
+    """
+    Aufbau aus dem Katalog, jeder Aufbau wird nur einmal erstellt.
+    :param name: Name des Aufbaus, siehe construction_names.
+    :param path: JSON-Datei mit Aufbauten: Name -> {'type', 'layers', optional 'thermal_resistance_inside' und
+                 'thermal_resistance_outside'}, siehe make_construction.
+    :param materials_path: Materialdatenbank, siehe material_table.
+    :return: Instanz von Construction.
+    """
+    catalog = _catalog(path or CONSTRUCTIONS_FILE)
+    try:
+        entry = catalog[name]
+    except KeyError:
+        suggestions = difflib.get_close_matches(name, list(catalog), n=3)
+        raise KeyError(f"unknown construction '{name}'" + (f", did you mean {suggestions}?" if suggestions else '')) from None
+
+    return make_construction(entry['layers'], type=entry.get('type', 'wall'), name=name,
+                             thermal_resistance_inside=entry.get('thermal_resistance_inside'),
+                             thermal_resistance_outside=entry.get('thermal_resistance_outside'),
+                             path=materials_path)
+
+
+def as_construction(value) -> Construction:
+    """
+    Wandelt einen Katalognamen in einen Aufbau um, eine Instanz von Construction bleibt unverändert.
+    """
+    if isinstance(value, Construction):
+        return value
+    return get_construction(value)
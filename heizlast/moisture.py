@@ -0,0 +1,27 @@
+import numpy as np
+
+
+def saturation_vapour_pressure(theta):
+    """
+    Sättigungsdampfdruck nach DIN EN ISO 13788 (über Wasser bzw. über Eis unter 0 °C).
+    :param theta: Temperatur in °C, Skalar oder Array.
+    :return: Sättigungsdampfdruck in Pa.
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    return np.where(theta >= 0,
+                    610.5 * np.exp(17.269 * theta / (237.3 + theta)),
+                    610.5 * np.exp(21.875 * theta / (265.5 + theta)))
+
+
+def dew_point(theta, relative_humidity):
+    """
+    Taupunkttemperatur der Luft (Umkehrung von saturation_vapour_pressure).
+    :param theta: Lufttemperatur in °C.
+    :param relative_humidity: Relative Luftfeuchte zwischen 0 und 1.
+    :return: Taupunkttemperatur in °C.
+    """
+    p = relative_humidity * saturation_vapour_pressure(theta)
+    x = np.log(p / 610.5)
+    return np.where(p >= 610.5,
+                    237.3 * x / (17.269 - x),
+                    265.5 * x / (21.875 - x))
@@ -0,0 +1,329 @@
+import numpy as np
+import pandas as pd
+
+from .dispatch import DISPATCH_DEMAND
+from .gains import schedule_values
+
+
+# Kosten je kWh nicht gedeckten Bedarfs, hält das LP bei zu kleinen Anlagen lösbar
+UNMET_PENALTY = 1000.0
+
+# Attribut, in dessen Einheit ein Heizungssystem dimensioniert wird (Ertrag bzw. Leistung sind proportional dazu)
+SIZE_ATTRIBUTES = ('max_power', 'rated_power', 'area', 'num_modules')
+
+
+def _size_attribute(system) -> str:
+
+    for attribute in SIZE_ATTRIBUTES:
+        if hasattr(system, attribute):
+            return attribute
+    raise ValueError(f"{system.name}: no size attribute, expected one of {SIZE_ATTRIBUTES}")
+
+
+def _profiles(systems: list, index: pd.Index, solar_radiation: np.ndarray, prices: dict, step_hours: float) -> tuple:
+    """
+    Obergrenzen der Wärme und Kosten je kWh Wärme aller Systeme für alle Zeitschritte.
+    :return: (Wärme in kWh je Zeitschritt (Systeme x n), Kosten je kWh Wärme (Systeme x n),
+              Endenergie je kWh Wärme (Systeme x n))
+    """
+    n = len(solar_radiation)
+    heat = np.empty((len(systems), n), dtype=np.float64)
+    cost = np.empty((len(systems), n), dtype=np.float64)
+    final_energy = np.empty((len(systems), n), dtype=np.float64)
+
+    for j, system in enumerate(systems):
+        kind, supply, efficiency = system.dispatch_profile(solar_radiation)
+        if kind == DISPATCH_DEMAND:
+            # wie im Dispatch: geliefert wird die angeforderte Energie bis zur Maximalleistung mal Effizienz
+            heat[j] = supply * efficiency * step_hours
+            if hasattr(system, 'electricity'):
+                final_energy[j] = system.electricity(np.ones(n))
+            else:
+                efficiency = np.asarray(efficiency, dtype=np.float64)
+                final_energy[j] = np.divide(1.0, efficiency, out=np.zeros(n), where=efficiency > 0)
+        else:
+            heat[j] = supply
+            final_energy[j] = 0.0
+
+        price = prices.get(system.name) if prices else None
+        if price is None:
+            price = 1.0 if kind == DISPATCH_DEMAND else 0.0
+        cost[j] = schedule_values(price, index) * final_energy[j] if kind == DISPATCH_DEMAND \
+            else schedule_values(price, index)
+
+    return np.nan_to_num(heat, nan=0.0), cost, final_energy
+
+
+def _solve(demand: np.ndarray, heat: np.ndarray, cost: np.ndarray, charge: float, capacity: float,
+           capacity_costs: np.ndarray = None, storage_cost: float = None, penalty: float = UNMET_PENALTY) -> dict:
+    """
+    Löst das lineare Programm eines Zeitfensters mit HiGHS.
+    Variablen: Wärme q[j, t] je System, Ladezustand s[t], nicht gedeckter Bedarf u[t] und optional Größenfaktoren
+    x[j] der Systeme und die Speicherkapazität S. Bilanz: s[t] = s[t-1] + Σ q[j, t] + u[t] - d[t].
+    :param demand: Bedarf je Zeitschritt in kWh.
+    :param heat: Obergrenze der Wärme je System und Zeitschritt in kWh (bei Dimensionierung je Größeneinheit).
+    :param cost: Kosten je kWh Wärme je System und Zeitschritt.
+    :param charge: Ladezustand vor dem ersten Zeitschritt in kWh.
+    :param capacity: Speicherkapazität in kWh (ohne storage_cost fest).
+    :param capacity_costs: Kosten je Größeneinheit je System, NaN für Systeme fester Größe.
+    :param storage_cost: Kosten je kWh Speicherkapazität, None für eine feste Kapazität.
+    :param penalty: Kosten je kWh nicht gedeckten Bedarfs.
+    :return: Dictionary mit 'heat' (Systeme x n), 'charge', 'unmet', 'sizes' (nur dimensionierte Systeme, sonst NaN),
+             'storage' (kWh), 'cost' (Betriebskosten je Zeitschritt) und 'objective'.
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_array, csr_array
+
+    m, n = heat.shape
+    sized = np.zeros(m, dtype=bool) if capacity_costs is None else ~np.isnan(capacity_costs)
+    sized_index = np.flatnonzero(sized)
+    size_storage = storage_cost is not None
+
+    q = np.arange(m * n).reshape(m, n)
+    s = m * n + np.arange(n)
+    u = (m + 1) * n + np.arange(n)
+    x = (m + 2) * n + np.arange(len(sized_index))
+    S = (m + 2) * n + len(sized_index)
+    n_vars = S + 1 if size_storage else S
+
+    c = np.zeros(n_vars)
+    c[q.ravel()] = cost.ravel()
+    c[u] = penalty
+    c[x] = capacity_costs[sized_index] if len(sized_index) else 0.0
+    if size_storage:
+        c[S] = storage_cost
+
+    # Bilanz je Zeitschritt
+    t = np.arange(n)
+    rows = np.concatenate([t, t[1:], np.tile(t, m), t])
+    cols = np.concatenate([s, s[:-1], q.ravel(), u])
+    data = np.concatenate([np.ones(n), -np.ones(n - 1), -np.ones(m * n), -np.ones(n)])
+    A_eq = csr_array(coo_array((data, (rows, cols)), shape=(n, n_vars)))
+    b_eq = -np.nan_to_num(demand, nan=0.0)
+    b_eq[0] += charge
+
+    lower = np.zeros(n_vars)
+    upper = np.full(n_vars, np.inf)
+    upper[q.ravel()] = heat.ravel()
+    upper[q[sized_index].ravel()] = np.inf
+    upper[s] = np.inf if size_storage else capacity
+
+    # Kopplung an die Größen: q[j, t] <= heat[j, t]·x[j] und s[t] <= S
+    ub_rows = []
+    ub_cols = []
+    ub_data = []
+    n_ub = 0
+    for k, j in enumerate(sized_index):
+        ub_rows += [n_ub + t, n_ub + t]
+        ub_cols += [q[j], np.full(n, x[k])]
+        ub_data += [np.ones(n), -heat[j]]
+        n_ub += n
+    if size_storage:
+        ub_rows += [n_ub + t, n_ub + t]
+        ub_cols += [s, np.full(n, S)]
+        ub_data += [np.ones(n), -np.ones(n)]
+        n_ub += n
+
+    A_ub = b_ub = None
+    if n_ub:
+        A_ub = csr_array(coo_array((np.concatenate(ub_data), (np.concatenate(ub_rows), np.concatenate(ub_cols))),
+                                   shape=(n_ub, n_vars)))
+        b_ub = np.zeros(n_ub)
+
+    result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                     bounds=np.column_stack([lower, upper]), method='highs')
+    if result.status != 0:
+        raise RuntimeError(f"linear program could not be solved: {result.message}")
+
+    sizes = np.full(m, np.nan)
+    sizes[sized_index] = result.x[x]
+
+    return {
+        'heat': result.x[q],
+        'charge': result.x[s],
+        'unmet': result.x[u],
+        'sizes': sizes,
+        'storage': result.x[S] if size_storage else capacity,
+        'cost': (cost * result.x[q]).sum(axis=0),
+        'objective': result.fun,
+    }
+
+
+def _frame(index: pd.Index, demand: np.ndarray, systems: list, solution: dict, final_energy: np.ndarray) -> pd.DataFrame:
+
+    results = {'energy_needed': demand}
+    for j, system in enumerate(systems):
+        results[system.name] = solution['heat'][j]
+    for j, system in enumerate(systems):
+        if hasattr(system, 'electricity'):
+            results[f'{system.name}_electricity'] = solution['heat'][j] * final_energy[j]
+    results['buffer_charge'] = solution['charge']
+    results['unmet'] = solution['unmet']
+    results['cost'] = solution['cost']
+
+    return pd.DataFrame(results, index=index)
+
+
+def dispatch_lp(buffer_tank, systems: list, energy_needed: pd.Series, solar_radiation: np.ndarray,
+                prices: dict = None, horizon: int = 168, overlap: int = 24, step_hours: float = 1.0,
+                penalty: float = UNMET_PENALTY) -> pd.DataFrame:
+    """
+    Kostenminimaler Einsatz der Heizungssysteme und des Pufferspeichers als lineares Programm (HiGHS, scipy).
+    Anders als MultiHeatingSystem.operate_heating werden Ertrag und Preise der kommenden Zeitschritte
+    berücksichtigt, z.B. wird der Speicher vor günstigen Tarifstunden nicht unnötig geladen.
+    Die Serie wird rollierend gelöst: je Fenster von horizon + overlap Zeitschritten werden die ersten horizon
+    übernommen und der Ladezustand fortgeschrieben, der Aufwand ist damit linear in der Länge der Serie.
+    Stillstandsverluste des Speichers werden nicht berücksichtigt.
+    :param buffer_tank: Instanz des Pufferspeichers, der Ladezustand wird fortgeschrieben.
+    :param systems: Liste der Heizungssysteme, vorab vorbereitet (siehe House._define_heating_system).
+    :param energy_needed: Serie der Energiebedarfswerte in kWh.
+    :param solar_radiation: Array der Globalstrahlung, gleiche Länge wie energy_needed.
+    :param prices: Dictionary Systemname -> Preis je kWh Endenergie (Gas, Strom) als Skalar, Tagesprofil,
+                   Wochenprofil oder Zeitreihe, siehe gains.schedule_values. Ohne Angabe wird die Endenergie
+                   minimiert, Systeme mit vorgegebenem Ertrag (z.B. Solar) kosten nichts.
+    :param horizon: Anzahl übernommener Zeitschritte je Fenster.
+    :param overlap: Vorausschau über das Fenster hinaus in Zeitschritten.
+    :param step_hours: Länge eines Zeitschritts in Stunden.
+    :param penalty: Kosten je kWh nicht gedeckten Bedarfs.
+    :return: DataFrame mit 'energy_needed', der Wärme je System in kWh, '<Name>_electricity' für Systeme mit
+             Strombedarf, 'buffer_charge' (Ladezustand am Ende des Zeitschritts), 'unmet' und 'cost'.
+    """
+    index = energy_needed.index
+    demand = np.nan_to_num(energy_needed.to_numpy(dtype=np.float64), nan=0.0)
+    solar_radiation = np.ascontiguousarray(solar_radiation, dtype=np.float64)
+    heat, cost, final_energy = _profiles(systems, index, solar_radiation, prices, step_hours)
+
+    n = len(demand)
+    charge = float(buffer_tank.charge)
+    capacity = float(buffer_tank.capacity_kwh)
+
+    solution = {
+        'heat': np.empty_like(heat),
+        'charge': np.empty(n),
+        'unmet': np.empty(n),
+        'cost': np.empty(n),
+    }
+    for start in range(0, n, horizon):
+        window = slice(start, min(start + horizon + overlap, n))
+        keep = min(horizon, n - start)
+
+        result = _solve(demand[window], heat[:, window], cost[:, window], charge, capacity, penalty=penalty)
+
+        solution['heat'][:, start:start + keep] = result['heat'][:, :keep]
+        for key in ('charge', 'unmet', 'cost'):
+            solution[key][start:start + keep] = result[key][:keep]
+        charge = float(result['charge'][keep - 1])
+
+    buffer_tank.charge = charge
+    buffer_tank.update_temperature()
+
+    return _frame(index, demand, systems, solution, final_energy)
+
+
+def optimize_dispatch(house, prices: dict = None, horizon: int = 168, overlap: int = 24,
+                      penalty: float = UNMET_PENALTY) -> pd.DataFrame:
+    """
+    Optimierter Einsatz der Heizungssysteme eines Hauses, siehe dispatch_lp.
+    :param house: Instanz von House nach run().
+    :return: DataFrame, siehe dispatch_lp, wird auch als house.energy gespeichert.
+    """
+    house._define_heating_system()
+
+    house.energy = dispatch_lp(house.buffer, house.heating_systems, house.heat_demand(),
+                               house.climate_data['radiation'].to_numpy(dtype=np.float64),
+                               prices=prices, horizon=horizon, overlap=overlap, penalty=penalty)
+    return house.energy
+
+
+def optimize_sizing(house, capacity_costs: dict, storage_cost: float = None, prices: dict = None,
+                    period: slice = None, horizon: int = 168, overlap: int = 24,
+                    penalty: float = UNMET_PENALTY) -> dict:
+    """
+    Kostenminimale Dimensionierung der Heizungssysteme und des Pufferspeichers.
+    Die Größen sind eine Entscheidung über den gesamten Zeitraum und werden daher in einem einzigen (dünn besetzten)
+    linearen Programm über period bestimmt, z.B. ein Auslegungsjahr einer mehrjährigen Serie. Anschließend wird die
+    gesamte Serie mit den gefundenen Größen rollierend optimiert (siehe dispatch_lp).
+    Größen werden in der Einheit von max_power (kW), rated_power (kW), area (m²) bzw. num_modules angegeben,
+    Ertrag bzw. Leistung der Systeme sind proportional dazu. Die Systeme des Hauses werden auf die Größen gesetzt.
+    :param house: Instanz von House nach run().
+    :param capacity_costs: Dictionary Systemname -> Kosten je Größeneinheit für den Zeitraum period
+                           (z.B. Annuität je kW für ein Jahr), nicht genannte Systeme behalten ihre Größe.
+    :param storage_cost: Kosten je kWh Speicherkapazität für den Zeitraum, None für die vorhandene Kapazität.
+    :param prices: Preise je kWh Endenergie, siehe dispatch_lp.
+    :param period: Zeitraum der Dimensionierung als Slice von Zeitstempeln, z.B. slice('2021-01-01', '2021-12-31'),
+                   Standard ist die gesamte Serie.
+    :param horizon: Fensterlänge für den anschließenden Dispatch.
+    :param overlap: Vorausschau für den anschließenden Dispatch.
+    :param penalty: Kosten je kWh nicht gedeckten Bedarfs.
+    :return: Dictionary mit 'sizes' (Serie Systemname -> Größe, 'buffer' in Litern), 'capital_cost',
+             'operating_cost' (für period) und 'dispatch' (DataFrame der gesamten Serie, siehe dispatch_lp).
+    """
+    systems = house.heating_systems
+    unknown = set(capacity_costs) - {system.name for system in systems}
+    if unknown:
+        raise KeyError(f"no heating system named {sorted(unknown)}")
+
+    house._define_heating_system()
+    buffer_tank = house.buffer
+
+    demand = house.heat_demand()
+    radiation = house.climate_data['radiation'].to_numpy(dtype=np.float64)
+    heat, cost, _ = _profiles(systems, demand.index, radiation, prices, 1.0)
+
+    if period is not None:
+        positions = demand.index.slice_indexer(period.start, period.stop, period.step)
+        demand = demand.iloc[positions]
+        heat = heat[:, positions]
+        cost = cost[:, positions]
+
+    # Obergrenzen je Größeneinheit
+    attributes = [_size_attribute(system) for system in systems]
+    unit_costs = np.full(len(systems), np.nan)
+    for j, (system, attribute) in enumerate(zip(systems, attributes)):
+        if system.name in capacity_costs:
+            unit_costs[j] = capacity_costs[system.name]
+            heat[j] /= getattr(system, attribute)
+
+    charge = 0.0 if storage_cost is not None else float(buffer_tank.charge)
+
+    result = _solve(demand.to_numpy(dtype=np.float64), heat, cost, charge, float(buffer_tank.capacity_kwh),
+                    capacity_costs=unit_costs, storage_cost=storage_cost, penalty=penalty)
+
+    sizes = {}
+    for j, (system, attribute) in enumerate(zip(systems, attributes)):
+        if system.name in capacity_costs:
+            sizes[system.name] = result['sizes'][j]
+            setattr(system, attribute, result['sizes'][j])
+        else:
+            sizes[system.name] = getattr(system, attribute)
+
+    capital_cost = np.nansum(unit_costs * result['sizes'])
+    if storage_cost is not None:
+        capital_cost += storage_cost * result['storage']
+        _resize_buffer(house, result['storage'] * buffer_tank.capacity_liters / buffer_tank.capacity_kwh)
+    sizes['buffer'] = house.buffer.capacity_liters
+
+    dispatch = optimize_dispatch(house, prices=prices, horizon=horizon, overlap=overlap, penalty=penalty)
+
+    return {
+        'sizes': pd.Series(sizes, name='size'),
+        'capital_cost': float(capital_cost),
+        'operating_cost': float(result['cost'].sum()),
+        'dispatch': dispatch,
+    }
+
+
+def _resize_buffer(house, capacity_liters: float):
+    """
+    Ersetzt den Pufferspeicher des Hauses durch einen gleichartigen mit neuer Kapazität (Anfangszustand wie zuvor).
+    """
+    from .buffer import StratifiedBufferTank
+
+    buffer_tank = house.buffer
+    kwargs = {}
+    if isinstance(buffer_tank, StratifiedBufferTank):
+        kwargs = dict(n_layers=buffer_tank.n_layers, loss_coefficient=buffer_tank.loss_coefficient,
+                      room_temp=buffer_tank.room_temp)
+
+    house.add_buffer(capacity_liters=capacity_liters, initial_temp=buffer_tank.initial_temp,
+                     min_temp=buffer_tank.min_temp, max_temp=buffer_tank.max_temp, **kwargs)
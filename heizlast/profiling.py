@@ -0,0 +1,105 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+
+class NullProfiler:
+    """
+    Profiler ohne Wirkung, Standard solange keine Messung angefordert wird.
+    """
+    enabled = False
+
+    _context = nullcontext()
+
+    def stage(self, name: str):
+
+        return self._context
+
+    def count(self, name: str, value: int = 1):
+
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, memory: bool = True):
+        """
+        Misst Dauer und Speicherbedarf von Berechnungsschritten und zählt Ereignisse.
+        :param memory: Speicherbedarf mit tracemalloc erfassen (verlangsamt Allokationen während der Messung).
+        """
+        self.memory = memory
+        self.stages = {}
+        self.counters = {}
+
+    def __repr__(self):
+
+        return f"Profiler({len(self.stages)} stages, {len(self.counters)} counters)"
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Misst einen Berechnungsschritt, wiederholte Schritte mit gleichem Namen werden aufsummiert.
+        :param name: Name des Schritts, z.B. 'transmission_heat_loss'.
+        """
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - t
+
+            stats = self.stages.setdefault(name, {'calls': 0, 'wall_time_ms': 0.0, 'allocated_kib': 0.0, 'peak_kib': 0.0})
+            stats['calls'] += 1
+            stats['wall_time_ms'] += duration * 1000
+
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                stats['allocated_kib'] += (current - memory_before) / 1024
+                stats['peak_kib'] = max(stats['peak_kib'], (peak - memory_before) / 1024)
+            if started:
+                tracemalloc.stop()
+
+    def count(self, name: str, value: int = 1):
+        """
+        Erhöht einen Zähler, z.B. die Anzahl simulierter Zeitschritte.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> pd.DataFrame:
+        """
+        Bericht je Berechnungsschritt.
+        :return: DataFrame mit 'calls', 'wall_time_ms', 'allocated_kib' (bleibender Speicher) und 'peak_kib'
+                 (Spitzenwert während des Schritts), die Zähler stehen in report().attrs['counters'].
+        """
+        df = pd.DataFrame.from_dict(self.stages, orient='index',
+                                    columns=['calls', 'wall_time_ms', 'allocated_kib', 'peak_kib'])
+        df.index.name = 'stage'
+        if not self.memory:
+            df = df.drop(columns=['allocated_kib', 'peak_kib'])
+
+        df.attrs['counters'] = dict(self.counters)
+        return df
+
+
+def as_profiler(profile) -> Profiler:
+    """
+    Wandelt das Argument profile in einen Profiler um: False/None ergibt NULL_PROFILER, True einen neuen Profiler,
+    eine vorhandene Instanz wird unverändert zurückgegeben (z.B. um mehrere Läufe zusammenzufassen).
+    """
+    if profile is None or profile is False:
+        return NULL_PROFILER
+    if profile is True:
+        return Profiler()
+    return profile
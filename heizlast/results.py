@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .house import House
+
+
+ROLLUPS = {
+    'daily': 'D',
+    'monthly': 'MS',
+    'annual': 'YS',
+}
+
+
+def hourly_results(house: House, dtype=np.float64) -> pd.DataFrame:
+    """
+    Fasst die Zeitreihen eines berechneten Hauses in einem kompakten DataFrame zusammen.
+    :param house: Instanz von House nach run() (und ggf. _calc_energy_need()).
+    :param dtype: Datentyp der Werte, z.B. np.float32 für halben Speicherbedarf.
+    :return: DataFrame mit 'Tair' in °C, 'heating_degree_hours' in Kh, dem Transmissionswärmeverlust je Bauteil
+             und als 'heat_loss' in kWh, bei Wärmegewinnen 'gains' und 'heat_demand' in kWh sowie, falls berechnet,
+             den Energiewerten der Heizungssysteme in kWh.
+    """
+    heat_loss = house.transmission_heat_loss_ts
+    airtemp = house.climate_data['Tair'].reindex(heat_loss.index).to_numpy(dtype=np.float64)
+
+    # Gradstunden wie beim Transmissionswärmeverlust: nur bis zur Heizgrenztemperatur
+    degree_hours = house.Tinner - airtemp
+    degree_hours[airtemp > house.T_heating] = 0.0
+
+    columns = {
+        'Tair': airtemp,
+        'heating_degree_hours': degree_hours,
+    }
+    for name in heat_loss.columns.drop('sum'):
+        columns[name] = heat_loss[name].to_numpy()
+    columns['heat_loss'] = heat_loss['sum'].to_numpy()
+
+    if getattr(house, 'gains_ts', None) is not None:
+        columns['gains'] = house.gains_ts['sum'].to_numpy()
+        columns['heat_demand'] = house.heat_demand().to_numpy()
+
+    energy = getattr(house, 'energy', None)
+    if energy is not None:
+        for name in energy.columns.drop('energy_needed'):
+            columns[name] = energy[name].to_numpy()
+
+    return pd.DataFrame({name: np.asarray(values, dtype=dtype) for name, values in columns.items()},
+                        index=pd.DatetimeIndex(heat_loss.index, name='time'))
+
+
+def rollup(hourly: pd.DataFrame, freq: str, step_hours: float = 1.0) -> pd.DataFrame:
+    """
+    Verdichtet stündliche Ergebnisse auf Tage, Monate oder Jahre.
+    :param hourly: DataFrame aus hourly_results.
+    :param freq: pandas-Frequenz oder Name aus ROLLUPS, z.B. 'monthly'.
+    :param step_hours: Länge eines Zeitschritts in Stunden.
+    :return: DataFrame je Zeitraum mit Summen der Energiewerte und Gradstunden, 'Tair' als Mittelwert,
+             'Tair_min' sowie 'peak_heat_load' in kW (aus 'heat_demand', falls Wärmegewinne berechnet wurden,
+             sonst aus 'heat_loss', wie House.heat_demand).
+    """
+    freq = ROLLUPS.get(freq, freq)
+    resampler = hourly.resample(freq)
+
+    df = resampler.sum()
+    df['heating_degree_hours'] *= step_hours
+    df['Tair'] = resampler['Tair'].mean()
+    df['Tair_min'] = resampler['Tair'].min()
+    load = 'heat_demand' if 'heat_demand' in hourly.columns else 'heat_loss'
+    df['peak_heat_load'] = resampler[load].max() / step_hours
+    df['hours'] = resampler['Tair'].count() * step_hours
+
+    return df.astype(hourly['heat_loss'].dtype)
+
+
+class ResultStore:
+    def __init__(self, directory: str, dtype=np.float32, hourly: bool = True, rollups: tuple = tuple(ROLLUPS)):
+        """
+        Ablage von Simulationsergebnissen vieler Häuser als Parquet-Dateien.
+        Je Variante und Ebene wird eine Datei '<Ebene>/<Variante>.parquet' geschrieben, jede Datei enthält die
+        Spalte 'variant'. Ein Verzeichnis je Ebene kann so direkt als Datensatz gelesen werden (siehe read).
+        :param directory: Zielverzeichnis.
+        :param dtype: Datentyp der gespeicherten Werte, float32 halbiert den Speicherbedarf gegenüber float64.
+        :param hourly: Stündliche Werte speichern, bei False nur die verdichteten Ebenen.
+        :param rollups: Vorberechnete Ebenen aus ROLLUPS.
+        """
+        unknown = [level for level in rollups if level not in ROLLUPS]
+        if unknown:
+            raise ValueError(f"unknown rollups {unknown}, expected some of {tuple(ROLLUPS)}")
+
+        self.directory = os.fspath(directory)
+        self.dtype = dtype
+        self.hourly = hourly
+        self.rollups = tuple(rollups)
+
+    def __repr__(self):
+
+        return f"ResultStore(directory={self.directory!r})"
+
+    def _path(self, level: str, variant) -> str:
+
+        return os.path.join(self.directory, level, f"{variant}.parquet")
+
+    def _write(self, level: str, variant, data: pd.DataFrame):
+
+        path = self._path(level, variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data = data.copy(deep=False)
+        data.insert(0, 'variant', str(variant))
+
+        tmp = f"{path}.tmp"
+        data.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def write(self, variant, house: House, step_hours: float = 1.0):
+        """
+        Speichert die Ergebnisse eines berechneten Hauses.
+        :param variant: Bezeichnung der Variante, wird als Dateiname verwendet.
+        :param house: Instanz von House nach run().
+        :param step_hours: Länge eines Zeitschritts in Stunden.
+        """
+        hourly = hourly_results(house, dtype=self.dtype)
+
+        if self.hourly:
+            self._write('hourly', variant, hourly)
+        for level in self.rollups:
+            self._write(level, variant, rollup(hourly, level, step_hours=step_hours))
+
+    def variants(self, level: str = None) -> list:
+        """
+        Gespeicherte Varianten einer Ebene.
+        """
+        level = level or ('hourly' if self.hourly else self.rollups[0])
+        directory = os.path.join(self.directory, level)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(filename[:-len('.parquet')] for filename in os.listdir(directory) if filename.endswith('.parquet'))
+
+    def read(self, level: str = 'annual', variants: list = None, columns: list = None) -> pd.DataFrame:
+        """
+        Liest gespeicherte Ergebnisse, ohne andere Ebenen oder Spalten zu laden.
+        :param level: 'hourly' oder eine der Ebenen aus ROLLUPS.
+        :param variants: Auswahl von Varianten, Standard sind alle.
+        :param columns: Auswahl von Spalten, Standard sind alle.
+        :return: DataFrame mit Index (variant, time).
+        """
+        variants = self.variants(level) if variants is None else [str(variant) for variant in variants]
+        if columns is not None:
+            columns = ['variant'] + [column for column in columns if column != 'variant']
+
+        frames = [pd.read_parquet(self._path(level, variant), columns=columns) for variant in variants]
+        if not frames:
+            return pd.DataFrame(columns=columns[1:] if columns else None)
+
+        return pd.concat(frames).set_index('variant', append=True).swaplevel()
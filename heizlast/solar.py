@@ -0,0 +1,244 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .dispatch import DISPATCH_SUPPLY
+
+
+SOLAR_CONSTANT = 1.367 # kW/m²
+MIN_COS_ZENITH = 0.0872 # Zenitwinkel 85°, darunter gilt die Strahlung als rein diffus
+
+# Zwischenergebnisse je Klimaserie und Standort bzw. Ausrichtung, die zuletzt genutzten bleiben erhalten
+CACHE_SIZE = 64
+_cache = OrderedDict()
+
+# Prüfsumme je DataFrame (über id und eine schwache Referenz), wird nur einmal je Klimaserie berechnet
+_fingerprints = {}
+
+
+def _cached(key: tuple, compute):
+
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    value = _cache[key] = compute()
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return value
+
+
+def _fingerprint(index: pd.DatetimeIndex, *arrays) -> bytes:
+    """
+    Prüfsumme über Zeitstempel und Werte einer Klimaserie als Teil der Cache-Schlüssel.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(index.asi8).tobytes())
+    for array in arrays:
+        h.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return h.digest()
+
+
+def _climate_fingerprint(climate_data: pd.DataFrame) -> bytes:
+    """
+    Prüfsumme von Zeitstempeln und Globalstrahlung einer Klimaserie, einmal je DataFrame berechnet.
+    Spätere Änderungen an demselben DataFrame werden daher nicht erkannt.
+    """
+    key = id(climate_data)
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is climate_data:
+        return entry[1]
+
+    fingerprint = _fingerprint(climate_data.index, climate_data['radiation'].to_numpy(dtype=np.float64))
+    _fingerprints[key] = (weakref.ref(climate_data, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+    return fingerprint
+
+
+def sun_position(index: pd.DatetimeIndex, latitude: float, longitude: float, time_shift: float = 0.5) -> tuple:
+    """
+    Sonnenstand für alle Zeitstempel (Näherung nach Spencer, Genauigkeit etwa 0.1°).
+    :param index: Zeitstempel, ohne Zeitzone als UTC interpretiert.
+    :param latitude: Geographische Breite in Grad.
+    :param longitude: Geographische Länge in Grad (Ost positiv).
+    :param time_shift: Verschiebung in Stunden, 0.5 für Stundenwerte, deren Zeitstempel den Beginn des Intervalls bezeichnet.
+    :return: (cos_zenith, azimuth) mit dem Azimut in Grad von Nord über Ost.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+
+    hours = index.hour.to_numpy() + index.minute.to_numpy() / 60 + time_shift
+    gamma = 2 * np.pi / 365 * (index.dayofyear.to_numpy() - 1 + (hours - 12) / 24)
+
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                 - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+                   - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+                   - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+
+    solar_time = hours * 60 + equation_of_time + 4 * longitude # min
+    hour_angle = np.radians(solar_time / 4 - 180)
+
+    phi = np.radians(latitude)
+    cos_zenith = np.sin(phi) * np.sin(declination) + np.cos(phi) * np.cos(declination) * np.cos(hour_angle)
+
+    azimuth = np.degrees(np.arctan2(np.sin(hour_angle),
+                                    np.cos(hour_angle) * np.sin(phi) - np.tan(declination) * np.cos(phi))) + 180
+
+    return cos_zenith, azimuth
+
+
+def _sky(climate_data: pd.DataFrame, latitude: float, longitude: float, step_hours: float, time_shift: float) -> dict:
+    """
+    Sonnenstand und Aufteilung der Globalstrahlung in Direkt- und Diffusanteil nach Erbs et al. (1982).
+    """
+    index = climate_data.index
+    ghi = np.nan_to_num(climate_data['radiation'].to_numpy(dtype=np.float64), nan=0.0) # kWh/m² je Zeitschritt
+
+    cos_zenith, azimuth = sun_position(index, latitude, longitude, time_shift=time_shift)
+
+    day_angle = 2 * np.pi * pd.DatetimeIndex(index).dayofyear.to_numpy() / 365
+    extraterrestrial = SOLAR_CONSTANT * (1 + 0.033 * np.cos(day_angle)) * step_hours # kWh/m² normal zur Sonne
+
+    sun_up = cos_zenith >= MIN_COS_ZENITH
+    kt = np.zeros_like(ghi)
+    np.divide(ghi, extraterrestrial * cos_zenith, out=kt, where=sun_up)
+    kt = np.clip(kt, 0.0, 1.0)
+
+    diffuse_fraction = np.where(kt <= 0.22, 1 - 0.09 * kt,
+                                np.where(kt <= 0.8, 0.9511 - 0.1604 * kt + 4.388 * kt**2 - 16.638 * kt**3 + 12.336 * kt**4,
+                                         0.165))
+    diffuse_fraction[~sun_up] = 1.0
+
+    dhi = ghi * diffuse_fraction
+    dni = np.zeros_like(ghi)
+    np.divide(ghi - dhi, cos_zenith, out=dni, where=sun_up)
+
+    return {
+        'ghi': ghi,
+        'dhi': dhi,
+        'dni': dni,
+        'cos_zenith': cos_zenith,
+        'azimuth': azimuth,
+        'sun_up': sun_up,
+        'anisotropy': dni / extraterrestrial,
+    }
+
+
+def plane_of_array(climate_data: pd.DataFrame, latitude: float, longitude: float, tilt: float, azimuth: float,
+                   albedo: float = 0.2, step_hours: float = 1.0, time_shift: float = 0.5) -> np.ndarray:
+    """
+    Strahlung auf eine geneigte Fläche (Transposition nach Hay-Davies) für die gesamte Klimaserie.
+    Sonnenstand und Aufteilung der Strahlung werden je Klimaserie und Standort, das Ergebnis je Ausrichtung
+    zwischengespeichert, viele Kollektor- oder Fenstervarianten rechnen sie nur einmal. Die Prüfsumme der
+    Klimaserie wird je DataFrame nur beim ersten Aufruf gebildet, ein Treffer kostet daher nicht O(n).
+    :param climate_data: DataFrame mit DatetimeIndex und der Spalte 'radiation' (Globalstrahlung in kWh/m² je Zeitschritt).
+    :param latitude: Geographische Breite in Grad.
+    :param longitude: Geographische Länge in Grad.
+    :param tilt: Neigung der Fläche in Grad (0 horizontal, 90 senkrecht).
+    :param azimuth: Ausrichtung der Fläche in Grad von Nord über Ost (180 = Süd).
+    :param albedo: Reflexionsgrad des Bodens.
+    :param step_hours: Länge eines Zeitschritts in Stunden.
+    :param time_shift: Siehe sun_position.
+    :return: Array der Strahlung auf die Fläche in kWh/m² je Zeitschritt (schreibgeschützt).
+    """
+    fingerprint = _climate_fingerprint(climate_data)
+    sky_key = ('sky', fingerprint, latitude, longitude, step_hours, time_shift)
+    key = ('poa', fingerprint, latitude, longitude, step_hours, time_shift, tilt, azimuth, albedo)
+
+    def compute():
+        sky = _cached(sky_key, lambda: _sky(climate_data, latitude, longitude, step_hours, time_shift))
+
+        beta = np.radians(tilt)
+        sin_zenith = np.sqrt(np.clip(1 - sky['cos_zenith']**2, 0.0, None))
+        cos_incidence = sky['cos_zenith'] * np.cos(beta) \
+            + sin_zenith * np.sin(beta) * np.cos(np.radians(sky['azimuth'] - azimuth))
+        cos_incidence = np.clip(cos_incidence, 0.0, None)
+
+        beam = sky['dni'] * cos_incidence
+        rb = np.zeros_like(beam)
+        np.divide(cos_incidence, sky['cos_zenith'], out=rb, where=sky['sun_up'])
+
+        diffuse = sky['dhi'] * (sky['anisotropy'] * rb + (1 - sky['anisotropy']) * (1 + np.cos(beta)) / 2)
+        ground = sky['ghi'] * albedo * (1 - np.cos(beta)) / 2
+
+        poa = beam + diffuse + ground
+        poa.flags.writeable = False
+        return poa
+
+    return _cached(key, compute)
+
+
+class SolarThermalCollector:
+    def __init__(self, name: str, area: float, tilt: float = 45.0, azimuth: float = 180.0,
+                 eta0: float = 0.8, a1: float = 3.5, a2: float = 0.015, mean_fluid_temp: float = 50.0):
+        """
+        Solarthermischer Kollektor mit Wirkungsgradkennlinie nach EN 12975 / ISO 9806:
+        η = η0 - a1·(Tm - Ta)/G - a2·(Tm - Ta)²/G.
+        Der Ertrag wird mit prepare für die gesamte Klimaserie vorab berechnet.
+        :param name: Name des Heizungssystems.
+        :param area: Aperturfläche in m².
+        :param tilt: Neigung in Grad.
+        :param azimuth: Ausrichtung in Grad von Nord über Ost (180 = Süd).
+        :param eta0: Konversionsfaktor (optischer Wirkungsgrad).
+        :param a1: Linearer Wärmedurchgangskoeffizient in W/(m²*K).
+        :param a2: Quadratischer Wärmedurchgangskoeffizient in W/(m²*K²).
+        :param mean_fluid_temp: Mittlere Fluidtemperatur im Kollektor in °C.
+        """
+        self.name = name
+        self.area = area
+        self.tilt = tilt
+        self.azimuth = azimuth
+        self.eta0 = eta0
+        self.a1 = a1
+        self.a2 = a2
+        self.mean_fluid_temp = mean_fluid_temp
+
+        self.heat_yield = None
+
+    def efficiency(self, irradiance: np.ndarray, air_temperature: np.ndarray) -> np.ndarray:
+        """
+        Kollektorwirkungsgrad, nicht negativ.
+        :param irradiance: Bestrahlungsstärke auf die Kollektorebene in W/m².
+        :param air_temperature: Außentemperatur in °C.
+        """
+        irradiance = np.asarray(irradiance, dtype=np.float64)
+        dT = self.mean_fluid_temp - np.asarray(air_temperature, dtype=np.float64)
+
+        eta = np.zeros(np.broadcast(irradiance, dT).shape)
+        np.divide(-self.a1 * dT - self.a2 * dT**2, irradiance, out=eta, where=irradiance > 0)
+        eta += self.eta0
+
+        return np.where(irradiance > 0, np.clip(eta, 0.0, None), 0.0)
+
+    def prepare(self, climate_data: pd.DataFrame, latitude: float, longitude: float, step_hours: float = 1.0):
+        """
+        Berechnet den Wärmeertrag für alle Zeitschritte der Klimaserie, bei fehlender Außentemperatur 0
+        (wie die Leistung der Wärmepumpe).
+        :param climate_data: DataFrame mit DatetimeIndex und den Spalten 'Tair' und 'radiation'.
+        :param latitude: Geographische Breite in Grad.
+        :param longitude: Geographische Länge in Grad.
+        :param step_hours: Länge eines Zeitschritts in Stunden.
+        :return: Array des Wärmeertrags in kWh je Zeitschritt.
+        """
+        poa = plane_of_array(climate_data, latitude, longitude, self.tilt, self.azimuth, step_hours=step_hours)
+        irradiance = poa * 1000 / step_hours # W/m²
+
+        eta = np.nan_to_num(self.efficiency(irradiance, climate_data['Tair'].to_numpy(dtype=np.float64)), nan=0.0)
+        self.heat_yield = eta * poa * self.area
+
+        return self.heat_yield
+
+    def dispatch_profile(self, solar_radiation: np.ndarray) -> tuple:
+        """
+        Kennwerte des Systems für den Dispatch, der Ertrag stammt aus prepare.
+        :param solar_radiation: Array der Globalstrahlung, nur für die Länge der Serie.
+        :return: Betriebsart, Wärmeertrag und Effizienz je Zeitschritt.
+        """
+        if self.heat_yield is None or len(self.heat_yield) != len(solar_radiation):
+            raise RuntimeError(f"{self.name}: call prepare() with the climate data before dispatch")
+
+        return DISPATCH_SUPPLY, self.heat_yield, np.ones(len(solar_radiation))
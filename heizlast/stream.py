@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from .house import House
+from .dispatch import run_dispatch
+from .climate import as_climate_source
+
+
+def _step_hours(index: pd.Index) -> float:
+    """
+    Länge eines Zeitschritts in Stunden aus den ersten beiden Zeitstempeln.
+    """
+    if len(index) < 2:
+        return 1.0
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError("step_hours can only be inferred from a DatetimeIndex, pass it explicitly")
+    return (index[1] - index[0]) / pd.Timedelta(hours=1)
+
+
+def iter_simulation(house: House, chunksize: int = 8760, step_hours: float = None, breakdown: bool = False):
+    """
+    Berechnet ein Haus abschnittsweise, ohne die gesamte Klimaserie oder alle Ergebnisse im Speicher zu halten.
+    Der Ladezustand des Pufferspeichers wird über die Abschnittsgrenzen fortgeschrieben, das Ergebnis ist
+    unabhängig von chunksize identisch mit einer Berechnung der gesamten Serie.
+    :param house: Instanz von House, die Klimadaten werden über ClimateSource.iter_chunks gelesen.
+    :param chunksize: Anzahl Zeitschritte je Abschnitt.
+    :param step_hours: Länge eines Zeitschritts in Stunden, Standard ist der Abstand der ersten beiden Zeitstempel.
+    :param breakdown: Transmissionswärmeverlust zusätzlich je Bauteil ausgeben.
+    :return: Generator von DataFrames je Abschnitt mit Energiewerten in kWh je Zeitschritt: Bauteile und ggf.
+             'ventilation' (bei breakdown), bei Wärmegewinnen 'gains', 'energy_needed' (abzüglich der Gewinne) und,
+             falls Pufferspeicher und Heizungssysteme vorhanden sind, 'buffer_energy', 'provided_energy', je
+             Heizungssystem eine Spalte und für Systeme mit Strombedarf '<Name>_electricity'.
+             Die Schrittlänge steht in frame.attrs['step_hours'].
+    """
+    # Prüfung beim Aufruf, nicht erst beim ersten Abschnitt des Generators
+    if getattr(house, 'zones', None):
+        raise TypeError("iter_simulation needs a single-zone House, calculate a MultiZoneHouse with run()")
+
+    return _iter_chunks(house, chunksize, step_hours, breakdown)
+
+
+def _iter_chunks(house: House, chunksize: int, step_hours: float, breakdown: bool):
+
+    source = house._climate_source if house._climate_source is not None else as_climate_source(house._climate_data)
+
+    U, A, r = house._component_data()
+    uar = U * A * r / 1000 # W/K in kW/K
+    names = [component.name for component in house.components]
+
+    buffer_tank = getattr(house, 'buffer', None)
+    simulate = buffer_tank is not None and bool(house.heating_systems)
+    has_gains = house._has_gains()
+
+    for chunk in source.iter_chunks(chunksize):
+        if step_hours is None:
+            step_hours = _step_hours(chunk.index)
+
+        airtemp = chunk['Tair'].to_numpy(dtype=np.float64)
+
+        deltaT = house.Tinner - airtemp
+        deltaT[airtemp > house.T_heating] = np.nan
+        deltaT *= step_hours
+
+        hv = house._ventilation_coefficient(airtemp, index=chunk.index)
+
+        results = {}
+        if breakdown:
+            for name, value in zip(names, uar):
+                results[name] = deltaT * value
+            if hv is not None:
+                results['ventilation'] = deltaT * hv
+
+        # außerhalb der Heizperiode 0 statt NaN
+        if hv is None:
+            energy_needed = np.nan_to_num(deltaT, nan=0.0) * uar.sum()
+        else:
+            energy_needed = np.nan_to_num(deltaT, nan=0.0) * (hv + uar.sum())
+
+        if has_gains:
+            gains = house._gains_values(chunk, step_hours=step_hours)[1].sum(axis=1)
+            results['gains'] = gains
+            energy_needed = np.maximum(energy_needed - gains, 0.0)
+        results['energy_needed'] = energy_needed
+
+        if simulate:
+            for system in house.heating_systems:
+                if hasattr(system, 'prepare'):
+                    system.prepare(chunk, house.latitude, house.longitude, step_hours=step_hours)
+
+            dispatch = run_dispatch(buffer_tank, house.heating_systems, energy_needed=energy_needed,
+                                    solar_radiation=chunk['radiation'].to_numpy(dtype=np.float64),
+                                    step_hours=step_hours)
+            results['buffer_energy'] = dispatch['buffer_energy']
+            results['provided_energy'] = dispatch['provided_energy']
+            for j, system in enumerate(house.heating_systems):
+                results[system.name] = dispatch['systems'][j]
+            for j, system in enumerate(house.heating_systems):
+                if hasattr(system, 'electricity'):
+                    results[f'{system.name}_electricity'] = system.electricity(dispatch['systems'][j])
+
+        frame = pd.DataFrame(results, index=chunk.index)
+        frame.attrs['step_hours'] = step_hours
+        yield frame
+
+
+def stream_house(house: House, chunksize: int = 8760, step_hours: float = None,
+                 path: str = None, breakdown: bool = False) -> pd.DataFrame:
+    """
+    Streaming-Berechnung eines Hauses mit begrenztem Speicherbedarf, z.B. für 10-Minuten-Werte über Jahrzehnte.
+    Je Abschnitt werden nur Kennwerte behalten, die Zeitreihen können zusätzlich fortlaufend in eine
+    Parquet-Datei geschrieben werden.
+    :param house: Instanz von House.
+    :param chunksize: Anzahl Zeitschritte je Abschnitt.
+    :param step_hours: Länge eines Zeitschritts in Stunden, siehe iter_simulation.
+    :param path: Optionaler Pfad einer Parquet-Datei für die Ergebnisse aller Zeitschritte.
+    :param breakdown: Transmissionswärmeverlust zusätzlich je Bauteil ausgeben.
+    :return: DataFrame mit einer Zeile je Abschnitt: 'start', 'end', Summen aller Ergebnisspalten in kWh,
+             'peak_heat_load' in kW und, falls vorhanden, 'buffer_charge' (Ladezustand am Ende in kWh).
+    """
+    writer = None
+    schema = None
+    rows = []
+
+    try:
+        for frame in iter_simulation(house, chunksize=chunksize, step_hours=step_hours, breakdown=breakdown):
+            if path is not None:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(frame, schema=schema, preserve_index=True)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(table)
+
+            row = {'start': frame.index[0], 'end': frame.index[-1]}
+            row.update(frame.sum())
+            row['peak_heat_load'] = frame['energy_needed'].max() / frame.attrs['step_hours']
+            if getattr(house, 'buffer', None) is not None and house.heating_systems:
+                row['buffer_charge'] = house.buffer.charge
+            rows.append(row)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return pd.DataFrame(rows, index=pd.RangeIndex(len(rows), name='chunk'))
@@ -0,0 +1,205 @@
+import copy
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .house import House
+from .calc import transmission_coefficients
+from .batch import run_batch
+from .climate import as_climate_source
+from .ventilation import Ventilation
+from .stream import _step_hours
+
+
+# Listen der Spezifikation, deren Einträge die Transmission bestimmen
+ENVELOPE_KEYS = ('walls', 'ceilings', 'roofs', 'windows')
+HEATING_KEYS = ('gas_heating_systems', 'solar_heating_systems', 'solar_collectors', 'heat_pumps')
+
+HOURS_PER_YEAR = 8760
+
+PEAK_BLOCK_SIZE = 2**22 # Elemente je Block bei der Spitzenlast mit Lüftung (32 MB)
+
+
+def _find_entry(spec: dict, name: str) -> tuple:
+    """
+    Sucht einen Eintrag (Bauteil oder Heizungssystem) der Spezifikation über seinen Namen.
+    :return: (Schlüssel der Liste, Eintrag)
+    """
+    for key in ENVELOPE_KEYS + HEATING_KEYS:
+        for entry in spec.get(key) or []:
+            if entry.get('name') == name:
+                return key, entry
+    raise KeyError(f"no component or heating system named '{name}' in spec")
+
+
+def _parameter_kind(spec: dict, path: str) -> str:
+    """
+    Ordnet einen Parameter ein: 'temperature' und 'envelope' wirken linear auf die Transmission,
+    'ventilation' auf den Lüftungswärmeverlust, 'heating' nur auf die Simulation des Pufferspeichers.
+    """
+    parts = path.split('.')
+    if parts[0] in ('Tinner', 'T_heating') and len(parts) == 1:
+        return 'temperature'
+    if parts[0] == 'buffer':
+        return 'heating'
+    if parts[0] == 'ventilation':
+        return 'ventilation'
+
+    key, _ = _find_entry(spec, parts[0])
+    return 'envelope' if key in ENVELOPE_KEYS else 'heating'
+
+
+def set_parameter(spec: dict, path: str, value):
+    """
+    Setzt einen Parameter der Spezifikation (in-place).
+    :param spec: Spezifikation, siehe House.from_spec.
+    :param path: 'Tinner' bzw. 'T_heating', 'buffer.<Argument>', 'ventilation.<Argument>', '<Name>.<Argument>' für Bauteile und
+                 Heizungssysteme oder '<Bauteil>.<Schicht>.<Argument>' für Schichten, z.B. 'Außenwand.Dämmung.thickness'.
+    :param value: Neuer Wert.
+    """
+    parts = path.split('.')
+
+    if len(parts) == 1:
+        spec[parts[0]] = value
+        return
+    if parts[0] in ('buffer', 'ventilation'):
+        spec.setdefault(parts[0], {})[parts[1]] = value
+        return
+
+    _, entry = _find_entry(spec, parts[0])
+    if len(parts) == 2:
+        entry[parts[1]] = value
+        return
+
+    for layer in entry.get('layers_info') or []:
+        if layer.get('name') == parts[1]:
+            layer[parts[2]] = value
+            return
+    raise KeyError(f"{parts[0]}: no layer named '{parts[1]}'")
+
+
+def _apply(spec: dict, params: dict) -> dict:
+
+    spec = copy.deepcopy(spec)
+    for path, value in params.items():
+        set_parameter(spec, path, value)
+    return spec
+
+
+def _envelope_coefficient(climate_data: pd.DataFrame, spec: dict) -> float:
+    """
+    Summe U·A·r der Gebäudehülle in kW/K.
+    """
+    envelope = {key: spec[key] for key in ENVELOPE_KEYS if spec.get(key)}
+    house = House.from_spec(climate_data, envelope)
+    return transmission_coefficients(house.components).sum() / 1000
+
+
+def sweep(climate_data, spec: dict, grid: dict, processes: int = None, chunksize: int = 16,
+          engine: str = 'numpy', step_hours: float = None) -> pd.DataFrame:
+    """
+    Parameterstudie über das kartesische Produkt der Parameterwerte.
+    Der Transmissionswärmeverlust ist linear in U·A·r und wird für alle Gitterpunkte ohne Zeitreihen je Punkt
+    aus den Summen und Maxima von ΔT je Temperaturkombination berechnet, ein Lüftungswärmeverlust je Kombination aus
+    Lüftungsparametern und Temperaturen als ein Vektor über die Zeitschritte. Nur falls das Haus einen Pufferspeicher
+    und Heizungssysteme hat, wird jeder Gitterpunkt zusätzlich mit run_batch (parallel) simuliert.
+    :param climate_data: DataFrame mit stündlichen Werten 'Tair' und 'radiation' oder eine ClimateSource.
+    :param spec: Basis-Spezifikation, siehe House.from_spec.
+    :param grid: Dictionary Parameter -> Liste von Werten, Parameter wie in set_parameter,
+                 z.B. {'Außenwand.Mineralwolledämmung.thickness': [100, 160, 200], 'buffer.capacity_liters': [500, 1000],
+                 'ventilation.recovery_efficiency': [0.0, 0.8]}.
+    :param processes: Anzahl der Worker-Prozesse für die Simulation, siehe run_batch.
+    :param chunksize: Anzahl Gitterpunkte je Aufgabe, siehe run_batch.
+    :param engine: Berechnungskern der Heizungssteuerung.
+    :param step_hours: Länge eines Zeitschritts in Stunden, Standard ist der Abstand der ersten beiden Zeitstempel.
+    :return: DataFrame mit einer Zeile je Gitterpunkt: Parameterwerte, 'annual_heat_loss' (kWh/a, einschließlich
+             Lüftung), ggf. 'ventilation_heat_loss' (kWh/a), 'peak_heat_load' (kW)
+             und bei Simulation die Jahressummen der Heizungssysteme (kWh/a), 'annual_gas' (kWh/a) und 'gas_share'.
+    """
+    climate_data = as_climate_source(climate_data).load()
+    if len(climate_data) == 0:
+        raise ValueError("climate_data is empty")
+    if step_hours is None:
+        step_hours = _step_hours(climate_data.index)
+
+    paths = list(grid)
+    kinds = {path: _parameter_kind(spec, path) for path in paths}
+    points = pd.DataFrame(list(itertools.product(*(grid[path] for path in paths))), columns=paths)
+
+    temperature_paths = [path for path in paths if kinds[path] == 'temperature']
+    envelope_paths = [path for path in paths if kinds[path] == 'envelope']
+    ventilation_paths = [path for path in paths if kinds[path] == 'ventilation']
+
+    # U·A·r je eindeutiger Hüllenvariante
+    H = np.empty(len(points), dtype=np.float64)
+    envelope_groups = points.groupby(envelope_paths, sort=False).indices if envelope_paths else {(): np.arange(len(points))}
+    for values, rows in envelope_groups.items():
+        values = values if isinstance(values, tuple) else (values,)
+        H[rows] = _envelope_coefficient(climate_data, _apply(spec, dict(zip(envelope_paths, values))))
+
+    # Summe und Maximum von ΔT je eindeutiger Temperaturkombination, gemeinsam für alle Kombinationen berechnet
+    Tinner = points['Tinner'].to_numpy(dtype=np.float64) if 'Tinner' in temperature_paths \
+        else np.full(len(points), spec.get('Tinner', 20.0), dtype=np.float64)
+    T_heating = points['T_heating'].to_numpy(dtype=np.float64) if 'T_heating' in temperature_paths \
+        else np.full(len(points), spec.get('T_heating', 17.0), dtype=np.float64)
+
+    temperatures, inverse = np.unique(np.column_stack([Tinner, T_heating]), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    airtemp = climate_data['Tair'].to_numpy(dtype=np.float64)
+    # außerhalb der Heizperiode und bei fehlender Außentemperatur 0 statt NaN, wie in House
+    deltaT = np.nan_to_num(temperatures[:, :1] - airtemp, nan=0.0)
+    deltaT[airtemp > temperatures[:, 1:]] = 0.0
+
+    # Energiesummen in kWh je Jahr
+    years = len(airtemp) * step_hours / HOURS_PER_YEAR
+    per_year = step_hours / years
+
+    result = points.copy()
+    if spec.get('ventilation') or ventilation_paths:
+        # Lüftung: H_V(t) hängt von der Außentemperatur ab, die Spitzenlast daher nicht mehr nur von max(ΔT)
+        ventilation_loss = np.empty(len(points), dtype=np.float64)
+        peak = np.empty(len(points), dtype=np.float64)
+        groups = points[ventilation_paths].assign(_temperature=inverse).groupby(
+            ventilation_paths + ['_temperature'], sort=False).indices
+        for values, rows in groups.items():
+            values = values if isinstance(values, tuple) else (values,)
+            ventilation = _apply({'ventilation': spec.get('ventilation') or {}},
+                                 dict(zip(ventilation_paths, values[:-1])))['ventilation']
+            dT = deltaT[values[-1]]
+            hv = Ventilation(**ventilation).coefficient(climate_data.index, airtemp)
+            loss = np.nan_to_num(hv, nan=0.0) / 1000 * dT
+            ventilation_loss[rows] = loss.sum() * per_year
+
+            # blockweise, damit Hüllenvarianten x Zeitschritte nicht auf einmal im Speicher liegen
+            block = max(1, PEAK_BLOCK_SIZE // len(dT))
+            for start in range(0, len(rows), block):
+                part = rows[start:start + block]
+                peak[part] = (np.multiply.outer(H[part], dT) + loss).max(axis=1)
+
+        result['annual_heat_loss'] = H * deltaT.sum(axis=1)[inverse] * per_year + ventilation_loss
+        result['ventilation_heat_loss'] = ventilation_loss
+        result['peak_heat_load'] = peak
+    else:
+        result['annual_heat_loss'] = H * deltaT.sum(axis=1)[inverse] * per_year
+        result['peak_heat_load'] = H * deltaT.max(axis=1)[inverse]
+
+    if not (spec.get('buffer') and any(spec.get(key) for key in HEATING_KEYS)):
+        return result
+
+    specs = {i: _apply(spec, params) for i, params in enumerate(points.to_dict(orient='records'))}
+    summary = run_batch(specs, climate_data, result='summary', processes=processes, chunksize=chunksize, engine=engine)
+    summary = summary.reindex(range(len(points)))
+
+    systems = [entry['name'] for key in HEATING_KEYS for entry in spec.get(key) or []]
+    gas = [entry['name'] for entry in spec.get('gas_heating_systems') or []]
+
+    for name in systems:
+        result[name] = summary[name].to_numpy() / years
+
+    result['annual_gas'] = result[gas].sum(axis=1)
+    total = result[systems].sum(axis=1)
+    result['gas_share'] = (result['annual_gas'] / total).where(total > 0)
+
+    return result
@@ -0,0 +1,119 @@
+from functools import lru_cache
+
+import numpy as np
+
+from .calc import component_ua
+
+
+def _signature(component) -> tuple:
+    """
+    Aufbau eines Bauteils mit Wärmekapazität als hashbarer Schlüssel, None für Bauteile ohne Speichermasse.
+    """
+    layer_data = getattr(component, 'layer_data', None)
+    if layer_data is None or layer_data.shape[1] == 0 or not (layer_data[4] > 0).any():
+        return None
+
+    return (layer_data[2].tobytes(), layer_data[4].tobytes(),
+            float(component.thermal_resistance_inside), float(component.thermal_resistance_outside))
+
+
+@lru_cache(maxsize=1024)
+def _modes(signature: tuple, dt: float) -> tuple:
+    """
+    Eigenformen des RC-Netzwerks eines Bauteils (je m²).
+    Jede Schicht mit Wärmekapazität ist ein Knoten in Schichtmitte, Schichten ohne Wärmekapazität (z.B. Luft)
+    gehen nur als Widerstand zwischen den Knoten ein. Mit θ = T - Ti und u = Ti - Te gilt C θ' = -K θ - b u,
+    mit K v = λ C v (V^T C V = I) zerfällt das implizite Euler-Verfahren in unabhängige Filter erster Ordnung
+    s[n] = a (s[n-1] + u[n]) mit a = 1/(1 + dt λ).
+    :param signature: Siehe _signature.
+    :param dt: Zeitschritt in s.
+    :return: (a, gain): Wärmestrom von innen in W/m² = Σ gain·s.
+    """
+    from scipy.linalg import eigh
+
+    layer_R, layer_C, Rsi, Rse = signature
+    layer_R = np.frombuffer(layer_R)
+    layer_C = np.frombuffer(layer_C)
+
+    # Leitwerte zwischen innen, den Knoten und außen
+    conductance = []
+    capacity = []
+    resistance = Rsi
+    for R, C in zip(layer_R, layer_C):
+        if C > 0:
+            conductance.append(1 / (resistance + R / 2))
+            capacity.append(C)
+            resistance = R / 2
+        else:
+            resistance += R
+    conductance.append(1 / (resistance + Rse))
+
+    g = np.array(conductance)
+    n = len(capacity)
+
+    K = np.diag(g[:-1] + g[1:])
+    K[np.arange(n - 1), np.arange(1, n)] = -g[1:-1]
+    K[np.arange(1, n), np.arange(n - 1)] = -g[1:-1]
+
+    b = np.zeros(n)
+    b[-1] = g[-1]
+
+    lam, V = eigh(K, np.diag(capacity))
+
+    a = 1 / (1 + dt * lam)
+    # q = g0 (Ti - T0) = -g0 θ0 = -g0 Σ V0k zk mit zk = -dt ck sk und c = V^T b
+    gain = g[0] * V[0] * dt * (V.T @ b)
+
+    return a, gain
+
+
+def _filter(a: float, u: np.ndarray) -> np.ndarray:
+    """
+    s[n] = a (s[n-1] + u[n]), Startwert ist der eingeschwungene Zustand zu u[0].
+    """
+    from scipy.signal import lfilter
+
+    s0 = a * u[0] / (1 - a)
+    return lfilter([a], [1, -a], u, zi=[a * s0])[0]
+
+
+def transient_heat_flow(components: list, deltaT: np.ndarray, step_hours: float = 1.0) -> np.ndarray:
+    """
+    Instationärer Wärmestrom durch die Bauteile bei konstanter Innentemperatur.
+    Wände, Decken und Dächer mit Wärmekapazität (Layer.density und Layer.specific_heat_capacity) werden als
+    RC-Netzwerk mit einem Knoten je Schicht implizit gerechnet, alle übrigen Bauteile stationär mit U·A·r·ΔT.
+    Die Eigenformen werden je Bauteilaufbau einmal berechnet, gleiche Abklingkonstanten aller Bauteile werden
+    gemeinsam gefiltert, der Aufwand ist linear in der Anzahl Zeitschritte.
+    Bei konstantem ΔT ergibt sich exakt der stationäre Wert U·A·r·ΔT.
+    :param components: Liste von Bauteilen.
+    :param deltaT: Temperaturdifferenz innen - außen je Zeitschritt in K (ohne NaN).
+    :param step_hours: Länge eines Zeitschritts in Stunden.
+    :return: Array (Zeitschritte x Bauteile) des Wärmestroms in W.
+    """
+    deltaT = np.ascontiguousarray(deltaT, dtype=np.float64)
+    if np.isnan(deltaT).any():
+        raise ValueError("deltaT contains NaN, fill gaps before the transient calculation")
+    dt = step_hours * 3600
+
+    flow = np.empty((len(deltaT), len(components)), dtype=np.float64)
+
+    # Gewicht je (Bauteil, Abklingkonstante)
+    weights = {}
+    for j, component in enumerate(components):
+        signature = _signature(component)
+        if signature is None:
+            flow[:, j] = component_ua(component) * component.r * deltaT
+            continue
+
+        flow[:, j] = 0.0
+        a, gain = _modes(signature, dt)
+        for a_k, gain_k in zip(a, gain):
+            column = weights.setdefault(float(a_k), {})
+            column[j] = column.get(j, 0.0) + gain_k * component.area * component.r
+
+    for a_k, column in weights.items():
+        s = _filter(a_k, deltaT)
+        for j, weight in column.items():
+            flow[:, j] += weight * s
+
+    return flow
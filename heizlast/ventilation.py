@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from .gains import schedule_values
+
+
+AIR_HEAT_CAPACITY = 0.34 # Wh/(m³*K), ρ·c von Luft
+
+
+class Ventilation:
+    def __init__(self, volume: float, air_change_rate: float = 0.5, schedule=None, infiltration_rate: float = 0.0,
+                 recovery_efficiency=0.0, frost_temp: float = -3.0, frost_slope: float = 0.03):
+        """
+        Lüftungs- und Infiltrationswärmeverlust H_V = 0.34·V·(n_inf + n·s(t)·(1 - η(T))).
+        :param volume: Beheiztes Luftvolumen in m³.
+        :param air_change_rate: Luftwechselrate der (mechanischen oder Fenster-)Lüftung in 1/h.
+        :param schedule: Nutzungsplan als Anteil von air_change_rate, siehe gains.schedule_values.
+        :param infiltration_rate: Luftwechselrate durch Undichtheiten in 1/h, ohne Wärmerückgewinnung.
+        :param recovery_efficiency: Wärmebereitstellungsgrad der Wärmerückgewinnung (0 bis 1) oder eine Funktion,
+                                    die ihn aus einem Array der Außentemperatur berechnet.
+        :param frost_temp: Unterhalb dieser Außentemperatur in °C sinkt der Wärmebereitstellungsgrad (Frostschutz).
+        :param frost_slope: Abnahme des Wärmebereitstellungsgrads je K unterhalb von frost_temp (relativ).
+        """
+        self.volume = volume
+        self.air_change_rate = air_change_rate
+        self.schedule = schedule
+        self.infiltration_rate = infiltration_rate
+        self.recovery_efficiency = recovery_efficiency
+        self.frost_temp = frost_temp
+        self.frost_slope = frost_slope
+
+    def __repr__(self):
+
+        return f"Ventilation(volume={self.volume}, air_change_rate={self.air_change_rate}, " \
+               f"infiltration_rate={self.infiltration_rate})"
+
+    def key(self) -> tuple:
+        """
+        Parameter als Schlüssel für zwischengespeicherte Ergebnisse.
+        """
+        return (self.volume, self.air_change_rate, id(self.schedule), self.infiltration_rate,
+                self.recovery_efficiency if np.isscalar(self.recovery_efficiency) else id(self.recovery_efficiency),
+                self.frost_temp, self.frost_slope)
+
+    def efficiency(self, air_temperature: np.ndarray) -> np.ndarray:
+        """
+        Wärmebereitstellungsgrad je Zeitschritt, unterhalb von frost_temp linear abgemindert.
+        :param air_temperature: Array der Außentemperatur in °C.
+        """
+        if callable(self.recovery_efficiency):
+            return np.asarray(self.recovery_efficiency(air_temperature), dtype=np.float64)
+
+        frost = np.clip(self.frost_temp - air_temperature, 0.0, None)
+        return self.recovery_efficiency * np.clip(1 - self.frost_slope * frost, 0.0, 1.0)
+
+    def coefficient(self, index: pd.DatetimeIndex, air_temperature: np.ndarray) -> np.ndarray:
+        """
+        Lüftungswärmeverlustkoeffizient für alle Zeitschritte.
+        :param index: Zeitstempel (für den Nutzungsplan).
+        :param air_temperature: Array der Außentemperatur in °C.
+        :return: Array von H_V in W/K.
+        """
+        air_temperature = np.asarray(air_temperature, dtype=np.float64)
+
+        rate = schedule_values(self.schedule, index) * self.air_change_rate
+        if callable(self.recovery_efficiency) or self.recovery_efficiency:
+            rate *= 1 - self.efficiency(air_temperature)
+        rate += self.infiltration_rate
+
+        return AIR_HEAT_CAPACITY * self.volume * rate
+
+    def design_coefficient(self, theta_e):
+        """
+        H_V in W/K bei Norm-Außentemperatur und voller Nutzung.
+        :param theta_e: Norm-Außentemperatur in °C, Skalar oder Array.
+        """
+        n = self.air_change_rate * (1 - self.efficiency(np.asarray(theta_e, dtype=np.float64))) + self.infiltration_rate
+        return AIR_HEAT_CAPACITY * self.volume * n
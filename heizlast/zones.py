@@ -0,0 +1,326 @@
+import numpy as np
+import pandas as pd
+
+from .house import House, Window
+from .calc import DESIGN_OUTDOOR_TEMPERATURE
+from .ventilation import AIR_HEAT_CAPACITY
+
+
+OUTSIDE = 'outside'
+GROUND = 'ground'
+
+
+class Zone:
+    def __init__(self, name: str, heated: bool = True, setpoint: float = 20.0, volume: float = 0.0,
+                 air_change_rate: float = 0.0):
+        """
+        Zone eines Gebäudes, z.B. ein Raum, ein unbeheizter Dachboden oder Keller.
+        :param name: Name der Zone.
+        :param heated: Beheizte Zonen haben die Temperatur setpoint, die Temperatur unbeheizter Zonen stellt sich
+                       aus der Wärmebilanz ein.
+        :param setpoint: Innentemperatur beheizter Zonen in °C.
+        :param volume: Luftvolumen in m³.
+        :param air_change_rate: Luftwechselrate mit der Außenluft in 1/h.
+        """
+        self.name = name
+        self.heated = heated
+        self.setpoint = setpoint
+        self.volume = volume
+        self.air_change_rate = air_change_rate
+
+    def __repr__(self):
+
+        return f"Zone({self.name!r}, heated={self.heated}, setpoint={self.setpoint})"
+
+    @property
+    def ventilation_coefficient(self) -> float:
+        """
+        Lüftungswärmeverlustkoeffizient zur Außenluft in W/K.
+        """
+        return AIR_HEAT_CAPACITY * self.volume * self.air_change_rate
+
+
+class MultiZoneHouse(House):
+    def __init__(self, climate_data, Tinner=20.0, T_heating=17.0, ground_temp=10.0, **kwargs):
+        """
+        Haus aus mehreren Zonen. Jedes Bauteil trennt eine Zone von außen, vom Erdreich oder von einer anderen Zone,
+        Reduktionsfaktoren r für unbeheizte Räume sind damit nicht mehr nötig.
+        Die Temperaturen der unbeheizten Zonen werden für alle Zeitschritte aus einem dünn besetzten linearen
+        Gleichungssystem bestimmt, das einmal zerlegt und für alle Zeitschritte als rechte Seiten gelöst wird.
+        :param climate_data: DataFrame mit den Spalten 'Tair' und 'radiation' oder eine ClimateSource.
+        :param Tinner: Standard-Innentemperatur beheizter Zonen in °C.
+        :param T_heating: Bis zu dieser Außentemperatur wird geheizt.
+        :param ground_temp: Temperatur des Erdreichs in °C, Skalar oder Array je Zeitschritt.
+        :param kwargs: Weitere Argumente für House, z.B. engine.
+        """
+        super().__init__(climate_data, Tinner=Tinner, T_heating=T_heating, **kwargs)
+
+        self.ground_temp = ground_temp
+        self.zones = {}
+        # je Bauteil (Zone, angrenzende Zone bzw. OUTSIDE oder GROUND), parallel zu components
+        self.links = []
+
+    SPEC_METHODS = {'zones': 'add_zone', **House.SPEC_METHODS}
+
+    @classmethod
+    def from_spec(cls, climate_data, spec: dict, **kwargs):
+        """
+        Erstellt ein Haus aus einer Spezifikation, siehe House.from_spec, zusätzlich mit 'zones' (Argumente von
+        add_zone). Die Lüftung wird je Zone über 'volume' und 'air_change_rate' angegeben.
+        """
+        if spec.get('ventilation'):
+            raise ValueError("MultiZoneHouse spec: 'ventilation' is not supported, "
+                             "set 'volume' and 'air_change_rate' per entry in 'zones' instead")
+
+        return super().from_spec(climate_data, spec, **kwargs)
+
+    def add_zone(self, name: str, heated: bool = True, setpoint: float = None, volume: float = 0.0,
+                 air_change_rate: float = 0.0):
+        """
+        Fügt eine Zone hinzu, siehe Zone.
+        :param setpoint: Innentemperatur in °C, Standard ist Tinner.
+        """
+        if name in self.zones or name in (OUTSIDE, GROUND):
+            raise ValueError(f"zone name '{name}' is already used")
+
+        self.zones[name] = Zone(name=name, heated=heated, setpoint=self.Tinner if setpoint is None else setpoint,
+                                volume=volume, air_change_rate=air_change_rate)
+
+    def _link(self, zone: str, adjacent: str):
+        """
+        Ordnet das zuletzt hinzugefügte Bauteil einer Zone und seiner angrenzenden Seite zu.
+        """
+        if zone is None:
+            if len(self.zones) != 1:
+                raise ValueError(f"{self.components[-1].name}: zone is required with {len(self.zones)} zones")
+            zone = next(iter(self.zones))
+
+        if zone not in self.zones or (adjacent not in self.zones and adjacent not in (OUTSIDE, GROUND)) \
+                or zone == adjacent:
+            component = self.components.pop()
+            raise ValueError(f"{component.name}: invalid link from '{zone}' to '{adjacent}'")
+
+        self.links.append((zone, adjacent))
+        self._loss_cache = None
+
+    def add_wall(self, name: str, area: float, layers_info: list = None, zone: str = None, adjacent: str = OUTSIDE,
+                 **kwargs):
+        """
+        Fügt eine Wand hinzu, siehe House.add_wall.
+        :param zone: Zone auf der Innenseite, bei nur einer Zone optional.
+        :param adjacent: Angrenzende Zone, OUTSIDE oder GROUND.
+        """
+        super().add_wall(name, area, layers_info, **kwargs)
+        self._link(zone, adjacent)
+
+    def add_ceiling(self, name: str, area: float, layers_info: list = None, zone: str = None, adjacent: str = OUTSIDE,
+                    **kwargs):
+        """
+        Fügt eine Decke hinzu, z.B. zwischen Wohnraum (zone) und unbeheiztem Dachboden (adjacent).
+        """
+        super().add_ceiling(name, area, layers_info, **kwargs)
+        self._link(zone, adjacent)
+
+    def add_roof(self, name: str, area: float, layers_info: list = None, zone: str = None, adjacent: str = OUTSIDE,
+                 **kwargs):
+        """
+        Fügt ein Dach hinzu, siehe House.add_roof.
+        """
+        super().add_roof(name, area, layers_info, **kwargs)
+        self._link(zone, adjacent)
+
+    def add_window(self, name: str, area: float, number: int, thermal_conductivity: float, zone: str = None,
+                   adjacent: str = OUTSIDE, **kwargs):
+        """
+        Fügt ein Fenster hinzu, siehe House.add_window.
+        """
+        super().add_window(name, area, number, thermal_conductivity, **kwargs)
+        self._link(zone, adjacent)
+
+    def add_component(self, component, zone: str = None, adjacent: str = OUTSIDE):
+        """
+        Fügt ein bereits erstelltes Bauteil hinzu, z.B. aus house.build_component.
+        """
+        self.components.append(component)
+        self._link(zone, adjacent)
+
+    def _solar_windows(self) -> list:
+        """
+        Nur Fenster beheizter Zonen nach außen tragen zu den Wärmegewinnen bei.
+        """
+        return [component for component, (zone, adjacent) in zip(self.components, self.links)
+                if isinstance(component, Window) and component.g_value is not None and component.azimuth is not None
+                and self.zones[zone].heated and adjacent == OUTSIDE]
+
+    def _network(self) -> tuple:
+        """
+        Leitwerte zwischen den Zonen und nach außen bzw. zum Erdreich in kW/K.
+        :return: (Zonennamen, Leitwertmatrix (Zonen x Zonen, dünn besetzt), Leitwert nach außen, zum Erdreich,
+                  Knoten je Bauteil und Seite (Bauteile x 2, -1 außen, -2 Erdreich), U·A·r je Bauteil)
+        """
+        from scipy.sparse import coo_array
+
+        names = list(self.zones)
+        position = {name: k for k, name in enumerate(names)}
+        position[OUTSIDE] = -1
+        position[GROUND] = -2
+
+        U, A, r = self._component_data()
+        uar = U * A * r / 1000 # W/K in kW/K
+
+        nodes = np.array([[position[zone], position[adjacent]] for zone, adjacent in self.links],
+                         dtype=np.int64).reshape(len(self.links), 2)
+
+        n = len(names)
+        outside = np.zeros(n)
+        ground = np.zeros(n)
+        internal = (nodes >= 0).all(axis=1)
+
+        for side, other in ((0, 1), (1, 0)):
+            to_outside = (nodes[:, side] >= 0) & (nodes[:, other] == -1)
+            to_ground = (nodes[:, side] >= 0) & (nodes[:, other] == -2)
+            np.add.at(outside, nodes[to_outside, side], uar[to_outside])
+            np.add.at(ground, nodes[to_ground, side], uar[to_ground])
+
+        outside += np.array([zone.ventilation_coefficient for zone in self.zones.values()]) / 1000
+
+        i, j = nodes[internal, 0], nodes[internal, 1]
+        conductance = coo_array((np.concatenate([uar[internal], uar[internal]]),
+                                 (np.concatenate([i, j]), np.concatenate([j, i]))), shape=(n, n)).tocsr()
+
+        return names, conductance, outside, ground, nodes, uar
+
+    def zone_temperatures(self, airtemp: np.ndarray = None, ground_temp=None) -> np.ndarray:
+        """
+        Temperaturen aller Zonen für alle Zeitschritte (stationäre Wärmebilanz je Zeitschritt).
+        Für die unbeheizten Zonen F gilt L_FF T_F = g_out T_e + g_ground T_g + G_FH T_H mit der Leitwertmatrix L,
+        die Matrix wird einmal LU-zerlegt und mit allen Zeitschritten als rechte Seiten gelöst.
+        :param airtemp: Array der Außentemperatur in °C, Standard sind die Klimadaten.
+        :param ground_temp: Temperatur des Erdreichs in °C passend zu airtemp, Standard ist self.ground_temp.
+        :return: Array (Zonen x Zeitschritte) in °C, Reihenfolge wie zones.
+        """
+        from scipy.sparse import diags
+        from scipy.sparse.linalg import splu
+
+        if airtemp is None:
+            airtemp = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        airtemp = np.atleast_1d(np.asarray(airtemp, dtype=np.float64))
+
+        names, conductance, outside, ground, _, _ = self._network()
+        heated = np.array([zone.heated for zone in self.zones.values()], dtype=bool)
+        setpoint = np.array([zone.setpoint for zone in self.zones.values()], dtype=np.float64)
+
+        temperatures = np.empty((len(names), len(airtemp)), dtype=np.float64)
+        temperatures[heated] = setpoint[heated, np.newaxis]
+
+        free = np.flatnonzero(~heated)
+        if len(free) == 0:
+            return temperatures
+
+        fixed = np.flatnonzero(heated)
+        G_FF = conductance[free][:, free]
+        L = diags(np.asarray(conductance[free].sum(axis=1)).ravel() + outside[free] + ground[free]) - G_FF
+
+        ground_temp = self.ground_temp if ground_temp is None else ground_temp
+        ground_temp = np.broadcast_to(np.asarray(ground_temp, dtype=np.float64), airtemp.shape)
+        rhs = np.multiply.outer(outside[free], airtemp) + np.multiply.outer(ground[free], ground_temp)
+        rhs += (conductance[free][:, fixed] @ setpoint[fixed])[:, np.newaxis]
+
+        temperatures[free] = splu(L.tocsc()).solve(rhs)
+        return temperatures
+
+    def _heat_flows(self, airtemp: np.ndarray, temperatures: np.ndarray, ground_temp=None) -> tuple:
+        """
+        Wärmeverlust der beheizten Zonen je Bauteil und durch Lüftung.
+        :return: (Array (Zeitschritte x Bauteile), Array (Zeitschritte x beheizte Zonen mit Lüftung), Namen der Zonen)
+        """
+        names, _, _, _, nodes, uar = self._network()
+        heated = np.array([zone.heated for zone in self.zones.values()], dtype=bool)
+
+        ground_temp = self.ground_temp if ground_temp is None else ground_temp
+        ground_temp = np.broadcast_to(np.asarray(ground_temp, dtype=np.float64), airtemp.shape)
+        # Temperaturen der Knoten je Zeitschritt: Zonen, dann Erdreich (-2) und außen (-1)
+        node_temperatures = np.vstack([temperatures, ground_temp, airtemp])
+
+        flows = np.zeros((len(airtemp), len(uar)), dtype=np.float64)
+        for side, other in ((0, 1), (1, 0)):
+            losing = np.flatnonzero((nodes[:, side] >= 0) & heated[np.clip(nodes[:, side], 0, None)])
+            if len(losing):
+                flows[:, losing] += (uar[losing] * (node_temperatures[nodes[losing, side]]
+                                                    - node_temperatures[nodes[losing, other]]).T)
+
+        zones = list(self.zones.values())
+        ventilated = [k for k, zone in enumerate(zones) if zone.heated and zone.ventilation_coefficient > 0]
+        coefficients = np.array([zones[k].ventilation_coefficient for k in ventilated]) / 1000
+        ventilation = coefficients * (temperatures[ventilated] - airtemp).T
+
+        return flows, ventilation, [names[k] for k in ventilated]
+
+    def _calc_annual_transmission_heat_loss_timeseries(self, breakdown: bool = True):
+        """
+        Wärmeverluste der beheizten Zonen je Zeitschritt in kW.
+        Spalten: je Bauteil der Verlust aus beheizten Zonen (Bauteile zwischen zwei beheizten Zonen heben sich
+        in der Summe auf), je belüfteter beheizter Zone '<Zone> ventilation' und 'sum'.
+        Oberhalb von T_heating sind die Einzelwerte NaN und die Summe 0.
+        :param breakdown: Bei False wird nur die Spalte 'sum' ausgegeben.
+        """
+        self._loss_cache = None
+        self.profiler.count('components_evaluated', len(self.components))
+
+        airtemp = self.climate_data['Tair'].to_numpy(dtype=np.float64)
+        flows, ventilation, ventilated = self._heat_flows(airtemp, self.zone_temperatures(airtemp))
+
+        values = np.column_stack([flows, ventilation])
+        total = values.sum(axis=1)
+
+        heating = airtemp <= self.T_heating
+        total[~heating] = 0.0
+
+        if breakdown:
+            values[~heating] = np.nan
+            values = np.column_stack([values, total])
+            columns = [component.name for component in self.components] + [f'{name} ventilation' for name in ventilated]
+        else:
+            values = total[:, np.newaxis]
+            columns = []
+        columns.append('sum')
+
+        self.transmission_heat_loss_ts = pd.DataFrame(values, index=self.climate_data.index, columns=columns, copy=False)
+
+    def run(self, breakdown: bool = True, profile=False, transient: bool = False):
+        """
+        Berechnet das Haus, siehe House.run. Die instationäre Berechnung ist für mehrere Zonen nicht verfügbar.
+        """
+        if transient:
+            raise ValueError("MultiZoneHouse supports only the steady calculation, call run() with transient=False")
+
+        return super().run(breakdown=breakdown, profile=profile)
+
+    def add_ventilation(self, *args, **kwargs):
+
+        raise TypeError("MultiZoneHouse has no house-wide ventilation, "
+                        "pass volume and air_change_rate per zone to add_zone instead")
+
+    def zone_temperatures_ts(self) -> pd.DataFrame:
+        """
+        Temperaturen aller Zonen als DataFrame (Zeitschritte x Zonen) in °C.
+        """
+        return pd.DataFrame(self.zone_temperatures().T, index=self.climate_data.index, columns=list(self.zones))
+
+    def design_heat_load(self, theta_e=DESIGN_OUTDOOR_TEMPERATURE, theta_g: float = None):
+        """
+        Norm-Heizlast der beheizten Zonen in kW bei Norm-Außentemperatur, mit den Temperaturen der unbeheizten Zonen
+        aus der Wärmebilanz bei theta_e.
+        :param theta_e: Norm-Außentemperatur in °C, Skalar oder Array.
+        :param theta_g: Temperatur des Erdreichs im Auslegungsfall in °C, Standard ist ground_temp bzw. dessen
+                        Minimum, falls ground_temp ein Array je Zeitschritt ist.
+        """
+        if theta_g is None:
+            theta_g = float(np.min(self.ground_temp))
+
+        theta = np.atleast_1d(np.asarray(theta_e, dtype=np.float64))
+        flows, ventilation, _ = self._heat_flows(theta, self.zone_temperatures(theta, ground_temp=theta_g),
+                                                 ground_temp=theta_g)
+        load = flows.sum(axis=1) + ventilation.sum(axis=1)
+
+        return load if np.ndim(theta_e) else float(load[0])
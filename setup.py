@@ -4,7 +4,11 @@ setup(
     name="heizlast",
     version="0.1",
     packages=find_packages(include=['heizlast', 'heizlast.*']),
+    package_data={'heizlast': ['data/*.csv', 'data/*.json']},
     install_requires=[],
+    extras_require={
+        'fast': ['numba'],
+    },
     description="A module for calculating heat load",
     author="Markus Clauß",
     author_email="ihre_email@example.com",